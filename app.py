@@ -1,13 +1,109 @@
+import importlib
 import os
-from flask import Flask
-from flask_cors import CORS
+import threading
+from urllib.parse import quote
+from flask import Flask, request, has_request_context
 from dotenv import load_dotenv
-from flask_wtf.csrf import CSRFProtect, generate_csrf
+from werkzeug.routing import BuildError
 
 load_dotenv()
 
-def create_app():
+CORS_ORIGINS = ['http://localhost:8080', 'http://localhost:8081', 'http://localhost:5173', 'http://localhost:3000', 'http://127.0.0.1:8080', 'http://127.0.0.1:8081']
+
+# (module, blueprint attribute); imported only by the profiles that use them
+PAGE_BLUEPRINTS = [
+    ('routes.main', 'main_bp'),
+    ('routes.auth', 'auth_bp'),
+    ('routes.shows', 'shows_bp'),
+    ('routes.booking', 'booking_bp'),
+    ('routes.account', 'account_bp'),
+]
+ADMIN_BLUEPRINTS = [
+    ('routes.admin', 'admin_bp'),
+    ('routes.admin_movies', 'movies_admin_bp'),
+    ('routes.admin_theatres', 'theatres_admin_bp'),
+    ('routes.admin_screens', 'screens_admin_bp'),
+    ('routes.admin_shows', 'shows_admin_bp'),
+    ('routes.admin_customers', 'customers_admin_bp'),
+    ('routes.admin_staff', 'staff_admin_bp'),
+    ('routes.admin_sql_demos', 'sql_demos_bp'),
+]
+ADMIN_PREFIX = '/admin'
+PROFILES = ('full', 'api', 'admin')
+
+
+def _register(app, blueprints):
+    for module, attr in blueprints:
+        app.register_blueprint(getattr(importlib.import_module(module), attr))
+
+
+class LazyAdmin:
+    """WSGI middleware: sends /admin requests to an admin app built on the first such request.
+
+    The admin CRUD pages and SQL demos are rarely used, so the full profile
+    doesn't import them at startup. The admin app shares the secret key and
+    session store, so logins carry over; url_for() on the main app resolves
+    admin endpoints through it (loading it if needed).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.main_wsgi = app.wsgi_app
+        self._admin = None
+        self._lock = threading.Lock()
+        app.url_build_error_handlers.append(self._build_admin_url)
+
+    def admin_app(self):
+        if self._admin is None:
+            with self._lock:
+                if self._admin is None:
+                    self._admin = create_app('admin')
+        return self._admin
+
+    def _build_admin_url(self, error, endpoint, values):
+        admin = self.admin_app()
+        if endpoint not in admin.view_functions:
+            return None
+        if has_request_context():
+            adapter = admin.url_map.bind_to_environ(request.environ)
+        else:
+            adapter = admin.url_map.bind('localhost')
+        # Flask passes its url_for() options along with the route values
+        values = dict(values)
+        anchor = values.pop('_anchor', None)
+        method = values.pop('_method', None)
+        scheme = values.pop('_scheme', None)
+        external = values.pop('_external', None)
+        try:
+            url = adapter.build(endpoint, values, method=method, url_scheme=scheme,
+                                force_external=bool(external or scheme))
+        except BuildError:
+            return None
+        if anchor:
+            url += '#' + quote(anchor, safe="%!#$&'()*+,/:;=?@")
+        return url
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == ADMIN_PREFIX or path.startswith(ADMIN_PREFIX + '/'):
+            return self.admin_app().wsgi_app(environ, start_response)
+        return self.main_wsgi(environ, start_response)
+
+
+def create_app(profile=None, lazy_admin=True):
+    """Build the app for a profile (default: APP_PROFILE, else 'full').
+
+    * full  - JSON API and site; admin pages load on their first request
+      unless lazy_admin is False
+    * api   - JSON API only: no templates, CSRF or admin imports
+    * admin - site and admin pages, without the JSON API
+    """
+    profile = profile or os.getenv('APP_PROFILE', 'full')
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown app profile {profile!r}; expected one of {', '.join(PROFILES)}")
+
     app = Flask(__name__)
+    app.config['APP_PROFILE'] = profile
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-not-secure')
 
     # Session configuration for cross-origin requests
@@ -23,54 +119,62 @@ def create_app():
     app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'theatre_app')
     app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', '')
 
-    # Initialize CORS for frontend communication
-    CORS(app, 
-         origins=['http://localhost:8080', 'http://localhost:8081', 'http://localhost:5173', 'http://localhost:3000', 'http://127.0.0.1:8080', 'http://127.0.0.1:8081'], 
-         supports_credentials=True,
-         allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-         expose_headers=['Set-Cookie'])
+    if profile != 'admin':
+        # Initialize CORS for frontend communication
+        from flask_cors import CORS
+        CORS(app, 
+             origins=CORS_ORIGINS, 
+             supports_credentials=True,
+             allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'Idempotency-Key'],
+             methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+             expose_headers=['Set-Cookie', 'Idempotent-Replayed'])
     
-    # Initialize CSRF protection (disable for API routes)
-    csrf = CSRFProtect(app)
-    app.jinja_env.globals['csrf_token'] = generate_csrf
+    csrf = None
+    if profile != 'api':
+        # Initialize CSRF protection for the server-rendered forms
+        from flask_wtf.csrf import CSRFProtect, generate_csrf
+        csrf = CSRFProtect(app)
+        app.jinja_env.globals['csrf_token'] = generate_csrf
 
     # Initialize DB connection pool
-    from db.connection import init_pool
+    from db.connection import init_pool, PoolExhausted
     init_pool()
 
+    # Per-request SQL counts/timings -> Server-Timing header and /admin/metrics/sql
+    from db import instrument
+    instrument.init_app(app)
+
+    # Server-side sessions; user name/role come from a cache (SESSION_BACKEND)
+    from utils import sessions
+    sessions.init_app(app)
+
+    # Read replicas for read-only blueprints, primary after a write (MYSQL_REPLICA_HOSTS)
+    from db import routing
+    routing.init_app(app)
+
+    @app.errorhandler(PoolExhausted)
+    def pool_exhausted(e):
+        return {'error': 'Server busy, please retry shortly'}, 503, {'Retry-After': '1'}
+
+    from utils.passwords import HashingBusy
+
+    @app.errorhandler(HashingBusy)
+    def hashing_busy(e):
+        return {'error': 'Too many sign-ins right now, please retry shortly'}, 429, {'Retry-After': '2'}
+
     # Register blueprints
-    from routes.main import main_bp
-    from routes.auth import auth_bp
-    from routes.shows import shows_bp
-    from routes.booking import booking_bp
-    from routes.admin import admin_bp
-    from routes.account import account_bp
-    from routes.admin_movies import movies_admin_bp
-    from routes.admin_theatres import theatres_admin_bp
-    from routes.admin_screens import screens_admin_bp
-    from routes.admin_shows import shows_admin_bp
-    from routes.admin_customers import customers_admin_bp
-    from routes.admin_staff import staff_admin_bp
-    from routes.admin_sql_demos import sql_demos_bp
-    from routes.api import api_bp
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(shows_bp)
-    app.register_blueprint(booking_bp)
-    app.register_blueprint(admin_bp)
-    app.register_blueprint(account_bp)
-    app.register_blueprint(movies_admin_bp)
-    app.register_blueprint(theatres_admin_bp)
-    app.register_blueprint(screens_admin_bp)
-    app.register_blueprint(shows_admin_bp)
-    app.register_blueprint(customers_admin_bp)
-    app.register_blueprint(staff_admin_bp)
-    app.register_blueprint(sql_demos_bp)
-    app.register_blueprint(api_bp)
-    
-    # Exempt API routes from CSRF protection
-    csrf.exempt(api_bp)
+    if profile != 'api':
+        _register(app, PAGE_BLUEPRINTS)
+    if profile != 'admin':
+        from routes.api import api_bp
+        app.register_blueprint(api_bp)
+        if csrf is not None:
+            # Exempt API routes from CSRF protection
+            csrf.exempt(api_bp)
+    if profile == 'admin' or not lazy_admin:
+        _register(app, ADMIN_BLUEPRINTS)
+    elif profile == 'full':
+        app.wsgi_app = LazyAdmin(app)
 
     @app.get('/health')
     def health():
@@ -0,0 +1,60 @@
+"""ASGI entry point: async JSON API in front of the Flask app.
+
+    pip install -r requirements-asgi.txt
+    uvicorn asgi:app --host 127.0.0.1 --port 5000 --workers 2
+
+The read-heavy /api endpoints in routes/api_async.py (show and catalog
+listings, seat maps, seat streams, the current user and their bookings) run
+as coroutines on an aiomysql pool, so one worker can hold thousands of
+browse requests and seat-map watchers. Every other URL - bookings, holds,
+auth, admin and the server-rendered pages - falls through to the unchanged
+Flask app behind a WSGI adapter, with the same session cookie.
+"""
+import os
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount
+
+from app import CORS_ORIGINS, create_app
+from db.aio import init_async_pool, close_async_pool
+from db.connection import PoolExhausted
+from routes.api_async import async_routes, pool_exhausted
+
+
+def build_app(flask_app=None):
+    flask_app = flask_app or create_app()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await init_async_pool()
+        yield
+        await close_async_pool()
+
+    # Threads for the WSGI side only; async routes never use them
+    wsgi = WSGIMiddleware(flask_app, workers=int(os.getenv('ASGI_WSGI_THREADS', '10')))
+    return Starlette(
+        routes=async_routes(flask_app) + [Mount('/', app=wsgi)],
+        middleware=[Middleware(
+            CORSMiddleware,
+            allow_origins=CORS_ORIGINS,
+            allow_credentials=True,
+            allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'Idempotency-Key'],
+            allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+            expose_headers=['Set-Cookie', 'Idempotent-Replayed'],
+        )],
+        exception_handlers={PoolExhausted: pool_exhausted},
+        lifespan=lifespan,
+    )
+
+
+def __getattr__(name):
+    # `uvicorn asgi:app` builds the app on first access; serve.py --asgi calls
+    # build_app() with its own preloaded Flask app instead
+    if name == 'app':
+        globals()['app'] = build_app()
+        return globals()['app']
+    raise AttributeError(name)
@@ -0,0 +1,98 @@
+"""Password hashing throughput: hashes/sec per core at given PBKDF2 rounds, as JSON.
+
+    python -m bench.passwords                          # current PASSWORD_ROUNDS
+    python -m bench.passwords --rounds 29000,100000 --workers 1,2,4 --seconds 3
+
+For each rounds value the report has the single-core rate hashed inline
+(what a request thread used to spend per login), and the rate through
+utils.passwords' process pool at each ``--workers`` count, driven by twice
+as many client threads, with the rate per worker. Use it to pick
+PASSWORD_ROUNDS (cost per login) and PASSWORD_HASH_WORKERS (logins/sec).
+No database is needed.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from utils.passwords import PASSWORD_ROUNDS, PasswordPool, _hash
+
+PASSWORD = 'correct horse battery staple'
+
+
+def inline_rate(rounds, seconds):
+    _hash(PASSWORD, rounds)  # import passlib outside the timed loop
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        _hash(PASSWORD, rounds)
+        count += 1
+    elapsed = time.perf_counter() - started
+    return {'hashes_per_sec': round(count / elapsed, 1), 'ms_per_hash': round(elapsed * 1000 / count, 2)}
+
+
+def pool_rate(rounds, workers, seconds):
+    clients = workers * 2
+    pool = PasswordPool(workers, queue=clients, timeout=60, rounds=rounds)
+    try:
+        # Start the processes and import passlib in each before timing
+        warm = [threading.Thread(target=pool.run, args=(_hash, PASSWORD, rounds)) for _ in range(clients)]
+        for t in warm:
+            t.start()
+        for t in warm:
+            t.join()
+
+        pool.completed, pool.total_ms = 0, 0.0
+        counts = [0] * clients
+        deadline = time.perf_counter() + seconds
+
+        def client(i):
+            while time.perf_counter() < deadline:
+                pool.run(_hash, PASSWORD, rounds)
+                counts[i] += 1
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.shutdown()
+
+    rate = sum(counts) / elapsed
+    return {
+        'workers': workers,
+        'hashes_per_sec': round(rate, 1),
+        'per_worker': round(rate / workers, 1),
+        'avg_ms': pool.stats()['avg_ms'],
+    }
+
+
+def main(argv=None):
+    ints = lambda s: [int(x) for x in s.split(',') if x.strip()]
+    parser = argparse.ArgumentParser(description='Measure password hashes/sec per core.')
+    parser.add_argument('--rounds', type=ints, default=[PASSWORD_ROUNDS])
+    parser.add_argument('--workers', type=ints, default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--seconds', type=float, default=2.0, help='measuring time per case')
+    parser.add_argument('--out', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = {'cpus': os.cpu_count(), 'results': []}
+    for rounds in args.rounds:
+        report['results'].append({
+            'rounds': rounds,
+            'inline': inline_rate(rounds, args.seconds),
+            'pool': [pool_rate(rounds, workers, args.seconds) for workers in args.workers],
+        })
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""Drive the browse / seat-map / booking / dashboard hot paths and report JSON.
+
+    python -m bench.seed --seed 7                       # once
+    python app.py &                                     # or any WSGI server
+    python -m bench.run --concurrency 32 --duration 20 --out before.json
+    python -m bench.run --in-process --scenarios browse,seatmap
+
+Scenarios (``--scenarios``, comma separated, all by default):
+
+* ``browse``  - GET /api/shows, numbered pages and next_cursor follow-ups
+* ``seatmap`` - GET /api/show/<id>/booked-seats, half of them conditional
+* ``book``    - POST /api/book for random seats, one bench customer per client
+* ``contend`` - every client POSTs the same seats of one show at once, for
+  ``--contend-rounds`` rounds; exactly one booking per round may succeed
+* ``admin``   - GET /api/admin/stats as the admin user
+
+Per scenario the report has request count, status counts, throughput and
+p50/p95/p99 latency, plus DB statements per request taken from the server's
+global ``Questions`` counter (so keep other traffic off the database). The
+``integrity`` section counts double-booked seats and shows whose
+available_seats disagrees with their booked seats.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+from http.cookiejar import CookieJar
+
+import mysql.connector
+
+from bench.seed import BENCH_CITY, BENCH_EMAIL_DOMAIN, BENCH_PASSWORD, bench_email, seat_labels
+from generate_shows import db_config
+
+SCENARIOS = ('browse', 'seatmap', 'book', 'contend', 'admin')
+
+
+class HttpClient:
+    """One simulated user: its own cookie jar over urllib."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=dict(headers or {}))
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        try:
+            with self.opener.open(req, timeout=30) as resp:
+                return resp.status, resp.read(), dict(resp.headers)
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), dict(e.headers)
+
+
+class InProcessClient:
+    """Same interface on top of Flask's test client (no server needed)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        resp = self.client.open(path, method=method, json=body, headers=headers or {})
+        return resp.status_code, resp.get_data(), dict(resp.headers)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # scenario -> [(latency_ms, status)]
+        self._lock = threading.Lock()
+
+    def timed(self, scenario, client, method, path, body=None, headers=None):
+        started = time.perf_counter()
+        try:
+            status, payload, resp_headers = client.request(method, path, body, headers)
+        except Exception:
+            status, payload, resp_headers = 0, b'', {}
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.samples.setdefault(scenario, []).append((elapsed, status))
+        return status, payload, resp_headers
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples, wall_seconds, statements):
+    latencies = sorted(s[0] for s in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    count = len(samples)
+    return {
+        'requests': count,
+        'status_counts': statuses,
+        'errors': sum(n for code, n in statuses.items() if code == '0' or code.startswith('5')),
+        'wall_seconds': round(wall_seconds, 3),
+        'throughput_rps': round(count / wall_seconds, 1) if wall_seconds else None,
+        'latency_ms': {
+            'p50': _round(percentile(latencies, 50)),
+            'p95': _round(percentile(latencies, 95)),
+            'p99': _round(percentile(latencies, 99)),
+            'max': _round(latencies[-1] if latencies else None),
+            'mean': _round(sum(latencies) / count if count else None),
+        },
+        'db_statements_per_request': round(statements / count, 2) if count and statements is not None else None,
+    }
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.recorder = Recorder()
+        self.db = mysql.connector.connect(**db_config(), autocommit=True)
+        self.app = None
+        if args.in_process:
+            from app import create_app
+            self.app = create_app()
+        self._load_targets()
+
+    def client(self):
+        return InProcessClient(self.app) if self.app else HttpClient(self.args.base_url)
+
+    def _load_targets(self):
+        with self.db.cursor() as cur:
+            cur.execute(
+                "SELECT s.show_id, sc.capacity FROM showtime s JOIN screen sc ON sc.screen_id = s.screen_id "
+                "JOIN theatre t ON t.theatre_id = sc.theatre_id "
+                "WHERE t.city = %s AND s.show_date >= %s AND s.available_seats > 0 ORDER BY s.show_id",
+                (BENCH_CITY, date.today())
+            )
+            self.shows = cur.fetchall()
+            cur.execute("SELECT COUNT(*) FROM customer WHERE email LIKE %s", (f'%@{BENCH_EMAIL_DOMAIN}',))
+            self.customers = cur.fetchone()[0]
+        if not self.shows or not self.customers:
+            raise SystemExit('No bench data found - run `python -m bench.seed` first')
+
+    def questions(self):
+        with self.db.cursor() as cur:
+            cur.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+            return int(cur.fetchone()[1])
+
+    def login(self, client, email, password):
+        status, payload, _ = client.request('POST', '/api/auth/login', {'email': email, 'password': password})
+        if status != 200:
+            raise SystemExit(f'Login failed for {email}: {status} {payload[:200]!r}')
+
+    # --- scenarios ---------------------------------------------------------------
+
+    def browse(self, client, rng, state):
+        if state.get('cursor') and rng.random() < 0.5:
+            path = '/api/shows?after=' + urllib.parse.quote(state['cursor'])
+        else:
+            path = f'/api/shows?page={rng.randint(1, 5)}'
+        status, payload, _ = self.recorder.timed('browse', client, 'GET', path)
+        if status == 200:
+            state['cursor'] = json.loads(payload).get('next_cursor')
+
+    def seatmap(self, client, rng, state):
+        show_id = rng.choice(self.shows)[0]
+        headers = {}
+        etag = state.setdefault('etags', {}).get(show_id)
+        if etag and rng.random() < 0.5:
+            headers['If-None-Match'] = etag
+        _, _, resp_headers = self.recorder.timed('seatmap', client, 'GET', f'/api/show/{show_id}/booked-seats',
+                                                 headers=headers)
+        if resp_headers.get('ETag'):
+            state['etags'][show_id] = resp_headers['ETag']
+
+    def book(self, client, rng, state):
+        show_id, capacity = rng.choice(self.shows)
+        seats = rng.sample(seat_labels(capacity), rng.randint(1, 2))
+        self.recorder.timed('book', client, 'POST', '/api/book',
+                            {'show_id': show_id, 'selected_seats': seats, 'payment_method': 'upi'})
+
+    def admin(self, client, rng, state):
+        self.recorder.timed('admin', client, 'GET', '/api/admin/stats')
+
+    # --- drivers -----------------------------------------------------------------
+
+    def clients_for(self, scenario):
+        clients = []
+        for n in range(self.args.concurrency):
+            client = self.client()
+            if scenario in ('book', 'contend'):
+                self.login(client, bench_email(n % self.customers + 1), BENCH_PASSWORD)
+            elif scenario == 'admin':
+                self.login(client, self.args.admin_email, self.args.admin_password)
+            clients.append(client)
+        return clients
+
+    def run_timed(self, scenario):
+        step = getattr(self, scenario)
+        clients = self.clients_for(scenario)
+        deadline = time.perf_counter() + self.args.duration
+
+        def worker(client, seed):
+            rng, state = random.Random(seed), {}
+            while time.perf_counter() < deadline:
+                step(client, rng, state)
+
+        threads = [threading.Thread(target=worker, args=(c, self.rng.random())) for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def run_contend(self):
+        clients = self.clients_for('contend')
+        barrier = threading.Barrier(len(clients))
+        rounds = []
+        for _ in range(self.args.contend_rounds):
+            show_id, capacity = self.rng.choice(self.shows)
+            seats = self.rng.sample(seat_labels(capacity), 2)
+            results = []
+
+            def worker(client):
+                barrier.wait()
+                status, _, _ = self.recorder.timed('contend', client, 'POST', '/api/book',
+                                                   {'show_id': show_id, 'selected_seats': seats, 'payment_method': 'upi'})
+                results.append(status)
+
+            threads = [threading.Thread(target=worker, args=(c,)) for c in clients]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            rounds.append({'show_id': show_id, 'seats': seats, 'succeeded': results.count(200)})
+        return {
+            'rounds': len(rounds),
+            'oversold_rounds': sum(1 for r in rounds if r['succeeded'] > 1),
+            'successes_per_round': [r['succeeded'] for r in rounds],
+        }
+
+    def integrity(self):
+        with self.db.cursor() as cur:
+            cur.execute(
+                "SELECT COUNT(*) FROM (SELECT show_id, seat_id FROM seat_booking WHERE status = 'booked' "
+                "GROUP BY show_id, seat_id HAVING COUNT(*) > 1) dup"
+            )
+            double_booked = cur.fetchone()[0]
+            cur.execute(
+                "SELECT COUNT(*) FROM showtime s JOIN screen sc ON sc.screen_id = s.screen_id "
+                "JOIN theatre t ON t.theatre_id = sc.theatre_id "
+                "LEFT JOIN (SELECT show_id, COUNT(*) AS booked FROM seat_booking WHERE status = 'booked' "
+                "           GROUP BY show_id) b ON b.show_id = s.show_id "
+                "WHERE t.city = %s AND sc.capacity - s.available_seats <> COALESCE(b.booked, 0)",
+                (BENCH_CITY,)
+            )
+            drift = cur.fetchone()[0]
+        return {'double_booked_seats': double_booked, 'shows_with_seat_count_drift': drift}
+
+    def run(self):
+        report = {
+            'meta': {
+                'target': 'in-process' if self.app else self.args.base_url,
+                'concurrency': self.args.concurrency,
+                'duration_seconds': self.args.duration,
+                'seed': self.args.seed,
+                'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'bench_shows': len(self.shows),
+                'bench_customers': self.customers,
+                'pid': os.getpid(),
+            },
+            'scenarios': {},
+        }
+        for scenario in self.args.scenarios:
+            before = self.questions()
+            started = time.perf_counter()
+            extra = self.run_contend() if scenario == 'contend' else self.run_timed(scenario)
+            wall = time.perf_counter() - started
+            # -1 for the Questions probe itself; logins are included (they're few)
+            statements = self.questions() - before - 1
+            summary = summarize(self.recorder.samples.get(scenario, []), wall, statements)
+            if extra:
+                summary.update(extra)
+            report['scenarios'][scenario] = summary
+            print(f"{scenario}: {summary['requests']} requests, p95 {summary['latency_ms']['p95']} ms",
+                  file=sys.stderr)
+        report['integrity'] = self.integrity()
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the API hot paths against the bench dataset.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--in-process', action='store_true', help="use Flask's test client instead of HTTP")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        type=lambda s: [x.strip() for x in s.split(',') if x.strip()])
+    parser.add_argument('--concurrency', type=int, default=16, help='simulated clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per timed scenario')
+    parser.add_argument('--contend-rounds', type=int, default=20)
+    parser.add_argument('--admin-email', default='admin@theatre.com')
+    parser.add_argument('--admin-password', default='admin123')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    report = Bench(args).run()
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
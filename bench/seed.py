@@ -0,0 +1,247 @@
+"""Seed a synthetic dataset for the benchmarks.
+
+Everything created here is tagged so it can be wiped without touching real
+data: theatres are named ``Bench Theatre <n>`` in city ``Benchville`` and
+customers use ``bench<n>@bench.local`` with the password ``bench-pass``.
+
+    python -m bench.seed --theatres 20 --screens 4 --days 30 --shows-per-day 4 \\
+        --customers 2000 --bookings 50000 --seed 7
+    python -m bench.seed --reset          # delete the bench data only
+
+Shows are written through generate_shows.insert_rows; historical bookings are
+spread over the past ``--history-days`` days with their seats filled front
+to back, so booked-seats payloads have a realistic size.
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+from db.availability import rebuild as rebuild_availability
+from db.seat_layout import default_layout
+from generate_shows import build_schedule, db_config, insert_rows
+from utils.passwords import PASSWORD_ROUNDS, _hash
+
+BENCH_CITY = 'Benchville'
+BENCH_EMAIL_DOMAIN = 'bench.local'
+BENCH_PASSWORD = 'bench-pass'
+PAYMENT_METHODS = ('card', 'upi', 'cash', 'netbanking')
+
+
+def bench_email(n):
+    return f'bench{n}@{BENCH_EMAIL_DOMAIN}'
+
+
+def seat_labels(capacity):
+    """Sellable seat ids of a screen with no custom layout, front row first."""
+    return default_layout(capacity).seat_ids()
+
+
+def reset(conn):
+    """Delete bench theatres (cascades to screens/shows/bookings) and customers."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM customer WHERE email LIKE %s", (f'%@{BENCH_EMAIL_DOMAIN}',))
+        customers = cur.rowcount
+        cur.execute("DELETE FROM theatre WHERE city = %s", (BENCH_CITY,))
+        theatres = cur.rowcount
+        cur.execute("DELETE FROM show_availability WHERE city = %s", (BENCH_CITY,))
+        conn.commit()
+    return {'customers_deleted': customers, 'theatres_deleted': theatres}
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def seed_venues(conn, theatres, screens_per_theatre, capacity):
+    with conn.cursor() as cur:
+        cur.executemany(
+            "INSERT IGNORE INTO theatre (name, city, contact_no, address) VALUES (%s, %s, %s, %s)",
+            [(f'Bench Theatre {n}', BENCH_CITY, '0000000000', f'{n} Bench Street') for n in range(1, theatres + 1)]
+        )
+        cur.execute("SELECT theatre_id FROM theatre WHERE city = %s ORDER BY theatre_id", (BENCH_CITY,))
+        theatre_ids = [row[0] for row in cur.fetchall()]
+        cur.executemany(
+            "INSERT IGNORE INTO screen (theatre_id, name, type, capacity, status) VALUES (%s, %s, 'standard', %s, 'active')",
+            [(tid, f'Screen {n}', capacity) for tid in theatre_ids for n in range(1, screens_per_theatre + 1)]
+        )
+        cur.execute(
+            "SELECT sc.screen_id, sc.capacity FROM screen sc JOIN theatre t ON t.theatre_id = sc.theatre_id "
+            "WHERE t.city = %s ORDER BY sc.screen_id",
+            (BENCH_CITY,)
+        )
+        screens = cur.fetchall()
+        conn.commit()
+    return theatre_ids, screens
+
+
+def seed_customers(conn, count, batch_size):
+    # One hash for everyone: hashing 10k passwords would dominate seeding time.
+    # At PASSWORD_ROUNDS, so bench logins are not all rehashed on first use.
+    password_hash = _hash(BENCH_PASSWORD, PASSWORD_ROUNDS)
+    rows = [(f'Bench User {n}', bench_email(n), '0000000000', password_hash) for n in range(1, count + 1)]
+    with conn.cursor() as cur:
+        for chunk in _chunks(rows, batch_size):
+            cur.executemany(
+                "INSERT IGNORE INTO customer (name, email, contact_no, membership_status, role, password_hash) "
+                "VALUES (%s, %s, %s, 'none', 'customer', %s)",
+                chunk
+            )
+            conn.commit()
+        cur.execute("SELECT cust_id FROM customer WHERE email LIKE %s ORDER BY cust_id", (f'%@{BENCH_EMAIL_DOMAIN}',))
+        return [row[0] for row in cur.fetchall()]
+
+
+def seed_shows(conn, screens, start, end, shows_per_day, rng, batch_size):
+    with conn.cursor() as cur:
+        cur.execute("SELECT movie_id FROM movie WHERE status IN ('now_showing', 'upcoming') ORDER BY movie_id")
+        movies = [row[0] for row in cur.fetchall()]
+    if not movies:
+        raise SystemExit('Need at least one movie (run db/add_movies.sql first)')
+    rows = build_schedule(screens, movies, start, end, rng, min_slots=shows_per_day, max_slots=shows_per_day)
+    written = insert_rows(conn, rows, batch_size)
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT s.show_id, s.show_date, sc.capacity, s.base_price FROM showtime s "
+            "JOIN screen sc ON sc.screen_id = s.screen_id JOIN theatre t ON t.theatre_id = sc.theatre_id "
+            "WHERE t.city = %s ORDER BY s.show_id",
+            (BENCH_CITY,)
+        )
+        return written, cur.fetchall()
+
+
+def seed_bookings(conn, shows, cust_ids, count, history_days, rng, batch_size):
+    """Insert ``count`` confirmed bookings with 1-4 seats each. Returns bookings written."""
+    if not shows or not cust_ids or count <= 0:
+        return 0
+    capacity_of = {show[0]: show[2] for show in shows}
+    labels = {}
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT sb.show_id, COUNT(*) FROM seat_booking sb JOIN showtime s ON s.show_id = sb.show_id "
+            "JOIN screen sc ON sc.screen_id = s.screen_id JOIN theatre t ON t.theatre_id = sc.theatre_id "
+            "WHERE t.city = %s AND sb.status = 'booked' GROUP BY sb.show_id",
+            (BENCH_CITY,)
+        )
+        taken = dict(cur.fetchall())  # show_id -> seats handed out so far (planned)
+    next_seat = dict(taken)  # show_id -> index of the next free seat label (written)
+    now = datetime.now().replace(microsecond=0)
+    written = 0
+    with conn.cursor() as cur:
+        for chunk_size in [min(batch_size, count - i) for i in range(0, count, batch_size)]:
+            planned = []
+            for _ in range(chunk_size):
+                show_id, _show_date, capacity, base_price = rng.choice(shows)
+                n = rng.randint(1, 4)
+                if taken.get(show_id, 0) + n > capacity:
+                    continue
+                taken[show_id] = taken.get(show_id, 0) + n
+                booked_at = now - timedelta(seconds=rng.randint(0, history_days * 86400))
+                planned.append((rng.choice(cust_ids), show_id, booked_at, n, float(base_price) * n,
+                                rng.choice(PAYMENT_METHODS)))
+            if not planned:
+                continue
+
+            cur.execute("SELECT COALESCE(MAX(booking_id), 0) FROM booking")
+            floor = cur.fetchone()[0]
+            cur.executemany(
+                "INSERT INTO booking (cust_id, show_id, booking_time, seats_booked, total_amount, payment_method, status) "
+                "VALUES (%s, %s, %s, %s, %s, %s, 'confirmed')",
+                planned
+            )
+            cur.execute(
+                "SELECT booking_id, show_id, seats_booked FROM booking WHERE booking_id > %s ORDER BY booking_id",
+                (floor,)
+            )
+            seat_rows = []
+            for booking_id, show_id, seats_booked in cur.fetchall():
+                if show_id not in capacity_of:
+                    continue  # someone else's booking landed in between
+                if show_id not in labels:
+                    labels[show_id] = seat_labels(capacity_of[show_id])
+                start = next_seat.get(show_id, 0)
+                for seat in labels[show_id][start:start + seats_booked]:
+                    seat_rows.append((booking_id, show_id, seat))
+                next_seat[show_id] = start + seats_booked
+            cur.executemany(
+                "INSERT INTO seat_booking (booking_id, show_id, seat_id, status) VALUES (%s, %s, %s, 'booked')",
+                seat_rows
+            )
+            conn.commit()
+            written += len(planned)
+    return written
+
+
+def seed(conn, theatres=10, screens_per_theatre=4, capacity=120, days=14, shows_per_day=4,
+         customers=1000, bookings=10000, history_days=30, seed=None, batch_size=2000):
+    """Create the whole bench dataset. Returns a stats dict."""
+    rng = random.Random(seed)
+    timings = {}
+
+    t0 = time.perf_counter()
+    theatre_ids, screens = seed_venues(conn, theatres, screens_per_theatre, capacity)
+    timings['venues'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cust_ids = seed_customers(conn, customers, batch_size)
+    timings['customers'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    start = date.today() - timedelta(days=history_days)
+    end = date.today() + timedelta(days=days - 1)
+    shows_written, shows = seed_shows(conn, screens, start, end, shows_per_day, rng, batch_size)
+    timings['shows'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bookings_written = seed_bookings(conn, shows, cust_ids, bookings, history_days, rng, batch_size)
+    timings['bookings'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rebuild_availability(conn, date.today(), end)
+    timings['availability'] = time.perf_counter() - t0
+
+    return {
+        'theatres': len(theatre_ids),
+        'screens': len(screens),
+        'shows': len(shows),
+        'shows_written': shows_written,
+        'customers': len(cust_ids),
+        'bookings_written': bookings_written,
+        'seconds': {k: round(v, 3) for k, v in timings.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed (or wipe) the synthetic benchmark dataset.')
+    parser.add_argument('--theatres', type=int, default=10)
+    parser.add_argument('--screens', type=int, default=4, help='screens per theatre')
+    parser.add_argument('--capacity', type=int, default=120, help='seats per screen')
+    parser.add_argument('--days', type=int, default=14, help='days of upcoming shows from today')
+    parser.add_argument('--shows-per-day', type=int, default=4, help='shows per screen per day (max 4)')
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--bookings', type=int, default=10000, help='historical bookings')
+    parser.add_argument('--history-days', type=int, default=30, help='days of past shows and bookings')
+    parser.add_argument('--seed', type=int, help='RNG seed for a reproducible dataset')
+    parser.add_argument('--batch-size', type=int, default=2000, help='rows per transaction')
+    parser.add_argument('--reset', action='store_true', help='delete the bench data and exit')
+    args = parser.parse_args(argv)
+
+    conn = mysql.connector.connect(**db_config())
+    try:
+        if args.reset:
+            print(reset(conn))
+            return
+        stats = seed(conn, theatres=args.theatres, screens_per_theatre=args.screens, capacity=args.capacity,
+                     days=args.days, shows_per_day=args.shows_per_day, customers=args.customers,
+                     bookings=args.bookings, history_days=args.history_days, seed=args.seed,
+                     batch_size=args.batch_size)
+    finally:
+        conn.close()
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Import-time and memory profile of create_app() per app profile, as JSON.
+
+    python -m bench.startup                         # full, full-eager, api, admin
+    python -m bench.startup --profiles api --runs 5 --top 15 --out startup.json
+
+Each run is a fresh interpreter started with ``-X importtime`` that builds
+the app and reports wall time, module count and memory. Per profile the
+report has the median of those over ``--runs``, plus (from the first run)
+self import time summed per top-level package and the slowest individual
+modules. ``full-eager`` is the full profile with the admin pages imported
+up front (lazy_admin=False), for comparison with the default lazy loading.
+No database is needed: the pool connects on first use.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROFILES = ('full', 'full-eager', 'api', 'admin')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+profile = sys.argv[1]
+create_app(profile.replace('-eager', ''), lazy_admin=not profile.endswith('-eager'))
+wall_ms = (time.perf_counter() - started) * 1000
+from utils.procinfo import memory
+print(json.dumps({'wall_ms': round(wall_ms, 1), 'modules': len(sys.modules), 'memory': memory()}))
+'''
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run_once(profile):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD, profile],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f'{profile}: create_app failed:\n{proc.stderr[-2000:]}')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(proc.stderr)
+
+
+def profile_report(profile, runs, top):
+    results, imports = [], None
+    for _ in range(runs):
+        result, rows = run_once(profile)
+        results.append(result)
+        imports = imports or rows
+
+    by_package = {}
+    for name, self_us, _, _ in imports:
+        package = name.split('.')[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    packages = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    slowest = sorted(imports, key=lambda row: row[1], reverse=True)[:top]
+
+    return {
+        'wall_ms': statistics.median(r['wall_ms'] for r in results),
+        'import_ms': round(sum(row[1] for row in imports) / 1000, 1),
+        'modules': results[0]['modules'],
+        'memory': {
+            key: statistics.median(r['memory'][key] for r in results)
+            for key in results[0]['memory']
+        },
+        'packages_ms': {name: round(us / 1000, 1) for name, us in packages},
+        'slowest_modules_ms': {name: round(self_us / 1000, 1) for name, self_us, _, _ in slowest},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profile app startup (imports, time, memory) per app profile.')
+    parser.add_argument('--profiles', default=','.join(PROFILES),
+                        type=lambda s: [x.strip() for x in s.split(',') if x.strip()])
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per profile (median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='packages / modules listed per profile')
+    parser.add_argument('--out', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.profiles) - set(PROFILES)
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(sorted(unknown))}")
+
+    report = {
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'profiles': {profile: profile_report(profile, args.runs, args.top) for profile in args.profiles},
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
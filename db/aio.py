@@ -0,0 +1,76 @@
+"""asyncio MySQL pool for the ASGI entry point (asgi.py).
+
+Uses aiomysql, an optional dependency (pip install -r requirements-asgi.txt).
+Connection settings come from the same MYSQL_* variables as db.connection;
+the pool is sized separately because one event loop keeps many more
+requests in flight than a thread pool does. Connections run in autocommit:
+the async handlers only read, and a REPEATABLE READ snapshot left open on a
+pooled connection would otherwise serve stale seat maps.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from db.connection import PoolExhausted
+
+try:
+    import aiomysql
+except ImportError:  # optional: pip install -r requirements-asgi.txt
+    aiomysql = None
+
+_pool = None
+ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+
+
+async def init_async_pool():
+    global _pool
+    if aiomysql is None:
+        raise RuntimeError('aiomysql is not installed; pip install -r requirements-asgi.txt')
+    if _pool is None:
+        _pool = await aiomysql.create_pool(
+            minsize=int(os.getenv('DB_ASYNC_POOL_MIN', '1')),
+            maxsize=int(os.getenv('DB_ASYNC_POOL_SIZE', '50')),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            autocommit=True,
+            host=os.getenv('MYSQL_HOST', 'localhost'),
+            port=int(os.getenv('MYSQL_PORT', '3306')),
+            db=os.getenv('MYSQL_DB', 'theatre_db'),
+            user=os.getenv('MYSQL_USER', 'theatre_app'),
+            password=os.getenv('MYSQL_PASSWORD', ''),
+        )
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        pool.close()
+        await pool.wait_closed()
+
+
+@asynccontextmanager
+async def async_cursor():
+    """A cursor on a pooled connection; raises PoolExhausted after DB_POOL_TIMEOUT."""
+    if _pool is None:
+        await init_async_pool()
+    try:
+        conn = await asyncio.wait_for(_pool.acquire(), ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PoolExhausted(f'async pool: all {_pool.size} connections in use (timeout {ACQUIRE_TIMEOUT}s)')
+    try:
+        async with conn.cursor() as cur:
+            yield cur
+    finally:
+        _pool.release(conn)
+
+
+def async_pool_stats():
+    if _pool is None:
+        return {}
+    return {
+        'name': 'async_pool',
+        'size': _pool.maxsize,
+        'open': _pool.size,
+        'idle': _pool.freesize,
+        'in_use': _pool.size - _pool.freesize,
+    }
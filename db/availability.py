@@ -0,0 +1,196 @@
+"""The show_availability summary behind /api/movies/<id>/next-shows.
+
+One row per upcoming show with its city, theatre, seats left and seats left
+per layout tier (db/show_availability.sql). Writers keep it current in the
+same transaction as their own change:
+
+* booking / cancelling adjust the counters of one row (``take_seats`` /
+  ``release_seats``: one UPDATE, no read),
+* show, screen and theatre edits recompute the affected rows (``refresh``).
+
+Rows for past shows are dropped by ``rebuild``, which recomputes everything
+from showtime/seat_booking after the migration, a bulk import
+(generate_shows.py, bench.seed) or any suspicion of drift:
+
+    python -m db.availability rebuild
+    python -m db.availability rebuild --from 2026-01-01 --to 2026-03-31
+"""
+import argparse
+import json
+import time
+from datetime import date
+
+from db.connection import get_conn
+from db.seat_layout import get_layout, layout_for_show
+
+REBUILD_CHUNK = 1000
+
+_COLUMNS = (
+    'city', 'movie_id', 'show_date', 'show_time', 'show_id', 'theatre_id', 'theatre_name',
+    'screen_id', 'screen_name', 'price_type', 'base_price', 'seats_left', 'tiers_left',
+)
+# Same order as _COLUMNS up to seats_left, then the screen capacity for its layout
+_SOURCE = (
+    "SELECT t.city, s.movie_id, s.show_date, s.show_time, s.show_id, t.theatre_id, t.name, "
+    "       sc.screen_id, sc.name, s.price_type, s.base_price, s.available_seats, sc.capacity "
+    "FROM showtime s "
+    "JOIN screen sc ON sc.screen_id = s.screen_id "
+    "JOIN theatre t ON t.theatre_id = sc.theatre_id "
+)
+_SCOPES = {'show_id': 's.show_id', 'screen_id': 'sc.screen_id', 'theatre_id': 't.theatre_id'}
+
+
+def _rows(cur, shows):
+    """show_availability rows for showtimes selected with _SOURCE."""
+    if not shows:
+        return []
+    ids = [show[4] for show in shows]
+    placeholders = ','.join(['%s'] * len(ids))
+    cur.execute(
+        f"SELECT show_id, seat_id FROM seat_booking WHERE status = 'booked' AND show_id IN ({placeholders})",
+        ids
+    )
+    booked = {}
+    for show_id, seat_id in cur.fetchall():
+        booked.setdefault(show_id, []).append(seat_id)
+
+    rows = []
+    for show in shows:
+        layout = get_layout(cur, show[7], show[12])
+        tiers = layout.tier_counts()
+        for tier, sold in layout.tier_counts(booked.get(show[4], ())).items():
+            tiers[tier] -= sold
+        rows.append(tuple(show[:12]) + (json.dumps(tiers),))
+    return rows
+
+
+def _insert(cur, rows):
+    if rows:
+        cur.executemany(
+            f"INSERT INTO show_availability ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join(['%s'] * len(_COLUMNS))})",
+            rows
+        )
+
+
+def refresh(conn, show_id=None, screen_id=None, theatre_id=None):
+    """Recompute the row of a show, or the rows of every upcoming show of a screen
+    or theatre (also removing them if it's gone). Doesn't commit; returns rows written."""
+    scope = [(name, value) for name, value in
+             (('show_id', show_id), ('screen_id', screen_id), ('theatre_id', theatre_id)) if value is not None]
+    if len(scope) != 1:
+        raise ValueError('refresh() takes exactly one of show_id, screen_id, theatre_id')
+    name, value = scope[0]
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM show_availability WHERE {name} = %s", (value,))
+        cur.execute(_SOURCE + f"WHERE {_SCOPES[name]} = %s AND s.show_date >= CURDATE()", (value,))
+        rows = _rows(cur, cur.fetchall())
+        _insert(cur, rows)
+    return len(rows)
+
+
+def _adjust(conn, show_id, seats, layout, count, sign):
+    with conn.cursor() as cur:
+        if layout is None and seats:
+            _, layout = layout_for_show(cur, show_id)
+        tiers = layout.tier_counts(seats) if layout is not None and seats else {}
+        params = [sign * (len(seats) if count is None else count)]
+        pairs = []
+        for tier, n in tiers.items():
+            path = '$.' + json.dumps(tier)
+            pairs.append("%s, CAST(COALESCE(JSON_EXTRACT(tiers_left, %s), 0) AS SIGNED) + %s")
+            params.extend((path, path, sign * n))
+        tiers_sql = f", tiers_left = JSON_SET(tiers_left, {', '.join(pairs)})" if pairs else ''
+        cur.execute(
+            f"UPDATE show_availability SET seats_left = seats_left + %s{tiers_sql} WHERE show_id = %s",
+            params + [show_id]
+        )
+        missing = cur.rowcount == 0
+    if missing:
+        # Not summarized yet (e.g. bulk-inserted show); the rebuild reads the new state
+        refresh(conn, show_id=show_id)
+
+
+def take_seats(conn, show_id, seats, layout=None, count=None):
+    """Count seats (or ``count`` unassigned seats) of a show as sold. Doesn't commit."""
+    _adjust(conn, show_id, seats, layout, count, -1)
+
+
+def release_seats(conn, show_id, seats, layout=None, count=None):
+    """Return seats (or ``count`` unassigned seats) of a show to sale. Doesn't commit."""
+    _adjust(conn, show_id, seats, layout, count, 1)
+
+
+def next_shows(cur, movie_id, city=None, limit=10):
+    """Upcoming shows of a movie that still have seats, soonest first.
+
+    With a city this is one range scan of the clustered primary key; without,
+    of idx_show_availability_movie.
+    """
+    where, params = "movie_id = %s", [movie_id]
+    if city:
+        where, params = "city = %s AND movie_id = %s", [city, movie_id]
+    cur.execute(
+        "SELECT show_id, show_date, show_time, city, theatre_id, theatre_name, screen_id, screen_name, "
+        "       price_type, base_price, seats_left, tiers_left "
+        "FROM show_availability "
+        f"WHERE {where} AND show_date >= CURDATE() "
+        "  AND (show_date > CURDATE() OR show_time >= CURTIME()) AND seats_left > 0 "
+        "ORDER BY show_date, show_time LIMIT %s",
+        params + [limit]
+    )
+    return cur.fetchall()
+
+
+def rebuild(conn, start=None, end=None):
+    """Recompute show_availability for shows from today (or start) to end, in one
+    transaction, and drop rows of past shows. Returns the number of rows written."""
+    where, params = ["s.show_date >= CURDATE()"], []
+    own_where, own_params = ["show_date >= CURDATE()"], []
+    if start:
+        where.append("s.show_date >= %s")
+        own_where.append("show_date >= %s")
+        params.append(start)
+        own_params.append(start)
+    if end:
+        where.append("s.show_date <= %s")
+        own_where.append("show_date <= %s")
+        params.append(end)
+        own_params.append(end)
+
+    written, last_id = 0, 0
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM show_availability WHERE show_date < CURDATE()")
+        cur.execute("DELETE FROM show_availability WHERE " + " AND ".join(own_where), own_params)
+        while True:
+            cur.execute(
+                _SOURCE + "WHERE " + " AND ".join(where) + " AND s.show_id > %s ORDER BY s.show_id LIMIT %s",
+                params + [last_id, REBUILD_CHUNK]
+            )
+            shows = cur.fetchall()
+            if not shows:
+                break
+            last_id = shows[-1][4]
+            rows = _rows(cur, shows)
+            _insert(cur, rows)
+            written += len(rows)
+        conn.commit()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Maintain the show_availability summary.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rb = sub.add_parser('rebuild', help='recompute it from showtime and seat_booking')
+    rb.add_argument('--from', dest='start', type=date.fromisoformat, help='first show day (YYYY-MM-DD)')
+    rb.add_argument('--to', dest='end', type=date.fromisoformat, help='last show day (YYYY-MM-DD)')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with get_conn() as conn:
+        written = rebuild(conn, args.start, args.end)
+    print(f"show_availability: wrote {written} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""Seat booking engine.
+
+One booking is one short transaction on a single connection:
+
+1. lock the showtime row (``FOR UPDATE``) and read price/availability,
+   together with any of the seats held by another customer (``seat_hold``);
+   the screen's cached SeatLayout validates and prices the seats,
+2. insert the booking row (``trg_booking_after_insert`` decrements
+   ``available_seats`` exactly once),
+3. insert every seat in one multi-row INSERT; ``uq_show_seat`` rejects any
+   seat that is already booked, which rolls the whole booking back,
+4. count the seats as sold in ``show_availability`` (one UPDATE),
+5. drop the customer's own hold on the show, which the booking converts.
+
+The happy path is five statements and a commit regardless of seat count.
+
+``book_batch`` does the same for many shows in one transaction: the showtime
+rows are locked in show_id order (so two overlapping batches can't deadlock),
+conflicts are checked for all items with one query per table, and every
+seat row goes in with one multi-row INSERT. Booking rows are inserted one
+at a time (``_insert_bookings``) so each id is the server's own lastrowid.
+"""
+from mysql.connector import errors, errorcode
+from db.availability import take_seats
+from db.seat_layout import get_layout
+from utils.seat_cache import parse_seat
+
+MAX_SEATS_PER_BOOKING = 10
+# Batches are for group/corporate orders, so an item may exceed the per-booking limit
+MAX_BATCH_ITEMS = 50
+MAX_BATCH_SEATS_PER_SHOW = 100
+
+
+class BookingError(Exception):
+    def __init__(self, message, status=400, conflicts=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.conflicts = conflicts or []
+
+
+def normalize_seats(seat_ids):
+    """Upper-case, de-duplicate (keeping order) and validate seat ids."""
+    seats = []
+    for seat_id in seat_ids or []:
+        row, num = parse_seat(seat_id)
+        seat = f'{row}{num}'
+        if seat not in seats:
+            seats.append(seat)
+    return seats
+
+
+def _conflicting_seats(cur, show_id, seats):
+    placeholders = ','.join(['%s'] * len(seats))
+    cur.execute(
+        f"SELECT seat_id FROM seat_booking WHERE show_id = %s AND status = 'booked' "
+        f"AND seat_id IN ({placeholders}) ORDER BY seat_id",
+        [show_id] + seats
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def book_seats(conn, cust_id, show_id, seat_ids, payment_method, before_commit=None):
+    """Book seat_ids for cust_id and commit. Returns (booking_id, total_amount, seats).
+
+    Raises BookingError; on a seat conflict its ``conflicts`` lists the seats
+    that were already taken and nothing is written. ``before_commit(cur,
+    booking_id, total_amount, seats)`` runs last inside the transaction (the
+    Idempotency-Key response is stored there).
+    """
+    try:
+        seats = normalize_seats(seat_ids)
+    except ValueError as e:
+        raise BookingError(str(e))
+    if not seats:
+        raise BookingError('Please select at least one seat')
+    if len(seats) > MAX_SEATS_PER_BOOKING:
+        raise BookingError(f'You can book at most {MAX_SEATS_PER_BOOKING} seats at once')
+
+    with conn.cursor() as cur:
+        try:
+            placeholders = ','.join(['%s'] * len(seats))
+            cur.execute(
+                f"SELECT s.available_seats, s.base_price, s.screen_id, sc.capacity, "
+                f"(SELECT GROUP_CONCAT(h.seat_id ORDER BY h.seat_id) FROM seat_hold h "
+                f" WHERE h.show_id = s.show_id AND h.seat_id IN ({placeholders}) "
+                f" AND h.cust_id <> %s AND h.expires_at > UTC_TIMESTAMP()) AS held_by_others "
+                f"FROM showtime s JOIN screen sc ON sc.screen_id = s.screen_id "
+                f"WHERE s.show_id = %s FOR UPDATE OF s",
+                seats + [cust_id, show_id]
+            )
+            show_info = cur.fetchone()
+            if not show_info:
+                raise BookingError('Show not found', status=404)
+            available_seats, base_price, screen_id, capacity, held_by_others = show_info
+            layout = get_layout(cur, screen_id, capacity)
+            unknown = layout.invalid(seats)
+            if unknown:
+                raise BookingError(f'Seats {", ".join(unknown)} do not exist on this screen')
+            if held_by_others:
+                held = held_by_others.split(',')
+                raise BookingError(
+                    f'Seats {", ".join(held)} are being held by another customer. Please select different seats.',
+                    status=409,
+                    conflicts=held
+                )
+            if available_seats < len(seats):
+                raise BookingError('Not enough seats available')
+
+            total_amount = layout.price(base_price, seats)
+
+            cur.execute(
+                "INSERT INTO booking (cust_id, show_id, seats_booked, total_amount, payment_method, status) "
+                "VALUES (%s, %s, %s, %s, %s, 'confirmed')",
+                (cust_id, show_id, len(seats), total_amount, payment_method)
+            )
+            booking_id = cur.lastrowid
+
+            values = ','.join(["(%s, %s, %s, 'booked')"] * len(seats))
+            params = []
+            for seat in seats:
+                params.extend((booking_id, show_id, seat))
+            cur.execute(
+                f"INSERT INTO seat_booking (booking_id, show_id, seat_id, status) VALUES {values}",
+                params
+            )
+            take_seats(conn, show_id, seats, layout)
+            cur.execute("DELETE FROM seat_hold WHERE show_id = %s AND cust_id = %s", (show_id, cust_id))
+            if before_commit is not None:
+                before_commit(cur, booking_id, total_amount, seats)
+            conn.commit()
+        except errors.IntegrityError as e:
+            conn.rollback()
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            conflicts = _conflicting_seats(cur, show_id, seats)
+            raise BookingError(
+                f'Seats {", ".join(conflicts or seats)} are already booked. Please select different seats.',
+                status=409,
+                conflicts=conflicts or seats
+            )
+        except BookingError:
+            conn.rollback()
+            raise
+
+    return booking_id, total_amount, seats
+
+
+def _failed(show_id, error):
+    result = {'show_id': show_id, 'status': 'failed', 'error': error.message, 'code': error.status}
+    if error.conflicts:
+        result['conflicts'] = error.conflicts
+    return result
+
+
+def _skip_rest(results, items):
+    for i, result in enumerate(results):
+        if result is None:
+            results[i] = {'show_id': items[i].get('show_id'), 'status': 'skipped',
+                          'error': 'Not booked because another item in the batch failed'}
+    return results
+
+
+def _pairs(cur, sql, params):
+    found = {}
+    cur.execute(sql, params)
+    for show_id, seat_id in cur.fetchall():
+        found.setdefault(show_id, set()).add(seat_id)
+    return found
+
+
+def _insert_bookings(cur, rows):
+    """Insert confirmed booking rows (cust_id, show_id, seats_booked, total_amount,
+    payment_method) and return their ids, in order.
+
+    One INSERT per row: the ids of a multi-row INSERT are only consecutive
+    when auto_increment_increment is 1, which multi-primary setups change.
+    """
+    ids = []
+    for row in rows:
+        cur.execute(
+            "INSERT INTO booking (cust_id, show_id, seats_booked, total_amount, payment_method, status) "
+            "VALUES (%s, %s, %s, %s, %s, 'confirmed')",
+            row
+        )
+        ids.append(cur.lastrowid)
+    return ids
+
+
+def book_batch(conn, cust_id, items, payment_method, atomic=True):
+    """Book seats on several shows in one transaction and commit.
+
+    items is a list of {'show_id', 'seats'}. Returns one result per item, in
+    order: {'show_id', 'status': 'booked', 'booking_id', 'seats', 'total_amount'}
+    or {'show_id', 'status': 'failed', 'error', 'code', 'conflicts'?}. When
+    atomic, any failure books nothing and the other items come back
+    'skipped'; otherwise the items that can be booked are.
+    Raises BookingError for a malformed batch.
+    """
+    if not items:
+        raise BookingError('No items to book')
+    if len(items) > MAX_BATCH_ITEMS:
+        raise BookingError(f'A batch can book at most {MAX_BATCH_ITEMS} shows')
+    if not all(isinstance(item, dict) for item in items):
+        raise BookingError('Each item must be an object with show_id and seats')
+
+    results = [None] * len(items)
+    wanted = {}  # show_id -> (index, seats)
+    for i, item in enumerate(items):
+        try:
+            try:
+                show_id = int(item.get('show_id'))
+            except (TypeError, ValueError):
+                raise BookingError('Invalid show_id')
+            if not isinstance(item.get('seats'), list):
+                raise BookingError('seats must be a list of seat ids')
+            try:
+                seats = normalize_seats(item['seats'])
+            except ValueError as e:
+                raise BookingError(str(e))
+            if not seats:
+                raise BookingError('Please select at least one seat')
+            if len(seats) > MAX_BATCH_SEATS_PER_SHOW:
+                raise BookingError(f'A batch can book at most {MAX_BATCH_SEATS_PER_SHOW} seats per show')
+            if show_id in wanted:
+                raise BookingError('Show appears more than once in the batch')
+        except BookingError as e:
+            results[i] = _failed(item.get('show_id'), e)
+            continue
+        wanted[show_id] = (i, seats)
+    if atomic and len(wanted) < len(items):
+        return _skip_rest(results, items)
+    if not wanted:
+        return results
+
+    show_ids = sorted(wanted)
+    show_marks = ','.join(['%s'] * len(show_ids))
+    all_seats = sorted({seat for _, seats in wanted.values() for seat in seats})
+    seat_marks = ','.join(['%s'] * len(all_seats))
+
+    with conn.cursor() as cur:
+        try:
+            # Ascending show_id: every batch (and single booking) takes these locks in the same order
+            cur.execute(
+                f"SELECT s.show_id, s.available_seats, s.base_price, s.screen_id, sc.capacity "
+                f"FROM showtime s JOIN screen sc ON sc.screen_id = s.screen_id "
+                f"WHERE s.show_id IN ({show_marks}) ORDER BY s.show_id FOR UPDATE OF s",
+                show_ids
+            )
+            shows = {row[0]: row[1:] for row in cur.fetchall()}
+            booked = _pairs(
+                cur,
+                f"SELECT show_id, seat_id FROM seat_booking WHERE status = 'booked' "
+                f"AND show_id IN ({show_marks}) AND seat_id IN ({seat_marks})",
+                show_ids + all_seats
+            )
+            held = _pairs(
+                cur,
+                f"SELECT show_id, seat_id FROM seat_hold WHERE cust_id <> %s AND expires_at > UTC_TIMESTAMP() "
+                f"AND show_id IN ({show_marks}) AND seat_id IN ({seat_marks})",
+                [cust_id] + show_ids + all_seats
+            )
+
+            plan = []  # (index, show_id, seats, total_amount, layout)
+            for show_id in show_ids:
+                index, seats = wanted[show_id]
+                try:
+                    if show_id not in shows:
+                        raise BookingError('Show not found', status=404)
+                    available_seats, base_price, screen_id, capacity = shows[show_id]
+                    layout = get_layout(cur, screen_id, capacity)
+                    unknown = layout.invalid(seats)
+                    if unknown:
+                        raise BookingError(f'Seats {", ".join(unknown)} do not exist on this screen')
+                    taken = [seat for seat in seats if seat in booked.get(show_id, ())]
+                    if taken:
+                        raise BookingError(f'Seats {", ".join(taken)} are already booked',
+                                           status=409, conflicts=taken)
+                    on_hold = [seat for seat in seats if seat in held.get(show_id, ())]
+                    if on_hold:
+                        raise BookingError(f'Seats {", ".join(on_hold)} are being held by another customer',
+                                           status=409, conflicts=on_hold)
+                    if available_seats < len(seats):
+                        raise BookingError('Not enough seats available')
+                except BookingError as e:
+                    results[index] = _failed(show_id, e)
+                    continue
+                plan.append((index, show_id, seats, layout.price(base_price, seats), layout))
+
+            if not plan or (atomic and len(plan) < len(wanted)):
+                conn.rollback()
+                return _skip_rest(results, items) if atomic else results
+
+            booking_ids = _insert_bookings(cur, [
+                (cust_id, show_id, len(seats), total_amount, payment_method)
+                for _, show_id, seats, total_amount, _ in plan
+            ])
+
+            seat_count, params = 0, []
+            for booking_id, (_, show_id, seats, _, _) in zip(booking_ids, plan):
+                for seat in seats:
+                    params.extend((booking_id, show_id, seat))
+                seat_count += len(seats)
+            values = ','.join(["(%s, %s, %s, 'booked')"] * seat_count)
+            cur.execute(
+                f"INSERT INTO seat_booking (booking_id, show_id, seat_id, status) VALUES {values}",
+                params
+            )
+            for _, show_id, seats, _, layout in plan:
+                take_seats(conn, show_id, seats, layout)
+            planned = [show_id for _, show_id, _, _, _ in plan]
+            cur.execute(
+                f"DELETE FROM seat_hold WHERE cust_id = %s AND show_id IN ({','.join(['%s'] * len(planned))})",
+                [cust_id] + planned
+            )
+            conn.commit()
+        except errors.IntegrityError as e:
+            conn.rollback()
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            # Only possible if a seat was booked around the showtime lock (e.g. a manual insert)
+            raise BookingError('Some seats were booked concurrently. Please retry.', status=409)
+        except Exception:
+            conn.rollback()
+            raise
+
+    for booking_id, (index, show_id, seats, total_amount, _) in zip(booking_ids, plan):
+        results[index] = {'show_id': show_id, 'status': 'booked', 'booking_id': booking_id,
+                          'seats': seats, 'total_amount': total_amount}
+    return results
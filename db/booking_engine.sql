@@ -0,0 +1,9 @@
+-- Seat uniqueness for the set-based booking engine (db/booking.py)
+-- uq_show_seat used to be (show_id, seat_id, status), so a seat could only be
+-- cancelled once per show: the second cancellation collided on 'cancelled'.
+-- Only live bookings need to be unique, so key on a column that is NULL for
+-- anything that isn't booked (NULLs never collide in a unique index).
+ALTER TABLE seat_booking
+  ADD COLUMN active_seat_id VARCHAR(10) GENERATED ALWAYS AS (IF(status = 'booked', seat_id, NULL)) STORED,
+  DROP INDEX uq_show_seat,
+  ADD UNIQUE KEY uq_show_seat (show_id, active_seat_id);
@@ -1,28 +1,475 @@
 import os
+import threading
+import time
+from collections import deque
 import mysql.connector
-from mysql.connector import pooling
 from dotenv import load_dotenv
+from db.instrument import InstrumentedCursor, SQL_INSTRUMENT
 
 load_dotenv()
 
 _pool = None
+_replicas = None
+_pool_lock = threading.Lock()
+
+# Read replicas: "host[:port],host[:port]". Empty sends every read to the primary.
+REPLICA_HOSTS = [h.strip() for h in os.getenv('MYSQL_REPLICA_HOSTS', '').split(',') if h.strip()]
+REPLICA_RETRY = float(os.getenv('DB_REPLICA_RETRY', '30'))
+REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', '30'))
+REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '10'))
+
+# Per-thread read routing for the request being served (see db.routing)
+_route = threading.local()
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolExhausted(Exception):
+    """No connection became free within the checkout timeout (or too many waiters)."""
+
+
+class PooledConnection:
+    """A checked-out connection. close() - or leaving a ``with`` block - returns it to the pool."""
+
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+
+    def __getattr__(self, name):
+        if self._cnx is None:
+            raise AttributeError(f'{name}: connection already returned to the pool')
+        return getattr(self._cnx, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def cursor(self, *args, **kwargs):
+        if self._cnx is None:
+            raise AttributeError('cursor: connection already returned to the pool')
+        cur = self._cnx.cursor(*args, **kwargs)
+        return InstrumentedCursor(cur) if SQL_INSTRUMENT else cur
+
+    def commit(self):
+        if self._cnx is None:
+            raise AttributeError('commit: connection already returned to the pool')
+        self._cnx.commit()
+        if not self._pool.readonly:
+            # Later reads of this request (and session, see db.routing) go to the primary
+            _route.wrote = True
+
+    def close(self):
+        if self._cnx is not None:
+            cnx, self._cnx = self._cnx, None
+            self._pool._release(cnx)
+
+    def discard(self):
+        """Close the connection instead of returning it (e.g. a result set was abandoned mid-stream)."""
+        if self._cnx is not None:
+            cnx, self._cnx = self._cnx, None
+            self._pool._discard(cnx)
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool with overflow, bounded waiting and metrics.
+
+    ``size`` connections are kept open; up to ``max_overflow`` more are opened
+    under load and closed again when returned. When everything is checked out,
+    up to ``max_waiters`` callers wait at most ``timeout`` seconds before
+    PoolExhausted is raised. Connections older than ``recycle`` seconds are
+    reopened, and ones idle longer than ``ping_idle`` seconds are pinged first.
+    A ``readonly`` pool opens READ ONLY sessions, so a write sent to a replica fails loudly.
+    """
+
+    def __init__(self, name, size=5, max_overflow=10, timeout=5.0, max_waiters=32,
+                 recycle=1800, ping_idle=30, readonly=False, **connect_args):
+        self.name = name
+        self.readonly = readonly
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_waiters = max_waiters
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+        self.connect_args = connect_args
+
+        self._idle = deque()  # (cnx, created_at, returned_at)
+        self._created = {}    # id(cnx) -> created_at for checked-out connections
+        self._open = 0
+        self._waiters = 0
+        self._cond = threading.Condition()
+
+        self.checkouts = 0
+        self.exhausted = 0
+        self.overflow_opened = 0
+        self.recycled = 0
+        self.broken = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def _connect(self):
+        if self.readonly:
+            return mysql.connector.connect(
+                autocommit=False, init_command='SET SESSION TRANSACTION READ ONLY', **self.connect_args
+            )
+        return mysql.connector.connect(autocommit=False, **self.connect_args)
+
+    def connection(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    cnx, created_at, returned_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    if self._open > self.size:
+                        self.overflow_opened += 1
+                    cnx = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._waiters >= self.max_waiters:
+                    self.exhausted += 1
+                    raise PoolExhausted(
+                        f'{self.name}: all {self._open} connections in use '
+                        f'({self._waiters} waiting, timeout {self.timeout}s)'
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            waited_ms = (time.monotonic() - started) * 1000
+            self._record_wait(waited_ms)
+
+        try:
+            if cnx is not None:
+                cnx, created_at = self._prepare(cnx, created_at, returned_at)
+            else:
+                cnx, created_at = self._connect(), time.monotonic()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._created[id(cnx)] = created_at
+        return PooledConnection(self, cnx)
+
+    def _prepare(self, cnx, created_at, returned_at):
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            self._close_quietly(cnx)
+            with self._cond:
+                self.recycled += 1
+            return self._connect(), now
+        if self.ping_idle is not None and self.ping_idle >= 0 and now - returned_at > self.ping_idle:
+            try:
+                cnx.ping(reconnect=False)
+            except Exception:
+                self._close_quietly(cnx)
+                with self._cond:
+                    self.broken += 1
+                return self._connect(), now
+        return cnx, created_at
+
+    def _release(self, cnx):
+        keep = True
+        try:
+            if cnx.in_transaction:
+                cnx.rollback()
+        except Exception:
+            keep = False
+        with self._cond:
+            created_at = self._created.pop(id(cnx), time.monotonic())
+            if not keep:
+                self.broken += 1
+            if keep and len(self._idle) + 1 <= self.size:
+                self._idle.append((cnx, created_at, time.monotonic()))
+                cnx = None
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if cnx is not None:
+            self._close_quietly(cnx)
+
+    def _discard(self, cnx):
+        with self._cond:
+            self._created.pop(id(cnx), None)
+            self._open -= 1
+            self.broken += 1
+            self._cond.notify()
+        self._close_quietly(cnx)
+
+    def _record_wait(self, waited_ms):
+        self.checkouts += 1
+        self.wait_total_ms += waited_ms
+        self.wait_max_ms = max(self.wait_max_ms, waited_ms)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if waited_ms <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    @staticmethod
+    def _close_quietly(cnx):
+        try:
+            cnx.close()
+        except Exception:
+            pass
+
+    def dispose(self, close=True):
+        """Close idle connections and forget checked-out ones.
+
+        In a forked child pass close=False: the sockets are shared with the
+        parent, and closing them here would end the parent's sessions too.
+        """
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open = 0
+            self._created.clear()
+        if close:
+            for cnx, _, _ in idle:
+                self._close_quietly(cnx)
+
+    def stats(self):
+        with self._cond:
+            buckets = {f'le_{bound}ms': count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            buckets[f'gt_{WAIT_BUCKETS_MS[-1]}ms'] = self.wait_buckets[-1]
+            return {
+                'name': self.name,
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'timeout_seconds': self.timeout,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'waiting': self._waiters,
+                'checkouts': self.checkouts,
+                'exhausted': self.exhausted,
+                'overflow_opened': self.overflow_opened,
+                'recycled': self.recycled,
+                'broken': self.broken,
+                'wait_ms': {
+                    'total': round(self.wait_total_ms, 3),
+                    'max': round(self.wait_max_ms, 3),
+                    'avg': round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                    'histogram': buckets,
+                },
+            }
+
+
+class ReplicaSet:
+    """Round-robin over one ConnectionPool per read replica, skipping unhealthy ones.
+
+    A replica that fails to connect, or lags more than ``max_lag`` seconds
+    (checked at most every ``check_interval`` seconds, on checkout), is left
+    out for ``retry`` seconds. connection() returns None when no replica can
+    serve, and the caller falls back to the primary.
+    """
+
+    def __init__(self, pools, retry=30, max_lag=30, check_interval=10):
+        self.pools = pools
+        self.retry = retry
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = 0
+        self._lock = threading.Lock()
+        self._down_until = {pool.name: 0.0 for pool in pools}
+        self._last_error = {pool.name: None for pool in pools}
+        self._checked_at = {pool.name: 0.0 for pool in pools}
+        self._lag = {pool.name: None for pool in pools}
+        self.fallbacks = 0
+        self.marked_down = 0
+
+    def connection(self):
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.pools)
+        for i in range(len(self.pools)):
+            pool = self.pools[(start + i) % len(self.pools)]
+            if self._down_until[pool.name] > time.monotonic():
+                continue
+            try:
+                conn = pool.connection()
+            except PoolExhausted:
+                continue
+            except Exception as e:
+                self._mark_down(pool, e)
+                continue
+            if self._due_check(pool) and not self._healthy(pool, conn):
+                conn.discard()
+                continue
+            return conn
+        with self._lock:
+            self.fallbacks += 1
+        return None
+
+    def _due_check(self, pool):
+        with self._lock:
+            if time.monotonic() - self._checked_at[pool.name] < self.check_interval:
+                return False
+            self._checked_at[pool.name] = time.monotonic()
+            return True
+
+    def _healthy(self, pool, conn):
+        try:
+            with conn.cursor(dictionary=True) as cur:
+                try:
+                    cur.execute("SHOW REPLICA STATUS")
+                    status = cur.fetchone()
+                except mysql.connector.ProgrammingError:
+                    # No REPLICATION CLIENT privilege (or MySQL < 8.0.22): can't tell, trust it
+                    status = None
+        except Exception as e:
+            self._mark_down(pool, e)
+            return False
+        if status is None:
+            # Not a replica, e.g. the primary under a read-only user
+            lag = 0
+        else:
+            lag = status.get('Seconds_Behind_Source')
+        self._lag[pool.name] = lag
+        if lag is None or lag > self.max_lag:
+            self._mark_down(pool, 'replication stopped' if lag is None else f'{lag}s behind the primary')
+            return False
+        return True
+
+    def _mark_down(self, pool, error):
+        print(f"Replica {pool.name} unavailable for {self.retry}s: {error}")
+        with self._lock:
+            self._down_until[pool.name] = time.monotonic() + self.retry
+            self._last_error[pool.name] = str(error)
+            self.marked_down += 1
+
+    def dispose(self, close=True):
+        if not close:
+            self._lock = threading.Lock()
+        for pool in self.pools:
+            pool.dispose(close=close)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'fallbacks': self.fallbacks,
+                'marked_down': self.marked_down,
+                'pools': [
+                    dict(pool.stats(),
+                         healthy=self._down_until[pool.name] <= now,
+                         retry_in_seconds=round(max(self._down_until[pool.name] - now, 0), 1),
+                         lag_seconds=self._lag[pool.name],
+                         last_error=self._last_error[pool.name])
+                    for pool in self.pools
+                ],
+            }
+
 
 def init_pool():
-    global _pool
-    if _pool is None:
-        _pool = pooling.MySQLConnectionPool(
-            pool_name="tms_pool",
-            pool_size=5,
-            host=os.getenv('MYSQL_HOST', 'localhost'),
-            port=int(os.getenv('MYSQL_PORT', '3306')),
+    global _pool, _replicas
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                "tms_pool",
+                size=int(os.getenv('DB_POOL_SIZE', '5')),
+                max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', '5')),
+                max_waiters=int(os.getenv('DB_POOL_MAX_WAITERS', '32')),
+                recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+                ping_idle=int(os.getenv('DB_POOL_PING_IDLE', '30')),
+                host=os.getenv('MYSQL_HOST', 'localhost'),
+                port=int(os.getenv('MYSQL_PORT', '3306')),
+                database=os.getenv('MYSQL_DB', 'theatre_db'),
+                user=os.getenv('MYSQL_USER', 'theatre_app'),
+                password=os.getenv('MYSQL_PASSWORD', '')
+            )
+        if _replicas is None and REPLICA_HOSTS:
+            _replicas = _replica_set()
+
+
+def _replica_set():
+    pools = []
+    for host in REPLICA_HOSTS:
+        name, _, port = host.partition(':')
+        pools.append(ConnectionPool(
+            f"tms_replica_{host}",
+            size=int(os.getenv('DB_REPLICA_POOL_SIZE', os.getenv('DB_POOL_SIZE', '5'))),
+            max_overflow=int(os.getenv('DB_REPLICA_POOL_MAX_OVERFLOW', os.getenv('DB_POOL_MAX_OVERFLOW', '10'))),
+            # Short: another replica or the primary can serve instead
+            timeout=float(os.getenv('DB_REPLICA_POOL_TIMEOUT', '1')),
+            max_waiters=int(os.getenv('DB_POOL_MAX_WAITERS', '32')),
+            recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            ping_idle=int(os.getenv('DB_POOL_PING_IDLE', '30')),
+            readonly=True,
+            connection_timeout=int(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', '2')),
+            host=name,
+            port=int(port or os.getenv('MYSQL_PORT', '3306')),
             database=os.getenv('MYSQL_DB', 'theatre_db'),
-            user=os.getenv('MYSQL_USER', 'theatre_app'),
-            password=os.getenv('MYSQL_PASSWORD', ''),
-            autocommit=False
-        )
+            user=os.getenv('MYSQL_REPLICA_USER', os.getenv('MYSQL_USER', 'theatre_app')),
+            password=os.getenv('MYSQL_REPLICA_PASSWORD', os.getenv('MYSQL_PASSWORD', ''))
+        ))
+    return ReplicaSet(pools, retry=REPLICA_RETRY, max_lag=REPLICA_MAX_LAG,
+                      check_interval=REPLICA_CHECK_INTERVAL)
+
+
+def dispose_pool(close=True):
+    """Drop every pooled connection; the pool reconnects lazily. See ConnectionPool.dispose."""
+    global _pool_lock
+    if not close:
+        # A fork can copy the lock in a held state
+        _pool_lock = threading.Lock()
+    if _pool is not None:
+        _pool.dispose(close=close)
+    if _replicas is not None:
+        _replicas.dispose(close=close)
 
 
-def get_conn():
+def get_conn(readonly=None):
+    """A pooled connection; with readonly=True, one to a read replica if any is healthy.
+
+    readonly=None follows the request's routing (db.routing.read_only
+    blueprints read from replicas). Reads stay on the primary after this
+    request committed, or while the session sticks to it after a write.
+    """
     if _pool is None:
         init_pool()
-    return _pool.get_connection()
+    if readonly is None:
+        readonly = getattr(_route, 'prefer_replica', False)
+    if readonly and _replicas is not None and not (
+            getattr(_route, 'wrote', False) or getattr(_route, 'sticky', False)):
+        conn = _replicas.connection()
+        if conn is not None:
+            return conn
+    return _pool.connection()
+
+
+def begin_request(sticky=False):
+    """Reset read routing for a new request on this thread; ``sticky`` keeps reads on the primary."""
+    _route.prefer_replica = False
+    _route.sticky = sticky
+    _route.wrote = False
+
+
+def prefer_replica(flag=True):
+    """Send this request's get_conn() calls without an explicit readonly to the replicas."""
+    _route.prefer_replica = flag
+
+
+def wrote_primary():
+    """Whether a primary connection committed during this request."""
+    return getattr(_route, 'wrote', False)
+
+
+def pool_stats():
+    if _pool is None:
+        return {}
+    stats = _pool.stats()
+    if _replicas is not None:
+        stats['replicas'] = _replicas.stats()
+    return stats
@@ -0,0 +1,127 @@
+"""Seat holds (short leases taken while a customer is checking out).
+
+A customer has at most one hold per show; placing a new one replaces it.
+Rows live in ``seat_hold`` keyed by (show_id, seat_id), so two customers
+racing for the same seat are settled by the primary key when the seat is
+selected rather than when the booking is submitted. Expired rows are
+ignored by every reader and deleted lazily.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from mysql.connector import errors, errorcode
+from db.booking import BookingError, normalize_seats, MAX_SEATS_PER_BOOKING
+from db.seat_layout import layout_for_show
+
+HOLD_TTL_SECONDS = int(os.getenv('HOLD_TTL_SECONDS', '300'))
+HOLD_MAX_TTL_SECONDS = int(os.getenv('HOLD_MAX_TTL_SECONDS', '900'))
+
+
+def place_hold(conn, cust_id, show_id, seat_ids, ttl=None):
+    """Hold seat_ids for cust_id and commit. Returns (hold_id, seats, expires_at).
+
+    expires_at is a naive UTC datetime. Raises BookingError (409 with
+    ``conflicts``) when any seat is booked or held by someone else.
+    """
+    try:
+        seats = normalize_seats(seat_ids)
+    except ValueError as e:
+        raise BookingError(str(e))
+    if not seats:
+        raise BookingError('Please select at least one seat')
+    if len(seats) > MAX_SEATS_PER_BOOKING:
+        raise BookingError(f'You can hold at most {MAX_SEATS_PER_BOOKING} seats at once')
+    ttl = min(max(int(ttl or HOLD_TTL_SECONDS), 1), HOLD_MAX_TTL_SECONDS)
+
+    hold_id = uuid.uuid4().hex
+    expires_at = datetime.utcnow().replace(microsecond=0) + timedelta(seconds=ttl)
+    placeholders = ','.join(['%s'] * len(seats))
+
+    with conn.cursor() as cur:
+        screen_id, layout = layout_for_show(cur, show_id)
+        if layout is None:
+            raise BookingError('Show not found', status=404)
+        unknown = layout.invalid(seats)
+        if unknown:
+            raise BookingError(f'Seats {", ".join(unknown)} do not exist on this screen')
+        try:
+            # Replace the customer's previous hold and clear lapsed holds on these seats
+            cur.execute(
+                f"DELETE FROM seat_hold WHERE show_id = %s AND (cust_id = %s OR "
+                f"(seat_id IN ({placeholders}) AND expires_at <= UTC_TIMESTAMP()))",
+                [show_id, cust_id] + seats
+            )
+            values = ','.join(['(%s, %s, %s, %s, %s)'] * len(seats))
+            params = []
+            for seat in seats:
+                params.extend((show_id, seat, hold_id, cust_id, expires_at))
+            cur.execute(
+                f"INSERT INTO seat_hold (show_id, seat_id, hold_id, cust_id, expires_at) VALUES {values}",
+                params
+            )
+            cur.execute(
+                f"SELECT seat_id FROM seat_booking WHERE show_id = %s AND status = 'booked' "
+                f"AND seat_id IN ({placeholders}) ORDER BY seat_id",
+                [show_id] + seats
+            )
+            booked = [row[0] for row in cur.fetchall()]
+            if booked:
+                raise BookingError(f'Seats {", ".join(booked)} are already booked.', status=409, conflicts=booked)
+            conn.commit()
+        except errors.IntegrityError as e:
+            conn.rollback()
+            if e.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+                raise BookingError('Show not found', status=404)
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            cur.execute(
+                f"SELECT seat_id FROM seat_hold WHERE show_id = %s AND seat_id IN ({placeholders}) "
+                f"AND cust_id <> %s ORDER BY seat_id",
+                [show_id] + seats + [cust_id]
+            )
+            held = [row[0] for row in cur.fetchall()] or seats
+            raise BookingError(f'Seats {", ".join(held)} are being held by another customer.', status=409, conflicts=held)
+        except BookingError:
+            conn.rollback()
+            raise
+
+    return hold_id, seats, expires_at
+
+
+def release_hold(conn, cust_id, show_id):
+    """Drop cust_id's hold on show_id. Returns the seats that were released."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT seat_id FROM seat_hold WHERE show_id = %s AND cust_id = %s AND expires_at > UTC_TIMESTAMP() "
+            "ORDER BY seat_id FOR UPDATE",
+            (show_id, cust_id)
+        )
+        seats = [row[0] for row in cur.fetchall()]
+        cur.execute("DELETE FROM seat_hold WHERE show_id = %s AND cust_id = %s", (show_id, cust_id))
+        conn.commit()
+    return seats
+
+
+def load_live_holds(conn, show_id=None):
+    """Live holds (of every show, or one) grouped as {hold_id: (show_id, cust_id, [seats], expires_at)}."""
+    where, params = "", []
+    if show_id is not None:
+        # A primary-key prefix range: only the show's held seats are read
+        where, params = "show_id = %s AND ", [show_id]
+    holds = {}
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT hold_id, show_id, cust_id, seat_id, expires_at FROM seat_hold "
+            f"WHERE {where}expires_at > UTC_TIMESTAMP() ORDER BY hold_id, seat_id",
+            params
+        )
+        for hold_id, show_id, cust_id, seat_id, expires_at in cur.fetchall():
+            holds.setdefault(hold_id, (show_id, cust_id, [], expires_at))[2].append(seat_id)
+    return holds
+
+
+def purge_hold(conn, hold_id):
+    """Delete a lapsed hold's rows (a renewed hold has a new hold_id and is kept)."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM seat_hold WHERE hold_id = %s AND expires_at <= UTC_TIMESTAMP()", (hold_id,))
+        conn.commit()
@@ -0,0 +1,45 @@
+"""Stored responses for Idempotency-Key requests (``idempotency_key`` table).
+
+``record`` doesn't commit, so a booking can write its response in its own
+transaction: either both the booking and the stored response exist, or
+neither does. Expired rows are ignored by ``lookup`` and deleted in small
+batches by ``purge``.
+"""
+import os
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+PURGE_BATCH = 500
+
+
+def lookup(cur, cust_id, key):
+    """(request_hash, status_code, response bytes) stored for a key, or None."""
+    cur.execute(
+        "SELECT request_hash, status_code, response FROM idempotency_key "
+        "WHERE cust_id = %s AND idem_key = %s AND expires_at > UTC_TIMESTAMP()",
+        (cust_id, key)
+    )
+    row = cur.fetchone()
+    return (row[0], int(row[1]), bytes(row[2])) if row else None
+
+
+def record(cur, cust_id, key, request_hash, status, body, ttl=None):
+    """Store a response for a key (replacing an expired one). Doesn't commit.
+
+    Raises IntegrityError (ER_DUP_ENTRY) when a live response is stored already.
+    """
+    cur.execute("DELETE FROM idempotency_key WHERE cust_id = %s AND idem_key = %s AND expires_at <= UTC_TIMESTAMP()",
+                (cust_id, key))
+    cur.execute(
+        "INSERT INTO idempotency_key (cust_id, idem_key, request_hash, status_code, response, expires_at) "
+        "VALUES (%s, %s, %s, %s, %s, UTC_TIMESTAMP() + INTERVAL %s SECOND)",
+        (cust_id, key, request_hash, status, body, ttl or IDEMPOTENCY_TTL_SECONDS)
+    )
+
+
+def purge(conn, limit=PURGE_BATCH):
+    """Delete up to ``limit`` expired rows and commit. Returns the number deleted."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM idempotency_key WHERE expires_at <= UTC_TIMESTAMP() LIMIT %s", (limit,))
+        deleted = cur.rowcount
+    conn.commit()
+    return deleted
@@ -0,0 +1,16 @@
+-- Stored responses of POST /api/book requests sent with an Idempotency-Key
+-- header (db/idempotency.py). A successful booking writes its row in the
+-- booking transaction, so a retry after a lost response replays it instead
+-- of booking again. Keys are per customer; expired rows are purged by the app.
+CREATE TABLE idempotency_key (
+  cust_id INT NOT NULL,
+  idem_key VARCHAR(64) NOT NULL,
+  request_hash CHAR(32) NOT NULL,
+  status_code SMALLINT NOT NULL,
+  response MEDIUMBLOB NOT NULL,
+  expires_at DATETIME NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (cust_id, idem_key),
+  KEY idx_idempotency_expiry (expires_at),
+  CONSTRAINT fk_idempotency_customer FOREIGN KEY (cust_id) REFERENCES customer(cust_id) ON DELETE CASCADE
+);
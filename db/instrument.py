@@ -0,0 +1,260 @@
+"""Per-request SQL instrumentation.
+
+Every cursor handed out by db.connection is wrapped in InstrumentedCursor,
+which times execute()/executemany() and the fetches that follow, counts rows,
+and records the statement under its fingerprint (literals and IN/VALUES
+lists collapsed) and the Flask endpoint that issued it.
+
+* ``g`` collects the current request's statements; ``init_app`` turns them
+  into a ``Server-Timing`` header and flags fingerprints repeated more than
+  SQL_REPEAT_THRESHOLD times in one request (N+1 loops).
+* ``sql_stats`` aggregates per (endpoint, fingerprint) for /admin/metrics/sql.
+* Statements slower than SQL_SLOW_MS are logged as JSON on the ``db.slow``
+  logger. The last slow sample of each SELECT is kept so its EXPLAIN can be
+  fetched on demand instead of on the hot path.
+
+Set SQL_INSTRUMENT=0 to hand out plain cursors.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+SQL_INSTRUMENT = os.getenv('SQL_INSTRUMENT', '1') not in ('0', 'false', 'False')
+SQL_SLOW_MS = float(os.getenv('SQL_SLOW_MS', '200'))
+SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', '5'))
+SQL_STATS_MAX_KEYS = int(os.getenv('SQL_STATS_MAX_KEYS', '1000'))
+
+slow_log = logging.getLogger('db.slow')
+repeat_log = logging.getLogger('db.repeat')
+
+_LITERALS = (
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), '?'),
+    (re.compile(r'"(?:[^"\\]|\\.)*"'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?+)'),
+    (re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+)
+_BATCHED = re.compile(r'\s*(INSERT|REPLACE)\b', re.I)
+
+
+def fingerprint(sql):
+    """Normalise a statement so every execution of the same query shape matches."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode('utf-8', 'replace')
+    for pattern, repl in _LITERALS:
+        sql = pattern.sub(repl, sql)
+    return sql.strip()
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or request.path
+    return f'<{threading.current_thread().name}>'
+
+
+class SqlStats:
+    """Aggregated statement metrics keyed by (endpoint, fingerprint)."""
+
+    def __init__(self, max_keys=SQL_STATS_MAX_KEYS):
+        self.max_keys = max_keys
+        self._stats = {}
+        self._requests = {}  # endpoint -> [requests, statements, db_ms, repeated]
+        self._samples = {}   # fingerprint -> (sql, params) of the last slow SELECT
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, fp, elapsed_ms, rows, executions=1):
+        with self._lock:
+            key = (endpoint, fp)
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= self.max_keys:
+                    key = (endpoint, '<other>')
+                entry = self._stats.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0})
+            entry['count'] += executions
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['rows'] += max(rows, 0)
+
+    def add_fetch(self, endpoint, fp, elapsed_ms, rows):
+        with self._lock:
+            entry = self._stats.get((endpoint, fp)) or self._stats.get((endpoint, '<other>'))
+            if entry is not None:
+                entry['total_ms'] += elapsed_ms
+                entry['rows'] += rows
+
+    def finish_request(self, endpoint, statements, db_ms, repeated):
+        with self._lock:
+            entry = self._requests.setdefault(endpoint, [0, 0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += statements
+            entry[2] += db_ms
+            entry[3] += 1 if repeated else 0
+
+    def remember_slow(self, fp, sql, params):
+        with self._lock:
+            self._samples[fp] = (sql, params)
+            while len(self._samples) > self.max_keys:
+                self._samples.pop(next(iter(self._samples)))
+
+    def slow_sample(self, fp):
+        with self._lock:
+            return self._samples.get(fp)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._requests.clear()
+            self._samples.clear()
+
+    def summary(self, limit=50, order_by='total_ms'):
+        with self._lock:
+            statements = [
+                {'endpoint': endpoint, 'fingerprint': fp, 'count': s['count'],
+                 'total_ms': round(s['total_ms'], 3), 'avg_ms': round(s['total_ms'] / s['count'], 3) if s['count'] else 0.0,
+                 'max_ms': round(s['max_ms'], 3), 'rows': s['rows'], 'explainable': fp in self._samples}
+                for (endpoint, fp), s in self._stats.items()
+            ]
+            endpoints = {
+                endpoint: {'requests': n, 'statements': stmts, 'db_ms': round(ms, 3),
+                           'statements_per_request': round(stmts / n, 2) if n else 0.0,
+                           'db_ms_per_request': round(ms / n, 3) if n else 0.0,
+                           'requests_with_repeats': repeated}
+                for endpoint, (n, stmts, ms, repeated) in self._requests.items()
+            }
+        statements.sort(key=lambda s: s.get(order_by, 0), reverse=True)
+        return {'slow_ms': SQL_SLOW_MS, 'endpoints': endpoints, 'statements': statements[:limit]}
+
+
+sql_stats = SqlStats()
+
+
+def _request_log():
+    if not has_request_context():
+        return None
+    log = g.get('_sql_log')
+    if log is None:
+        log = g._sql_log = {'count': 0, 'ms': 0.0, 'by_fp': {}}
+    return log
+
+
+class InstrumentedCursor:
+    """Proxy around a mysql-connector cursor that records what it runs."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._current = None  # (endpoint, fingerprint) of the last statement
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        return self._cursor.close()
+
+    def _record(self, sql, params, elapsed_ms, executions):
+        endpoint, fp = _endpoint(), fingerprint(sql)
+        self._current = (endpoint, fp)
+        # Result-set rows are counted as they are fetched; rowcount covers DML
+        rows = 0 if getattr(self._cursor, 'with_rows', False) else self._cursor.rowcount
+        sql_stats.record(endpoint, fp, elapsed_ms, rows, executions)
+
+        log = _request_log()
+        if log is not None:
+            log['count'] += executions
+            log['ms'] += elapsed_ms
+            log['by_fp'][fp] = log['by_fp'].get(fp, 0) + executions
+
+        if elapsed_ms >= SQL_SLOW_MS:
+            slow_log.warning(json.dumps({
+                'endpoint': endpoint, 'fingerprint': fp, 'ms': round(elapsed_ms, 3),
+                'rows': rows, 'executions': executions,
+            }))
+            if fp.lstrip('( ').upper().startswith('SELECT') and executions == 1:
+                sql_stats.remember_slow(fp, sql, params)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, params, (time.perf_counter() - started) * 1000, 1)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            # mysql-connector folds INSERT ... VALUES batches into one statement
+            executions = 1 if _BATCHED.match(operation) else len(seq_params)
+            self._record(operation, None, (time.perf_counter() - started) * 1000, executions)
+
+    def _timed_fetch(self, method, *args):
+        started = time.perf_counter()
+        result = getattr(self._cursor, method)(*args)
+        if self._current is not None:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if method == 'fetchone':
+                rows = 0 if result is None else 1
+            else:
+                rows = len(result)
+            sql_stats.add_fetch(*self._current, elapsed_ms, rows)
+            log = _request_log()
+            if log is not None:
+                log['ms'] += elapsed_ms
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch('fetchone')
+
+    def fetchmany(self, size=1):
+        return self._timed_fetch('fetchmany', size)
+
+    def fetchall(self):
+        return self._timed_fetch('fetchall')
+
+
+def explain(conn, fp):
+    """EXPLAIN the last slow sample recorded for fingerprint ``fp`` (None if there isn't one)."""
+    sample = sql_stats.slow_sample(fp)
+    if sample is None:
+        return None
+    sql, params = sample
+    with conn.cursor(dictionary=True) as cur:
+        cur.execute('EXPLAIN ' + sql, params)
+        return cur.fetchall()
+
+
+def init_app(app):
+    """Emit Server-Timing for each request and feed the per-endpoint totals."""
+
+    @app.after_request
+    def _sql_server_timing(response):
+        log = g.pop('_sql_log', None)
+        if log is None:
+            return response
+        endpoint = request.endpoint or request.path
+        repeated = {fp: n for fp, n in log['by_fp'].items() if n > SQL_REPEAT_THRESHOLD}
+        sql_stats.finish_request(endpoint, log['count'], log['ms'], bool(repeated))
+        timing = f'db;dur={log["ms"]:.2f};desc="{log["count"]} queries"'
+        if repeated:
+            timing += f', db-repeat;desc="{max(repeated.values())}x same statement"'
+            for fp, n in repeated.items():
+                repeat_log.warning(json.dumps({'endpoint': endpoint, 'fingerprint': fp, 'executions': n}))
+        response.headers.add('Server-Timing', timing)
+        return response
@@ -0,0 +1,102 @@
+-- Daily revenue rollup for the admin dashboard
+-- One row per (day, theatre, movie), maintained by the booking triggers so
+-- dashboard queries read a few hundred rollup rows instead of re-aggregating
+-- the whole booking table. Rebuild/backfill with: python -m db.rollup rebuild
+CREATE TABLE IF NOT EXISTS revenue_daily (
+  day DATE NOT NULL,
+  theatre_id INT NOT NULL,
+  movie_id INT NOT NULL,
+  bookings INT NOT NULL DEFAULT 0,
+  seats INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, theatre_id, movie_id),
+  KEY idx_revenue_daily_theatre (theatre_id, day),
+  KEY idx_revenue_daily_movie (movie_id, day)
+);
+
+DELIMITER $$
+
+DROP TRIGGER IF EXISTS trg_booking_after_insert$$
+CREATE TRIGGER trg_booking_after_insert
+AFTER INSERT ON booking FOR EACH ROW
+BEGIN
+  IF NEW.status = 'confirmed' THEN
+    UPDATE showtime SET available_seats = available_seats - NEW.seats_booked
+    WHERE show_id = NEW.show_id;
+
+    INSERT INTO revenue_daily (day, theatre_id, movie_id, bookings, seats, revenue)
+    SELECT DATE(NEW.booking_time), sc.theatre_id, s.movie_id, 1, NEW.seats_booked, NEW.total_amount
+    FROM showtime s JOIN screen sc ON sc.screen_id = s.screen_id
+    WHERE s.show_id = NEW.show_id
+    ON DUPLICATE KEY UPDATE bookings = bookings + 1,
+                            seats = seats + NEW.seats_booked,
+                            revenue = revenue + NEW.total_amount;
+  END IF;
+END$$
+
+DROP TRIGGER IF EXISTS trg_booking_after_update$$
+CREATE TRIGGER trg_booking_after_update
+AFTER UPDATE ON booking FOR EACH ROW
+BEGIN
+  IF OLD.status = 'confirmed' AND NEW.status IN ('cancelled','refunded') THEN
+    UPDATE showtime SET available_seats = available_seats + OLD.seats_booked
+    WHERE show_id = OLD.show_id;
+
+    -- Cancel all seat bookings for this booking
+    UPDATE seat_booking SET status = 'cancelled'
+    WHERE booking_id = NEW.booking_id;
+
+    UPDATE revenue_daily r
+    JOIN showtime s ON s.show_id = OLD.show_id
+    JOIN screen sc ON sc.screen_id = s.screen_id
+    SET r.bookings = r.bookings - 1,
+        r.seats = r.seats - OLD.seats_booked,
+        r.revenue = r.revenue - OLD.total_amount
+    WHERE r.day = DATE(OLD.booking_time) AND r.theatre_id = sc.theatre_id AND r.movie_id = s.movie_id;
+  END IF;
+END$$
+
+DROP TRIGGER IF EXISTS trg_booking_after_delete$$
+CREATE TRIGGER trg_booking_after_delete
+AFTER DELETE ON booking FOR EACH ROW
+BEGIN
+  IF OLD.status = 'confirmed' THEN
+    UPDATE showtime SET available_seats = available_seats + OLD.seats_booked
+    WHERE show_id = OLD.show_id;
+
+    UPDATE revenue_daily r
+    JOIN showtime s ON s.show_id = OLD.show_id
+    JOIN screen sc ON sc.screen_id = s.screen_id
+    SET r.bookings = r.bookings - 1,
+        r.seats = r.seats - OLD.seats_booked,
+        r.revenue = r.revenue - OLD.total_amount
+    WHERE r.day = DATE(OLD.booking_time) AND r.theatre_id = sc.theatre_id AND r.movie_id = s.movie_id;
+  END IF;
+END$$
+
+-- The rollup is keyed on the show's theatre and movie at booking time, and the
+-- cancel/delete triggers above find the row through the same joins. Once a
+-- show has confirmed bookings, moving it to another movie or screen (or its
+-- screen to another theatre) would send those decrements to the wrong row.
+DROP TRIGGER IF EXISTS trg_showtime_before_update$$
+CREATE TRIGGER trg_showtime_before_update
+BEFORE UPDATE ON showtime FOR EACH ROW
+BEGIN
+  IF (NEW.movie_id <> OLD.movie_id OR NEW.screen_id <> OLD.screen_id)
+     AND EXISTS (SELECT 1 FROM booking WHERE show_id = OLD.show_id AND status = 'confirmed') THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Show has bookings: its movie and screen cannot be changed';
+  END IF;
+END$$
+
+DROP TRIGGER IF EXISTS trg_screen_before_update$$
+CREATE TRIGGER trg_screen_before_update
+BEFORE UPDATE ON screen FOR EACH ROW
+BEGIN
+  IF NEW.theatre_id <> OLD.theatre_id
+     AND EXISTS (SELECT 1 FROM booking b JOIN showtime s ON s.show_id = b.show_id
+                 WHERE s.screen_id = OLD.screen_id AND b.status = 'confirmed') THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Screen has bookings: its theatre cannot be changed';
+  END IF;
+END$$
+
+DELIMITER ;
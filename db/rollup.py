@@ -0,0 +1,75 @@
+"""Rebuild / backfill the revenue_daily rollup from the booking table.
+
+The booking triggers keep revenue_daily current; this recomputes it from
+scratch for a date range (or everything) after the migration, a bulk import,
+or any suspicion of drift:
+
+    python -m db.rollup rebuild
+    python -m db.rollup rebuild --from 2026-01-01 --to 2026-03-31
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from db.connection import get_conn
+
+
+def rebuild(conn, start=None, end=None):
+    """Recompute revenue_daily for [start, end] (dates, inclusive) in one transaction.
+
+    Returns the number of rollup rows written.
+    """
+    where, params = [], []
+    if start:
+        where.append("b.booking_time >= %s")
+        params.append(start)
+    if end:
+        where.append("b.booking_time < %s")
+        params.append(end + timedelta(days=1))
+    booking_range = (" AND " + " AND ".join(where)) if where else ""
+
+    day_where, day_params = [], []
+    if start:
+        day_where.append("day >= %s")
+        day_params.append(start)
+    if end:
+        day_where.append("day <= %s")
+        day_params.append(end)
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "DELETE FROM revenue_daily" + (" WHERE " + " AND ".join(day_where) if day_where else ""),
+            day_params
+        )
+        cur.execute(
+            "INSERT INTO revenue_daily (day, theatre_id, movie_id, bookings, seats, revenue) "
+            "SELECT DATE(b.booking_time), sc.theatre_id, s.movie_id, "
+            "       COUNT(*), SUM(b.seats_booked), SUM(b.total_amount) "
+            "FROM booking b "
+            "JOIN showtime s ON s.show_id = b.show_id "
+            "JOIN screen sc ON sc.screen_id = s.screen_id "
+            "WHERE b.status = 'confirmed'" + booking_range + " "
+            "GROUP BY DATE(b.booking_time), sc.theatre_id, s.movie_id",
+            params
+        )
+        written = cur.rowcount
+        conn.commit()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Maintain the revenue_daily rollup.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rb = sub.add_parser('rebuild', help='recompute the rollup from booking')
+    rb.add_argument('--from', dest='start', type=date.fromisoformat, help='first day (YYYY-MM-DD)')
+    rb.add_argument('--to', dest='end', type=date.fromisoformat, help='last day (YYYY-MM-DD)')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with get_conn() as conn:
+        written = rebuild(conn, args.start, args.end)
+    print(f"revenue_daily: wrote {written} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
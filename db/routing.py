@@ -0,0 +1,44 @@
+"""Read-replica routing for Flask requests (MYSQL_REPLICA_HOSTS).
+
+Blueprints passed to ``read_only`` send their get_conn() calls to the
+replicas; elsewhere a read opts in with get_conn(readonly=True). Writes
+always go to the primary.
+
+Read-your-writes: once a request commits on the primary, the rest of it and
+the session's requests for the next DB_REPLICA_STICKY_SECONDS read from the
+primary too, so e.g. a new booking shows up on /api/my-bookings even while
+the replicas are catching up.
+"""
+import os
+import time
+
+from flask import session
+
+from db import connection
+
+STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+
+
+def init_app(app):
+    """Reset routing per request and start the session's stickiness after a write."""
+
+    @app.before_request
+    def _route_reads():
+        sticky = connection.REPLICA_HOSTS and session.get('_primary_until', 0) > time.time()
+        connection.begin_request(sticky=bool(sticky))
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if connection.REPLICA_HOSTS and STICKY_SECONDS > 0 and connection.wrote_primary():
+            session['_primary_until'] = time.time() + STICKY_SECONDS
+        return response
+
+
+def read_only(blueprint):
+    """Mark a blueprint's endpoints as reads that a replica can serve."""
+
+    @blueprint.before_request
+    def _prefer_replica():
+        connection.prefer_replica()
+
+    return blueprint
@@ -0,0 +1,141 @@
+"""Typeahead search over movie titles and theatre names.
+
+Queries go through the FULLTEXT indexes (ft_movie_title, ft_theatre_name_city)
+in boolean mode: every word becomes a required prefix term, so "dark kni"
+matches "The Dark Knight". Words InnoDB would not index (shorter than
+innodb_ft_min_token_size, or default stopwords) are dropped from the
+full-text query; if nothing usable is left, a plain prefix LIKE is used
+instead so one- and two-letter typeahead still answers.
+
+Each hit carries its next few upcoming shows, fetched for all hits at once
+with a LATERAL subquery (MySQL 8.0.14+) that stops after N rows per hit.
+"""
+import re
+
+FT_MIN_TOKEN = 3
+# InnoDB's default full-text stopword list
+STOPWORDS = frozenset((
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i',
+    'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when',
+    'where', 'who', 'will', 'with', 'und', 'www',
+))
+MAX_TERMS = 8
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+# Upcoming, bookable shows (same rules as v_active_shows, minus shows already started today)
+_UPCOMING = (
+    "s.available_seats > 0 AND s.show_date >= CURDATE() "
+    "AND (s.show_date > CURDATE() OR s.show_time >= CURTIME())"
+)
+
+
+def boolean_query(q):
+    """'+word1* +word2*' for the indexable words of q, or None if there are none."""
+    words = [w.lower() for w in _WORD.findall(q)][:MAX_TERMS]
+    terms = [w for w in words if len(w) >= FT_MIN_TOKEN and w not in STOPWORDS]
+    if not terms:
+        return None
+    return ' '.join(f'+{w}*' for w in terms)
+
+
+def _like_prefix(q):
+    escaped = q.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    # Title starts with q, or any later word does
+    return f'{escaped}%', f'% {escaped}%'
+
+
+def search_movies(cur, q, limit):
+    against = boolean_query(q)
+    if against:
+        cur.execute(
+            "SELECT movie_id, title, genre, language, rating, release_date, status, "
+            "       MATCH(title) AGAINST (%s IN BOOLEAN MODE) AS score "
+            "FROM movie "
+            "WHERE MATCH(title) AGAINST (%s IN BOOLEAN MODE) AND status IN ('now_showing', 'upcoming') "
+            "ORDER BY score DESC, title LIMIT %s",
+            (against, against, limit)
+        )
+    else:
+        starts, word = _like_prefix(q)
+        cur.execute(
+            "SELECT movie_id, title, genre, language, rating, release_date, status, 0 AS score "
+            "FROM movie "
+            "WHERE (title LIKE %s OR title LIKE %s) AND status IN ('now_showing', 'upcoming') "
+            "ORDER BY title LIMIT %s",
+            (starts, word, limit)
+        )
+    return cur.fetchall()
+
+
+def search_theatres(cur, q, limit):
+    against = boolean_query(q)
+    if against:
+        cur.execute(
+            "SELECT theatre_id, name, city, address, "
+            "       MATCH(name, city) AGAINST (%s IN BOOLEAN MODE) AS score "
+            "FROM theatre "
+            "WHERE MATCH(name, city) AGAINST (%s IN BOOLEAN MODE) "
+            "ORDER BY score DESC, name LIMIT %s",
+            (against, against, limit)
+        )
+    else:
+        starts, word = _like_prefix(q)
+        cur.execute(
+            "SELECT theatre_id, name, city, address, 0 AS score "
+            "FROM theatre "
+            "WHERE name LIKE %s OR name LIKE %s OR city LIKE %s "
+            "ORDER BY name LIMIT %s",
+            (starts, word, starts, limit)
+        )
+    return cur.fetchall()
+
+
+def next_shows_for_movies(cur, movie_ids, per_movie):
+    """Rows of (movie_id, show...) - the next per_movie upcoming shows of each movie."""
+    if not movie_ids:
+        return []
+    placeholders = ','.join(['%s'] * len(movie_ids))
+    cur.execute(
+        f"SELECT m.movie_id, n.show_id, n.show_date, n.show_time, n.price_type, n.base_price, "
+        f"       n.available_seats, n.theatre_id, n.theatre_name, n.city, n.screen_name "
+        f"FROM movie m "
+        f"JOIN LATERAL ("
+        f"  SELECT s.show_id, s.show_date, s.show_time, s.price_type, s.base_price, s.available_seats, "
+        f"         t.theatre_id, t.name AS theatre_name, t.city, sc.name AS screen_name "
+        f"  FROM showtime s "
+        f"  JOIN screen sc ON sc.screen_id = s.screen_id AND sc.status = 'active' "
+        f"  JOIN theatre t ON t.theatre_id = sc.theatre_id "
+        f"  WHERE s.movie_id = m.movie_id AND {_UPCOMING} "
+        f"  ORDER BY s.show_date, s.show_time LIMIT %s"
+        f") n ON TRUE "
+        f"WHERE m.movie_id IN ({placeholders}) "
+        f"ORDER BY m.movie_id, n.show_date, n.show_time",
+        [per_movie] + list(movie_ids)
+    )
+    return cur.fetchall()
+
+
+def next_shows_for_theatres(cur, theatre_ids, per_theatre):
+    """Rows of (theatre_id, show...) - the next per_theatre upcoming shows at each theatre."""
+    if not theatre_ids:
+        return []
+    placeholders = ','.join(['%s'] * len(theatre_ids))
+    cur.execute(
+        f"SELECT t.theatre_id, n.show_id, n.show_date, n.show_time, n.price_type, n.base_price, "
+        f"       n.available_seats, n.movie_id, n.movie_title, n.screen_name "
+        f"FROM theatre t "
+        f"JOIN LATERAL ("
+        f"  SELECT s.show_id, s.show_date, s.show_time, s.price_type, s.base_price, s.available_seats, "
+        f"         m.movie_id, m.title AS movie_title, sc.name AS screen_name "
+        f"  FROM showtime s "
+        f"  JOIN screen sc ON sc.screen_id = s.screen_id AND sc.status = 'active' "
+        f"  JOIN movie m ON m.movie_id = s.movie_id AND m.status = 'now_showing' "
+        f"  WHERE sc.theatre_id = t.theatre_id AND {_UPCOMING} "
+        f"  ORDER BY s.show_date, s.show_time LIMIT %s"
+        f") n ON TRUE "
+        f"WHERE t.theatre_id IN ({placeholders}) "
+        f"ORDER BY t.theatre_id, n.show_date, n.show_time",
+        [per_theatre] + list(theatre_ids)
+    )
+    return cur.fetchall()
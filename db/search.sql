@@ -0,0 +1,9 @@
+-- Full-text search support for /api/search
+-- movie already has ft_movie_title; theatres get one over name + city.
+ALTER TABLE theatre ADD FULLTEXT KEY ft_theatre_name_city (name, city);
+
+-- "Next N shows of a movie" reads (movie_id, show_date, show_time) in index
+-- order and stops after N rows. It supersedes idx_showtime_movie (and still
+-- backs fk_showtime_movie).
+CREATE INDEX idx_showtime_movie_next ON showtime (movie_id, show_date, show_time);
+DROP INDEX idx_showtime_movie ON showtime;
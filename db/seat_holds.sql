@@ -0,0 +1,17 @@
+-- Seat holds: short leases on seats while a customer checks out (db/holds.py)
+-- One row per held seat; the primary key makes two customers racing for the
+-- same seat collide at selection time. expires_at is UTC.
+CREATE TABLE seat_hold (
+  show_id INT NOT NULL,
+  seat_id VARCHAR(10) NOT NULL,
+  hold_id CHAR(32) NOT NULL,
+  cust_id INT NOT NULL,
+  expires_at DATETIME NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (show_id, seat_id),
+  KEY idx_seat_hold_hold (hold_id),
+  KEY idx_seat_hold_customer (cust_id, show_id),
+  KEY idx_seat_hold_expiry (expires_at),
+  CONSTRAINT fk_seat_hold_show FOREIGN KEY (show_id) REFERENCES showtime(show_id) ON DELETE CASCADE,
+  CONSTRAINT fk_seat_hold_customer FOREIGN KEY (cust_id) REFERENCES customer(cust_id) ON DELETE CASCADE
+);
@@ -0,0 +1,177 @@
+"""Seat layouts and tier pricing per screen.
+
+A SeatLayout is built once per screen - from its ``screen_layout`` row, or
+derived from ``screen.capacity`` - and cached in-process. It keeps a
+seat id -> surcharge table, so validating and pricing a booking is one dict
+lookup per seat instead of row-letter arithmetic, and every screen size gets
+the same tiers the seat map shows.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+TIER_SURCHARGES = {'standard': 0, 'premium': 100, 'vip': 200}
+LAYOUT_CACHE_TTL = int(os.getenv('SEAT_LAYOUT_TTL', '300'))
+
+# The classic 114-seat hall the seat map has always drawn: (label, seats, tier)
+CLASSIC_ROWS = (
+    [(label, 14, 'standard') for label in 'ABC']
+    + [(label, 12, 'premium') for label in 'DEFG']
+    + [(label, 8, 'vip') for label in 'HIJ']
+)
+CLASSIC_CAPACITY = sum(seats for _, seats, _ in CLASSIC_ROWS)
+
+
+class SeatLayout:
+    def __init__(self, rows, blocked=(), surcharges=None, version=0):
+        self.rows = rows  # [{'label', 'seats', 'tier', 'aisles'}]
+        self.blocked = sorted(set(blocked))
+        self.surcharges = dict(TIER_SURCHARGES, **(surcharges or {}))
+        self.version = version
+
+        self._surcharge = {}
+        self._tier = {}
+        blocked_set = set(self.blocked)
+        for row in rows:
+            extra = self.surcharges[row['tier']]
+            for n in range(1, row['seats'] + 1):
+                seat = f"{row['label']}{n}"
+                if seat not in blocked_set:
+                    self._surcharge[seat] = extra
+                    self._tier[seat] = row['tier']
+        self.sellable = len(self._surcharge)
+        digest = hashlib.blake2b(json.dumps(self.to_dict(), sort_keys=True).encode(), digest_size=8)
+        self.etag = digest.hexdigest()
+
+    def invalid(self, seats):
+        """Seats that don't exist on this screen or are blocked."""
+        return [seat for seat in seats if seat not in self._surcharge]
+
+    def price(self, base_price, seats):
+        """Total for seats (all valid) at base_price."""
+        surcharge = self._surcharge
+        return base_price * len(seats) + sum(surcharge[seat] for seat in seats)
+
+    def seat_ids(self):
+        return list(self._surcharge)
+
+    def tier_counts(self, seats=None):
+        """{tier: sellable seats} for the whole screen, or among seats (unknown ones are skipped)."""
+        counts = {}
+        for seat in self._tier if seats is None else seats:
+            tier = self._tier.get(seat)
+            if tier is not None:
+                counts[tier] = counts.get(tier, 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'blocked': self.blocked,
+            'surcharges': self.surcharges,
+            'version': self.version,
+        }
+
+
+def default_layout(capacity):
+    """The classic rows cut off at capacity; above 114 seats every row is widened
+    in proportion, so seat ids valid on the classic map stay valid."""
+    widths = [seats for _, seats, _ in CLASSIC_ROWS]
+    if capacity > CLASSIC_CAPACITY:
+        extra = capacity - CLASSIC_CAPACITY
+        widths = [w + extra * w // CLASSIC_CAPACITY for w in widths]
+        for i in range(capacity - sum(widths)):
+            widths[i % len(widths)] += 1
+    rows, remaining = [], capacity
+    for (label, _, tier), width in zip(CLASSIC_ROWS, widths):
+        if remaining <= 0:
+            break
+        n = min(remaining, width)
+        rows.append({'label': label, 'seats': n, 'tier': tier, 'aisles': [math.ceil(n / 2)]})
+        remaining -= n
+    return SeatLayout(rows)
+
+
+def parse_layout(raw, version=0):
+    """SeatLayout from a screen_layout.layout JSON document. Raises ValueError."""
+    doc = json.loads(raw) if isinstance(raw, (str, bytes, bytearray)) else raw
+    surcharges = dict(TIER_SURCHARGES, **{k: int(v) for k, v in (doc.get('surcharges') or {}).items()})
+    rows, labels = [], set()
+    for row in doc.get('rows') or []:
+        label, seats, tier = str(row['label']).upper(), int(row['seats']), row.get('tier', 'standard')
+        if not label.isalpha() or label in labels or seats < 1 or tier not in surcharges:
+            raise ValueError(f'Invalid layout row: {row}')
+        labels.add(label)
+        aisles = sorted(int(a) for a in row.get('aisles', []) if 0 < int(a) < seats)
+        rows.append({'label': label, 'seats': seats, 'tier': tier, 'aisles': aisles})
+    if not rows:
+        raise ValueError('Layout has no rows')
+    return SeatLayout(rows, [str(s).upper() for s in doc.get('blocked') or []], surcharges, version)
+
+
+_layouts = {}  # screen_id -> (layout, capacity, loaded_at)
+_layouts_lock = threading.Lock()
+
+
+def _build(screen_id, capacity, row):
+    layout = None
+    if row:
+        raw, version = (row['layout'], row['version']) if isinstance(row, dict) else row
+        try:
+            layout = parse_layout(raw, version)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"screen_layout for screen {screen_id} ignored: {e}")
+    if layout is None:
+        layout = default_layout(capacity)
+
+    with _layouts_lock:
+        _layouts[screen_id] = (layout, capacity, time.monotonic())
+    return layout
+
+
+def get_layout(cur, screen_id, capacity):
+    """Cached SeatLayout for a screen; runs one query on cur when it isn't cached."""
+    entry = _layouts.get(screen_id)
+    if entry and entry[1] == capacity and time.monotonic() - entry[2] < LAYOUT_CACHE_TTL:
+        return entry[0]
+
+    cur.execute("SELECT layout, version FROM screen_layout WHERE screen_id = %s", (screen_id,))
+    return _build(screen_id, capacity, cur.fetchone())
+
+
+def warm_layouts(cur):
+    """Load the layouts of every active screen in one query. Returns how many."""
+    cur.execute(
+        "SELECT sc.screen_id, sc.capacity, l.layout, l.version "
+        "FROM screen sc LEFT JOIN screen_layout l ON l.screen_id = sc.screen_id "
+        "WHERE sc.status = 'active'"
+    )
+    rows = cur.fetchall()
+    for screen_id, capacity, raw, version in rows:
+        _build(screen_id, capacity, (raw, version) if raw is not None else None)
+    return len(rows)
+
+
+def layout_for_show(cur, show_id):
+    """(screen_id, SeatLayout) for a show, or (None, None) if it doesn't exist."""
+    cur.execute(
+        "SELECT s.screen_id, sc.capacity FROM showtime s JOIN screen sc ON sc.screen_id = s.screen_id "
+        "WHERE s.show_id = %s",
+        (show_id,)
+    )
+    row = cur.fetchone()
+    if not row:
+        return None, None
+    screen_id, capacity = (row['screen_id'], row['capacity']) if isinstance(row, dict) else row
+    return screen_id, get_layout(cur, screen_id, capacity)
+
+
+def clear_layout_cache(screen_id=None):
+    with _layouts_lock:
+        if screen_id is None:
+            _layouts.clear()
+        else:
+            _layouts.pop(screen_id, None)
@@ -0,0 +1,19 @@
+-- Per-screen seat layouts (db/seat_layout.py)
+-- Screens without a row here get a layout derived from their capacity: rows
+-- A-J in the classic 14/12/8 pattern (A-C standard, D-G premium, H-J vip),
+-- widened proportionally for screens larger than 114 seats.
+--
+-- layout is a JSON object, e.g.
+--   {"rows": [{"label": "A", "seats": 16, "tier": "standard", "aisles": [4, 12]}, ...],
+--    "blocked": ["A1", "A16"],
+--    "surcharges": {"standard": 0, "premium": 100, "vip": 200}}
+-- "aisles" lists seat numbers followed by a gap; "blocked" seats are never sold;
+-- "surcharges" (optional) overrides the per-tier amount added to base_price.
+-- Bump version when editing so cached copies and ETags change.
+CREATE TABLE screen_layout (
+  screen_id INT PRIMARY KEY,
+  layout JSON NOT NULL,
+  version INT NOT NULL DEFAULT 1,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  CONSTRAINT fk_screen_layout_screen FOREIGN KEY (screen_id) REFERENCES screen(screen_id) ON DELETE CASCADE
+);
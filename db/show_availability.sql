@@ -0,0 +1,30 @@
+-- "Next available shows" summary for /api/movies/<id>/next-shows
+-- One row per upcoming showtime, clustered by (city, movie_id, show_date,
+-- show_time) so "next shows of movie X in city Y" is a single primary-key
+-- range scan that reads every column it returns, instead of joining
+-- showtime/screen/theatre and filtering on idx_show_available.
+--
+-- seats_left mirrors showtime.available_seats; tiers_left counts the unsold
+-- seats per seat-layout tier, e.g. {"standard": 40, "premium": 48, "vip": 24}.
+-- Kept current by the booking, cancel and show/screen/theatre edit code
+-- (db/availability.py). Rebuild/backfill with: python -m db.availability rebuild
+CREATE TABLE show_availability (
+  city VARCHAR(80) NOT NULL,
+  movie_id INT NOT NULL,
+  show_date DATE NOT NULL,
+  show_time TIME NOT NULL,
+  show_id INT NOT NULL,
+  theatre_id INT NOT NULL,
+  theatre_name VARCHAR(100) NOT NULL,
+  screen_id INT NOT NULL,
+  screen_name VARCHAR(50) NOT NULL,
+  price_type ENUM('standard','premium','vip') NOT NULL DEFAULT 'standard',
+  base_price DECIMAL(10,2) NOT NULL,
+  seats_left INT NOT NULL,
+  tiers_left JSON NOT NULL,
+  PRIMARY KEY (city, movie_id, show_date, show_time, show_id),
+  UNIQUE KEY uq_show_availability_show (show_id),
+  KEY idx_show_availability_movie (movie_id, show_date, show_time),
+  KEY idx_show_availability_screen (screen_id),
+  KEY idx_show_availability_theatre (theatre_id)
+);
@@ -0,0 +1,176 @@
+"""Show listing queries shared by the JSON API and the server-rendered pages.
+
+Two paging modes are supported over the same filters:
+
+* offset paging (``page``) for the numbered HTML pagination, and
+* keyset paging (``after`` cursor) ordered by (show_date, show_time, show_id),
+  which stays an index range scan however deep the client scrolls.
+
+Totals over the four-way join are the expensive part, so they are optional
+and cached per filter set for a short TTL instead of recounted per page.
+"""
+import base64
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+# (select list, from clause, base where, column map) per listing source
+_SOURCES = {
+    'api': (
+        "s.show_id, m.title as movie_title, m.genre, m.language, m.rating, "
+        "t.name as theatre_name, t.city, s.screen_id, sc.name as screen_name, sc.type as screen_type, "
+        "s.show_date, s.show_time, s.price_type, s.base_price, s.available_seats",
+        "FROM showtime s "
+        "JOIN movie m ON s.movie_id = m.movie_id "
+        "JOIN screen sc ON s.screen_id = sc.screen_id "
+        "JOIN theatre t ON sc.theatre_id = t.theatre_id",
+        "s.show_date >= CURDATE()",
+        {'movie': 'm.title', 'theatre': 't.name', 'date': 's.show_date', 'time': 's.show_time', 'id': 's.show_id'},
+    ),
+    'active': (
+        "show_id, theatre_id, theatre_name, city, screen_id, screen_name, screen_type, "
+        "movie_id, movie_title, genre, language, show_date, show_time, price_type, base_price, available_seats",
+        "FROM v_active_shows",
+        "1=1",
+        {'movie': 'movie_title', 'theatre': 'theatre_name', 'date': 'show_date', 'time': 'show_time', 'id': 'show_id'},
+    ),
+}
+
+COUNT_TTL = int(os.getenv('SHOW_COUNT_TTL', '60'))
+_COUNT_CACHE_MAX = 1024
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def encode_cursor(show_date, show_time, show_id):
+    """Opaque, URL-safe token for the row a page ended on."""
+    if isinstance(show_date, date):
+        show_date = show_date.strftime('%Y-%m-%d')
+    if isinstance(show_time, timedelta):
+        secs = int(show_time.total_seconds())
+        show_time = f"{secs // 3600:02d}:{secs % 3600 // 60:02d}:{secs % 60:02d}"
+    raw = f"{show_date}|{show_time}|{int(show_id)}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises ValueError on a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        show_date, show_time, show_id = raw.split('|')
+        date.fromisoformat(show_date)
+        h, m, s = (int(part) for part in show_time.split(':'))
+        return show_date, f"{h:02d}:{m:02d}:{s:02d}", int(show_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def _where(source, filters):
+    _, _, base_where, cols = _SOURCES[source]
+    clauses = [base_where]
+    params = []
+    if filters.get('movie'):
+        clauses.append(f"{cols['movie']} LIKE %s")
+        params.append(f"%{filters['movie']}%")
+    if filters.get('date'):
+        clauses.append(f"{cols['date']} = %s")
+        params.append(filters['date'])
+    if filters.get('theatre'):
+        clauses.append(f"{cols['theatre']} LIKE %s")
+        params.append(f"%{filters['theatre']}%")
+    return clauses, params
+
+
+def build_page_query(source, filters, per_page, after=None, page=None):
+    """SQL and params for one page; fetches per_page + 1 rows to detect a next page."""
+    select, from_, _, cols = _SOURCES[source]
+    clauses, params = _where(source, filters)
+    if after:
+        show_date, show_time, show_id = after
+        # Leading sargable bound keeps this a range scan on idx_showtime_seek
+        clauses.append(
+            f"{cols['date']} >= %s AND ({cols['date']} > %s OR ({cols['date']} = %s AND "
+            f"({cols['time']} > %s OR ({cols['time']} = %s AND {cols['id']} > %s))))"
+        )
+        params.extend([show_date, show_date, show_date, show_time, show_time, show_id])
+    sql = (
+        f"SELECT {select} {from_} WHERE {' AND '.join(clauses)} "
+        f"ORDER BY {cols['date']}, {cols['time']}, {cols['id']} LIMIT %s"
+    )
+    params.append(per_page + 1)
+    if not after and page and page > 1:
+        sql += " OFFSET %s"
+        params.append((page - 1) * per_page)
+    return sql, params
+
+
+def _row_key(description, row):
+    if isinstance(row, dict):
+        return row['show_date'], row['show_time'], row['show_id']
+    names = [col[0] for col in description]
+    return row[names.index('show_date')], row[names.index('show_time')], row[names.index('show_id')]
+
+
+def split_page(description, rows, per_page):
+    """(rows, next_cursor or None) from the per_page + 1 rows of build_page_query."""
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(*_row_key(description, rows[-1]))
+    return rows, next_cursor
+
+
+def fetch_page(cur, source, filters, per_page, after=None, page=None):
+    """Run one page on an open cursor. Returns (rows, next_cursor or None)."""
+    sql, params = build_page_query(source, filters, per_page, after=after, page=page)
+    cur.execute(sql, params)
+    return split_page(cur.description, cur.fetchall(), per_page)
+
+
+def build_count_query(source, filters):
+    _, from_, _, _ = _SOURCES[source]
+    clauses, params = _where(source, filters)
+    return f"SELECT COUNT(*) AS total {from_} WHERE {' AND '.join(clauses)}", params
+
+
+def _count_key(source, filters):
+    return (source, filters.get('movie') or '', filters.get('date') or '', filters.get('theatre') or '')
+
+
+def cached_count(source, filters):
+    """The cached total for the filters, or None."""
+    with _count_lock:
+        hit = _count_cache.get(_count_key(source, filters))
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+def remember_count(source, filters, total):
+    with _count_lock:
+        if len(_count_cache) >= _COUNT_CACHE_MAX:
+            _count_cache.clear()
+        _count_cache[_count_key(source, filters)] = (time.monotonic() + COUNT_TTL, total)
+
+
+def count_shows(cur, source, filters, mode='cached'):
+    """Total rows for the filters. mode is 'exact', 'cached' or 'none'."""
+    if mode == 'none':
+        return None
+    if mode == 'cached':
+        total = cached_count(source, filters)
+        if total is not None:
+            return total
+
+    cur.execute(*build_count_query(source, filters))
+    row = cur.fetchone()
+    total = row['total'] if isinstance(row, dict) else row[0]
+    remember_count(source, filters, total)
+    return total
+
+
+def clear_count_cache():
+    with _count_lock:
+        _count_cache.clear()
@@ -0,0 +1,6 @@
+-- Keyset (seek) pagination support for show listings
+-- The listing orders by (show_date, show_time, show_id); an index with the same
+-- column order lets "after cursor" pages start with a range scan instead of
+-- walking and discarding OFFSET rows. It supersedes idx_showtime_date.
+DROP INDEX idx_showtime_date ON showtime;
+CREATE INDEX idx_showtime_seek ON showtime (show_date, show_time, show_id);
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Button } from '@/components/ui/button';
 import { cn } from '@/lib/utils';
+import type { SeatLayout } from '@/services/api';
 
 interface Seat {
   id: string;
@@ -16,14 +17,39 @@ interface SeatMapProps {
   bookedSeats: string[];
   onSeatSelect: (selectedSeats: string[]) => void;
   maxSeats?: number;
+  layout?: SeatLayout | null;
 }
 
-const SeatMap = ({ totalSeats, bookedSeats, onSeatSelect, maxSeats = 10 }: SeatMapProps) => {
+const SeatMap = ({ totalSeats, bookedSeats, onSeatSelect, maxSeats = 10, layout }: SeatMapProps) => {
   const [seats, setSeats] = useState<Seat[]>([]);
   const [selectedSeats, setSelectedSeats] = useState<string[]>([]);
 
+  // Seat number after which each row's aisle falls (from the server layout when we have one)
+  const aisleAfter: Record<string, number> = {};
+  layout?.rows.forEach(row => {
+    if (row.aisles.length > 0) aisleAfter[row.label] = row.aisles[0];
+  });
+
   // Generate realistic cinema seating layout
   useEffect(() => {
+    if (layout) {
+      const blocked = new Set(layout.blocked);
+      setSeats(layout.rows.flatMap(row =>
+        Array.from({ length: row.seats }, (_, i) => {
+          const seatId = `${row.label}${i + 1}`;
+          return {
+            id: seatId,
+            row: row.label,
+            number: i + 1,
+            isBooked: blocked.has(seatId) || bookedSeats.includes(seatId),
+            isSelected: selectedSeats.includes(seatId),
+            type: row.tier
+          };
+        })
+      ));
+      return;
+    }
+
     const generateSeats = () => {
       const seatLayout: Seat[] = [];
       const rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J'];
@@ -66,7 +92,7 @@ const SeatMap = ({ totalSeats, bookedSeats, onSeatSelect, maxSeats = 10 }: SeatM
     };
 
     setSeats(generateSeats());
-  }, [totalSeats, bookedSeats]);
+  }, [totalSeats, bookedSeats, layout]);
 
   const handleSeatClick = (seatId: string) => {
     const seat = seats.find(s => s.id === seatId);
@@ -144,7 +170,7 @@ const SeatMap = ({ totalSeats, bookedSeats, onSeatSelect, maxSeats = 10 }: SeatM
             
             {/* Left Section */}
             <div className="flex gap-1">
-              {rowSeats.slice(0, Math.ceil(rowSeats.length / 2)).map((seat) => (
+              {rowSeats.slice(0, aisleAfter[row] ?? Math.ceil(rowSeats.length / 2)).map((seat) => (
                 <button
                   key={seat.id}
                   onClick={() => handleSeatClick(seat.id)}
@@ -165,7 +191,7 @@ const SeatMap = ({ totalSeats, bookedSeats, onSeatSelect, maxSeats = 10 }: SeatM
 
             {/* Right Section */}
             <div className="flex gap-1">
-              {rowSeats.slice(Math.ceil(rowSeats.length / 2)).map((seat) => (
+              {rowSeats.slice(aisleAfter[row] ?? Math.ceil(rowSeats.length / 2)).map((seat) => (
                 <button
                   key={seat.id}
                   onClick={() => handleSeatClick(seat.id)}
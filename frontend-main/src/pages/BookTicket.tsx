@@ -9,7 +9,7 @@ import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import { toast } from 'sonner';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from '@/components/ui/dialog';
-import { api, Show } from '@/services/api';
+import { api, Show, SeatLayout } from '@/services/api';
 import { useAuth } from '@/contexts/AuthContext';
 import SeatMap from '@/components/SeatMap';
 
@@ -25,6 +25,15 @@ const BookTicket = () => {
   const [loading, setLoading] = useState(false);
   const [bookedSeats, setBookedSeats] = useState<string[]>([]);
   const [loadingSeats, setLoadingSeats] = useState(true);
+  const [layout, setLayout] = useState<SeatLayout | null>(null);
+
+  // Screen layout: rows, tiers and surcharges (falls back to the built-in map if unavailable)
+  useEffect(() => {
+    if (!show?.screen_id) return;
+    api.getScreenLayout(show.screen_id)
+      .then(setLayout)
+      .catch(error => console.error('Failed to load seat layout:', error));
+  }, [show]);
 
   // Load booked seats when component mounts
   useEffect(() => {
@@ -46,6 +55,28 @@ const BookTicket = () => {
     loadBookedSeats();
   }, [show]);
 
+  // Keep the seat map live while the page is open
+  useEffect(() => {
+    if (!show) return;
+
+    const source = api.watchSeats(show.show_id);
+    source.addEventListener('snapshot', (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      setBookedSeats(data.booked_seats || []);
+      setLoadingSeats(false);
+    });
+    source.addEventListener('booked', (event) => {
+      const { seats } = JSON.parse((event as MessageEvent).data);
+      setBookedSeats(prev => Array.from(new Set([...prev, ...seats])));
+    });
+    source.addEventListener('released', (event) => {
+      const { seats } = JSON.parse((event as MessageEvent).data);
+      setBookedSeats(prev => prev.filter(seat => !seats.includes(seat)));
+    });
+
+    return () => source.close();
+  }, [show]);
+
   if (!show) {
     navigate('/shows');
     return null;
@@ -59,6 +90,15 @@ const BookTicket = () => {
   // Calculate total amount based on seat types
   const calculateTotalAmount = () => {
     let total = 0;
+    if (layout) {
+      const tierOf: Record<string, string> = {};
+      layout.rows.forEach(row => { tierOf[row.label] = row.tier; });
+      selectedSeats.forEach(seatId => {
+        const row = seatId.replace(/\d+$/, '');
+        total += show.base_price + (layout.surcharges[tierOf[row]] ?? 0);
+      });
+      return total;
+    }
     selectedSeats.forEach(seatId => {
       const row = seatId[0];
       const rowIndex = row.charCodeAt(0) - 'A'.charCodeAt(0);
@@ -197,6 +237,7 @@ const BookTicket = () => {
                     bookedSeats={bookedSeats}
                     onSeatSelect={setSelectedSeats}
                     maxSeats={10}
+                    layout={layout}
                   />
                 )}
               </div>
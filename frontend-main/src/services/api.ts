@@ -15,6 +15,37 @@ export interface Show {
   price_type: string;
   base_price: number;
   available_seats: number;
+  screen_id?: number;
+}
+
+export interface SeatLayoutRow {
+  label: string;
+  seats: number;
+  tier: 'standard' | 'premium' | 'vip';
+  aisles: number[];
+}
+
+export interface SeatLayout {
+  screen_id: number;
+  rows: SeatLayoutRow[];
+  blocked: string[];
+  surcharges: Record<string, number>;
+  version: number;
+}
+
+export interface NextShow {
+  show_id: number;
+  show_date: string;
+  show_time: string;
+  city: string;
+  theatre_id: number;
+  theatre_name: string;
+  screen_id: number;
+  screen_name: string;
+  price_type: string;
+  base_price: number;
+  seats_left: number;
+  tiers_left: Record<string, number>;
 }
 
 export interface Movie {
@@ -52,12 +83,13 @@ export interface Booking {
 
 export const api = {
   // Shows
-  async getShows(filters: { movie?: string; date?: string; theatre?: string; page?: number }) {
+  async getShows(filters: { movie?: string; date?: string; theatre?: string; page?: number; after?: string }) {
     const params = new URLSearchParams();
     if (filters.movie) params.append('movie', filters.movie);
     if (filters.date) params.append('date', filters.date);
     if (filters.theatre) params.append('theatre', filters.theatre);
     if (filters.page) params.append('page', filters.page.toString());
+    if (filters.after) params.append('after', filters.after);
 
     const response = await fetch(`${API_BASE_URL}/shows?${params}`, {
       credentials: 'include'
@@ -97,10 +129,13 @@ export const api = {
   },
 
   // Booking
-  async bookTicket(showId: number, selectedSeats: string[], paymentMethod: string = 'upi') {
+  async bookTicket(showId: number, selectedSeats: string[], paymentMethod: string = 'upi', idempotencyKey?: string) {
+    // Reuse the same key when retrying, so a booking that went through isn't made twice
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+    if (idempotencyKey) headers['Idempotency-Key'] = idempotencyKey;
     const response = await fetch(`${API_BASE_URL}/book`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers,
       credentials: 'include',
       body: JSON.stringify({
         show_id: showId,
@@ -131,6 +166,41 @@ export const api = {
     return response.json();
   },
 
+  // Rows, tiers, aisles and surcharges of a screen (long-cached, ETag-validated)
+  async getScreenLayout(screenId: number): Promise<SeatLayout> {
+    const response = await fetch(`${API_BASE_URL}/screen/${screenId}/layout`, {
+      credentials: 'include'
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch seat layout');
+    }
+
+    return response.json();
+  },
+
+  // Soonest upcoming shows of a movie that still have seats, optionally in one city
+  async getNextShows(movieId: number, city?: string, limit = 10): Promise<{ shows: NextShow[] }> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (city) params.set('city', city);
+    const response = await fetch(`${API_BASE_URL}/movies/${movieId}/next-shows?${params}`, {
+      credentials: 'include'
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch next shows');
+    }
+
+    return response.json();
+  },
+
+  // Live seat changes for a show (Server-Sent Events: snapshot, booked, released)
+  watchSeats(showId: number) {
+    return new EventSource(`${API_BASE_URL}/show/${showId}/seats/stream`, {
+      withCredentials: true
+    });
+  },
+
   // Get user bookings
   async getMyBookings() {
     const response = await fetch(`${API_BASE_URL}/my-bookings`, {
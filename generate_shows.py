@@ -1,79 +1,186 @@
 #!/usr/bin/env python3
-import mysql.connector
-from datetime import datetime, timedelta
-import random
+"""Generate a show schedule in bulk.
+
+Builds the whole date range in memory (2-4 random slots per active screen per
+day), drops slots that already exist (uq_showtime_slot), then writes the rest
+in chunked transactions with multi-row INSERTs or LOAD DATA LOCAL INFILE.
+
+    python generate_shows.py --days 365 --seed 42
+    python generate_shows.py --start 2026-01-01 --end 2026-06-30 --method load-data
 
-# Database connection
-conn = mysql.connector.connect(
-    host='localhost',
-    user='root',
-    password='swapnil7',
-    database='theatre_db'
-)
-cursor = conn.cursor()
+Connection settings come from the same environment/.env as db/connection.py.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
 
-# Get existing data
-cursor.execute("SELECT screen_id, capacity FROM screen")
-screens = cursor.fetchall()
+import mysql.connector
+from dotenv import load_dotenv
 
-cursor.execute("SELECT movie_id FROM movie")
-movies = [row[0] for row in cursor.fetchall()]
+from db.availability import rebuild as rebuild_availability
 
 # Time slots for shows
-time_slots = ['10:00:00', '13:30:00', '17:00:00', '20:30:00']
-price_types = ['standard', 'premium', 'vip']
-base_prices = {'standard': 220, 'premium': 300, 'vip': 400}
-
-# Generate shows from Nov 15, 2025 to May 31, 2026
-start_date = datetime(2025, 11, 15)
-end_date = datetime(2026, 5, 31)
-
-current_date = start_date
-shows_added = 0
-
-print("Generating shows...")
-
-while current_date <= end_date:
-    date_str = current_date.strftime('%Y-%m-%d')
-    
-    # Add 2-4 shows per screen per day
-    for screen_id, capacity in screens:
-        num_shows = random.randint(2, 4)
-        selected_times = random.sample(time_slots, num_shows)
-        
-        for time_slot in selected_times:
-            movie_id = random.choice(movies)
-            price_type = random.choice(price_types)
-            base_price = base_prices[price_type] + random.randint(-20, 50)
-            
+TIME_SLOTS = ['10:00:00', '13:30:00', '17:00:00', '20:30:00']
+PRICE_TYPES = ['standard', 'premium', 'vip']
+BASE_PRICES = {'standard': 220, 'premium': 300, 'vip': 400}
+
+COLUMNS = ('screen_id', 'movie_id', 'show_date', 'show_time', 'price_type', 'base_price', 'available_seats')
+
+
+def db_config():
+    load_dotenv()
+    return {
+        'host': os.getenv('MYSQL_HOST', 'localhost'),
+        'port': int(os.getenv('MYSQL_PORT', '3306')),
+        'database': os.getenv('MYSQL_DB', 'theatre_db'),
+        'user': os.getenv('MYSQL_USER', 'theatre_app'),
+        'password': os.getenv('MYSQL_PASSWORD', ''),
+    }
+
+
+def _time_str(value):
+    if isinstance(value, timedelta):
+        secs = int(value.total_seconds())
+        return f"{secs // 3600:02d}:{secs % 3600 // 60:02d}:{secs % 60:02d}"
+    return str(value)
+
+
+def build_schedule(screens, movies, start, end, rng, min_slots=2, max_slots=4):
+    """Rows (COLUMNS order) for every active screen and day in [start, end]."""
+    rows = []
+    max_slots = min(max_slots, len(TIME_SLOTS))
+    day = start
+    while day <= end:
+        date_str = day.isoformat()
+        for screen_id, capacity in screens:
+            for time_slot in rng.sample(TIME_SLOTS, rng.randint(min_slots, max_slots)):
+                price_type = rng.choice(PRICE_TYPES)
+                base_price = BASE_PRICES[price_type] + rng.randint(-20, 50)
+                rows.append((screen_id, rng.choice(movies), date_str, time_slot, price_type, base_price, capacity))
+        day += timedelta(days=1)
+    return rows
+
+
+def existing_slots(cur, start, end):
+    cur.execute(
+        "SELECT screen_id, show_date, show_time FROM showtime WHERE show_date BETWEEN %s AND %s",
+        (start, end)
+    )
+    return {(screen_id, show_date.isoformat(), _time_str(show_time)) for screen_id, show_date, show_time in cur.fetchall()}
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def insert_rows(conn, rows, batch_size):
+    """Multi-row INSERT IGNORE per chunk, one transaction per chunk. Returns rows written."""
+    written = 0
+    sql = (
+        f"INSERT IGNORE INTO showtime ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+    )
+    with conn.cursor() as cur:
+        for chunk in _chunks(rows, batch_size):
+            # mysql-connector rewrites executemany on INSERT ... VALUES into one multi-row statement
+            cur.executemany(sql, chunk)
+            written += cur.rowcount
+            conn.commit()
+    return written
+
+
+def load_rows(conn, rows, batch_size):
+    """LOAD DATA LOCAL INFILE per chunk via a temporary CSV. Returns rows written."""
+    written = 0
+    with conn.cursor() as cur:
+        for chunk in _chunks(rows, batch_size):
+            with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as fh:
+                csv.writer(fh, lineterminator='\n').writerows(chunk)
+                path = fh.name
             try:
-                cursor.execute("""
-                    INSERT INTO showtime (screen_id, movie_id, show_date, show_time, price_type, base_price, available_seats)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (screen_id, movie_id, date_str, time_slot, price_type, base_price, capacity))
-                shows_added += 1
-            except mysql.connector.IntegrityError:
-                # Skip if show already exists for this screen/date/time
-                pass
-    
-    current_date += timedelta(days=1)
-    
-    if shows_added % 100 == 0:
-        print(f"Added {shows_added} shows...")
-        conn.commit()
-
-conn.commit()
-print(f"\nTotal shows added: {shows_added}")
-
-# Verify
-cursor.execute("SELECT COUNT(*) FROM showtime")
-total = cursor.fetchone()[0]
-print(f"Total shows in database: {total}")
-
-cursor.execute("SELECT MIN(show_date), MAX(show_date) FROM showtime")
-date_range = cursor.fetchone()
-print(f"Date range: {date_range[0]} to {date_range[1]}")
-
-cursor.close()
-conn.close()
-print("Done!")
+                cur.execute(
+                    f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE showtime "
+                    f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(COLUMNS)})",
+                    (path,)
+                )
+                written += cur.rowcount
+                conn.commit()
+            finally:
+                os.unlink(path)
+    return written
+
+
+def generate(conn, start, end, seed=None, method='insert', batch_size=5000, dry_run=False):
+    """Generate and write shows for [start, end]. Returns a stats dict."""
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute("SELECT screen_id, capacity FROM screen WHERE status = 'active' ORDER BY screen_id")
+        screens = cur.fetchall()
+        cur.execute("SELECT movie_id FROM movie WHERE status IN ('now_showing', 'upcoming') ORDER BY movie_id")
+        movies = [row[0] for row in cur.fetchall()]
+        if not screens or not movies:
+            raise SystemExit('Need at least one active screen and one movie')
+        existing = existing_slots(cur, start, end)
+
+    planned = build_schedule(screens, movies, start, end, rng)
+    rows = [row for row in planned if (row[0], row[2], row[3]) not in existing]
+    t_build = time.perf_counter() - t0
+
+    written = 0
+    t1 = time.perf_counter()
+    if not dry_run and rows:
+        writer = load_rows if method == 'load-data' else insert_rows
+        written = writer(conn, rows, batch_size)
+    t_write = time.perf_counter() - t1
+    if written:
+        # Bulk writes bypass the per-show upkeep of the next-shows summary
+        rebuild_availability(conn, start, end)
+
+    return {
+        'screens': len(screens),
+        'days': (end - start).days + 1,
+        'planned': len(planned),
+        'already_present': len(planned) - len(rows),
+        'written': written,
+        'build_seconds': round(t_build, 3),
+        'write_seconds': round(t_write, 3),
+        'rows_per_second': round(written / t_write) if t_write > 0 and written else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk-generate showtimes for every active screen.')
+    parser.add_argument('--start', type=date.fromisoformat, default=date.today(), help='first day (YYYY-MM-DD), default today')
+    parser.add_argument('--end', type=date.fromisoformat, help='last day (YYYY-MM-DD); overrides --days')
+    parser.add_argument('--days', type=int, default=200, help='number of days from --start (default 200)')
+    parser.add_argument('--seed', type=int, help='RNG seed for a reproducible schedule')
+    parser.add_argument('--method', choices=['insert', 'load-data'], default='insert')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per transaction')
+    parser.add_argument('--dry-run', action='store_true', help='plan and dedupe only, write nothing')
+    args = parser.parse_args(argv)
+
+    end = args.end or args.start + timedelta(days=args.days - 1)
+    conn = mysql.connector.connect(**db_config(), allow_local_infile=args.method == 'load-data')
+    try:
+        print(f"Generating shows from {args.start} to {end}...")
+        stats = generate(conn, args.start, end, seed=args.seed, method=args.method,
+                         batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        conn.close()
+
+    print(f"Screens: {stats['screens']}, days: {stats['days']}")
+    print(f"Planned {stats['planned']} shows, {stats['already_present']} already present")
+    print(f"Wrote {stats['written']} shows in {stats['write_seconds']}s "
+          f"({stats['rows_per_second']} rows/s, planning took {stats['build_seconds']}s)")
+    print("Done!")
+
+
+if __name__ == '__main__':
+    main()
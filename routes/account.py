@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, session, redirect, url_for, flash
 from db.connection import get_conn
+from db.routing import read_only
 
-account_bp = Blueprint('account', __name__, url_prefix='/')
+account_bp = read_only(Blueprint('account', __name__, url_prefix='/'))
 
 @account_bp.get('my_bookings')
 def my_bookings():
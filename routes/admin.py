@@ -1,8 +1,14 @@
 from datetime import datetime, timedelta
 from flask import Blueprint, render_template, jsonify, request, session, redirect, url_for, flash
-from db.connection import get_conn
+from db.connection import get_conn, pool_stats
+from db.instrument import sql_stats, explain
+from db.routing import read_only
+from utils.procinfo import process_stats
+from utils.passwords import password_pool
+from utils.sessions import session_stats
+from utils.idempotency import idempotent_requests
 
-admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+admin_bp = read_only(Blueprint('admin', __name__, url_prefix='/admin'))
 
 @admin_bp.before_request
 def _admin_guard():
@@ -21,13 +27,14 @@ def dashboard():
     bookings_count_30 = 0
     with get_conn() as conn:
         with conn.cursor() as cur:
-            # Use stored procedure for revenue
-            args = [start_30, today, 0]
-            res = cur.callproc('sp_get_total_revenue', args)
-            total_revenue_30 = float(res[2]) if res[2] is not None else 0.0
-            # Count confirmed bookings last 30 days
-            cur.execute("SELECT COUNT(*) FROM booking WHERE status='confirmed' AND booking_time BETWEEN %s AND %s", (start_30, today))
-            bookings_count_30 = cur.fetchone()[0]
+            # Revenue and confirmed bookings over the last 30 days, from the daily rollup
+            cur.execute(
+                "SELECT IFNULL(SUM(revenue),0), IFNULL(SUM(bookings),0) FROM revenue_daily WHERE day BETWEEN %s AND %s",
+                (start_30.date(), today.date())
+            )
+            revenue, bookings = cur.fetchone()
+            total_revenue_30 = float(revenue)
+            bookings_count_30 = int(bookings)
 
     return render_template('admin_dashboard.html', kpis={
         'total_revenue_30': total_revenue_30,
@@ -40,7 +47,11 @@ def chart_revenue_by_theatre():
     data = []
     with get_conn() as conn:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT theatre_name, total_revenue FROM v_theatre_revenue ORDER BY total_revenue DESC")
+            cur.execute(
+                "SELECT t.name AS theatre_name, IFNULL(SUM(r.revenue),0) AS total_revenue "
+                "FROM theatre t LEFT JOIN revenue_daily r ON r.theatre_id=t.theatre_id "
+                "GROUP BY t.theatre_id, t.name ORDER BY total_revenue DESC"
+            )
             rows = cur.fetchall()
             for r in rows:
                 labels.append(r['theatre_name'])
@@ -54,9 +65,9 @@ def chart_top_movies():
     with get_conn() as conn:
         with conn.cursor(dictionary=True) as cur:
             cur.execute(
-                "SELECT m.title AS movie, IFNULL(SUM(b.total_amount),0) AS rev "
-                "FROM booking b JOIN showtime s ON b.show_id=s.show_id JOIN movie m ON s.movie_id=m.movie_id "
-                "WHERE b.status='confirmed' GROUP BY m.movie_id ORDER BY rev DESC LIMIT 5"
+                "SELECT m.title AS movie, IFNULL(SUM(r.revenue),0) AS rev "
+                "FROM revenue_daily r JOIN movie m ON r.movie_id=m.movie_id "
+                "GROUP BY r.movie_id, m.title ORDER BY rev DESC LIMIT 5"
             )
             for r in cur.fetchall():
                 labels.append(r['movie'])
@@ -83,3 +94,47 @@ def chart_occupancy():
                 labels.append(r['movie'])
                 data.append(round(occ * 100, 2))
     return jsonify({'labels': labels, 'data': data})
+
+@admin_bp.get('/metrics/pool')
+def metrics_pool():
+    # Connection pool counters: checkouts, in-use, waits and exhaustion events
+    return jsonify(pool_stats())
+
+@admin_bp.get('/metrics/process')
+def metrics_process():
+    # This worker's startup timings (create_app, warmup, fork-to-ready) and memory
+    return jsonify(process_stats())
+
+@admin_bp.get('/metrics/passwords')
+def metrics_passwords():
+    # Password hashing pool: in-flight jobs, rejections (429s), timeouts and average latency
+    return jsonify(password_pool.stats())
+
+@admin_bp.get('/metrics/sessions')
+def metrics_sessions():
+    # Session store size and user cache hit ratio (misses are the only customer reads)
+    return jsonify(session_stats())
+
+@admin_bp.get('/metrics/idempotency')
+def metrics_idempotency():
+    # Idempotency-Key replays (from memory or the table), coalesced duplicates and bookings run
+    return jsonify(idempotent_requests.stats())
+
+@admin_bp.get('/metrics/sql')
+def metrics_sql():
+    # Statement counts, time and rows per endpoint + fingerprint since startup
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    order_by = request.args.get('order', 'total_ms')
+    if order_by not in ('total_ms', 'avg_ms', 'max_ms', 'count', 'rows'):
+        return jsonify({'error': "order must be one of total_ms, avg_ms, max_ms, count, rows"}), 400
+    return jsonify(sql_stats.summary(limit=limit, order_by=order_by))
+
+@admin_bp.get('/metrics/sql/explain')
+def metrics_sql_explain():
+    # EXPLAIN for the last slow sample of a SELECT fingerprint (see "explainable")
+    fp = request.args.get('fingerprint', '')
+    if sql_stats.slow_sample(fp) is None:
+        return jsonify({'error': 'No slow sample recorded for that fingerprint'}), 404
+    with get_conn() as conn:
+        plan = explain(conn, fp)
+    return jsonify({'fingerprint': fp, 'plan': plan})
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from db.connection import get_conn
+from utils.sessions import invalidate_user, revoke_sessions
 
 customers_admin_bp = Blueprint('customers_admin', __name__, url_prefix='/admin/customers')
 
@@ -22,7 +23,7 @@ def customers_list():
 def customers_edit_get(cust_id: int):
     with get_conn() as conn:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT cust_id, name, email, contact_no, membership_status FROM customer WHERE cust_id=%s", (cust_id,))
+            cur.execute("SELECT cust_id, name, email, contact_no, membership_status, role FROM customer WHERE cust_id=%s", (cust_id,))
             item = cur.fetchone()
     if not item:
         flash('Customer not found', 'warning')
@@ -34,15 +35,26 @@ def customers_edit_post(cust_id: int):
     name = request.form.get('name','').strip()
     contact_no = request.form.get('contact_no','').strip() or None
     membership_status = request.form.get('membership_status','none')
+    role = request.form.get('role', 'customer')
+    if role not in ('customer', 'admin'):
+        role = 'customer'
     if not name:
         flash('Name is required', 'danger')
         return redirect(url_for('customers_admin.customers_edit_get', cust_id=cust_id))
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
-                "UPDATE customer SET name=%s, contact_no=%s, membership_status=%s WHERE cust_id=%s",
-                (name, contact_no, membership_status, cust_id)
+                "UPDATE customer SET name=%s, contact_no=%s, membership_status=%s, role=%s WHERE cust_id=%s",
+                (name, contact_no, membership_status, role, cust_id)
             )
             conn.commit()
+    # Their open sessions pick up the new name/role on the next request
+    invalidate_user(cust_id)
     flash('Customer updated', 'success')
     return redirect(url_for('customers_admin.customers_list'))
+
+@customers_admin_bp.post('/<int:cust_id>/revoke-sessions')
+def customers_revoke_sessions(cust_id: int):
+    revoked = revoke_sessions(cust_id)
+    flash(f'Signed out of {revoked} session(s)', 'success')
+    return redirect(url_for('customers_admin.customers_edit_get', cust_id=cust_id))
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from db.connection import get_conn
+from utils.response_cache import response_cache
 
 movies_admin_bp = Blueprint('movies_admin', __name__, url_prefix='/admin/movies')
 
@@ -44,6 +45,7 @@ def movies_add_post():
                 (title, duration, genre, language, rating, release_date, status)
             )
             conn.commit()
+    response_cache.invalidate('movies', 'search')
     flash('Movie added', 'success')
     return redirect(url_for('movies_admin.movies_list'))
 
@@ -79,6 +81,7 @@ def movies_edit_post(movie_id: int):
                 (title, duration, genre, language, rating, release_date, status, movie_id)
             )
             conn.commit()
+    response_cache.invalidate('movies', 'search')
     flash('Movie updated', 'success')
     return redirect(url_for('movies_admin.movies_list'))
 
@@ -89,6 +92,7 @@ def movies_delete(movie_id: int):
             with conn.cursor() as cur:
                 cur.execute("DELETE FROM movie WHERE movie_id=%s", (movie_id,))
                 conn.commit()
+        response_cache.invalidate('movies', 'search')
         flash('Movie deleted', 'info')
     except Exception:
         flash('Cannot delete movie that has scheduled shows', 'warning')
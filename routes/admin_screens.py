@@ -1,5 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
+from mysql.connector import errors, errorcode
 from db.connection import get_conn
+from db.seat_layout import clear_layout_cache
+from db.availability import refresh as refresh_availability
+from utils.response_cache import response_cache
 
 screens_admin_bp = Blueprint('screens_admin', __name__, url_prefix='/admin/screens')
 
@@ -48,6 +52,7 @@ def screens_add_post():
                     (theatre_id, name, type_, capacity, status)
                 )
                 conn.commit()
+        response_cache.invalidate('screens')
         flash('Screen added', 'success')
     except Exception:
         flash('Add failed (duplicate name in theatre?)', 'warning')
@@ -85,8 +90,18 @@ def screens_edit_post(screen_id: int):
                     "UPDATE screen SET theatre_id=%s, name=%s, type=%s, capacity=%s, status=%s WHERE screen_id=%s",
                     (theatre_id, name, type_, capacity, status, screen_id)
                 )
+                # Capacity (and so the tiers) or the theatre may have changed
+                refresh_availability(conn, screen_id=screen_id)
                 conn.commit()
+        clear_layout_cache(screen_id)
+        response_cache.invalidate('screens')
         flash('Screen updated', 'success')
+    except errors.Error as e:
+        if e.errno == errorcode.ER_SIGNAL_EXCEPTION:
+            # trg_screen_before_update: the screen's shows already have bookings
+            flash(e.msg, 'warning')
+        else:
+            flash('Update failed', 'warning')
     except Exception:
         flash('Update failed', 'warning')
     return redirect(url_for('screens_admin.screens_list'))
@@ -98,7 +113,10 @@ def screens_delete(screen_id: int):
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("DELETE FROM screen WHERE screen_id=%s", (screen_id,))
+                refresh_availability(conn, screen_id=screen_id)
                 conn.commit()
+        clear_layout_cache(screen_id)
+        response_cache.invalidate('screens')
         flash('Screen deleted', 'info')
     except Exception:
         flash('Cannot delete screen with scheduled shows', 'warning')
@@ -1,5 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
+from mysql.connector import errors, errorcode
 from db.connection import get_conn
+from db.show_listing import clear_count_cache
+from db.availability import refresh as refresh_availability
 
 shows_admin_bp = Blueprint('shows_admin', __name__, url_prefix='/admin/shows')
 
@@ -66,7 +69,9 @@ def shows_add_post():
                     "VALUES (%s,%s,%s,%s,%s,%s,0)",
                     (screen_id, movie_id, show_date, show_time, price_type, base_price)
                 )
+                refresh_availability(conn, show_id=cur.lastrowid)
                 conn.commit()
+        clear_count_cache()
         flash('Show added', 'success')
     except Exception:
         flash('Add failed (duplicate show slot or invalid data)', 'warning')
@@ -105,8 +110,16 @@ def shows_edit_post(show_id: int):
                     "UPDATE showtime SET screen_id=%s, movie_id=%s, show_date=%s, show_time=%s, price_type=%s, base_price=%s WHERE show_id=%s",
                     (screen_id, movie_id, show_date, show_time, price_type, base_price, show_id)
                 )
+                refresh_availability(conn, show_id=show_id)
                 conn.commit()
+        clear_count_cache()
         flash('Show updated', 'success')
+    except errors.Error as e:
+        if e.errno == errorcode.ER_SIGNAL_EXCEPTION:
+            # trg_showtime_before_update: the show already has bookings
+            flash(e.msg, 'warning')
+        else:
+            flash('Update failed (duplicate show slot?)', 'warning')
     except Exception:
         flash('Update failed (duplicate show slot?)', 'warning')
     return redirect(url_for('shows_admin.shows_list'))
@@ -118,7 +131,9 @@ def shows_delete(show_id: int):
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("DELETE FROM showtime WHERE show_id=%s", (show_id,))
+                refresh_availability(conn, show_id=show_id)
                 conn.commit()
+        clear_count_cache()
         flash('Show deleted', 'info')
     except Exception:
         flash('Cannot delete show with bookings', 'warning')
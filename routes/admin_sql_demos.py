@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, request, flash
 from db.connection import get_conn
+from db.routing import read_only
 
-sql_demos_bp = Blueprint('sql_demos', __name__, url_prefix='/admin/sql-demos')
+sql_demos_bp = read_only(Blueprint('sql_demos', __name__, url_prefix='/admin/sql-demos'))
 
 @sql_demos_bp.get('/')
 def index():
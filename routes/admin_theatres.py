@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from db.connection import get_conn
+from utils.response_cache import response_cache
 
 theatres_admin_bp = Blueprint('theatres_admin', __name__, url_prefix='/admin/theatres')
 
@@ -32,6 +33,7 @@ def theatres_add_post():
                     (name, city, contact_no, address)
                 )
                 conn.commit()
+        response_cache.invalidate('theatres', 'screens', 'search')
         flash('Theatre added', 'success')
     except Exception:
         flash('Theatre add failed (maybe duplicate name in city)', 'warning')
@@ -64,7 +66,13 @@ def theatres_edit_post(theatre_id: int):
                     "UPDATE theatre SET name=%s, city=%s, contact_no=%s, address=%s WHERE theatre_id=%s",
                     (name, city, contact_no, address, theatre_id)
                 )
+                # Denormalized into the next-shows summary
+                cur.execute(
+                    "UPDATE show_availability SET city=%s, theatre_name=%s WHERE theatre_id=%s",
+                    (city, name, theatre_id)
+                )
                 conn.commit()
+        response_cache.invalidate('theatres', 'screens', 'search')
         flash('Theatre updated', 'success')
     except Exception:
         flash('Update failed', 'warning')
@@ -76,7 +84,9 @@ def theatres_delete(theatre_id: int):
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("DELETE FROM theatre WHERE theatre_id=%s", (theatre_id,))
+                cur.execute("DELETE FROM show_availability WHERE theatre_id=%s", (theatre_id,))
                 conn.commit()
+        response_cache.invalidate('theatres', 'screens', 'search')
         flash('Theatre deleted', 'info')
     except Exception:
         flash('Cannot delete theatre with linked screens', 'warning')
@@ -1,120 +1,174 @@
-from flask import Blueprint, jsonify, request, session
+import os
+import csv
+import io
+import hashlib
+import threading
+import time
+import zlib
+from flask import Blueprint, jsonify, request, session, make_response, Response, stream_with_context
 from db.connection import get_conn
-from datetime import datetime
+from db.booking import book_seats, book_batch, BookingError, normalize_seats
+from db.holds import place_hold, release_hold, load_live_holds, purge_hold
+from db.show_listing import fetch_page, count_shows, decode_cursor, clear_count_cache
+from db.seat_layout import get_layout
+from db.availability import release_seats as release_availability, refresh as refresh_availability, rebuild as rebuild_availability, next_shows
+from db.search import search_movies, search_theatres, next_shows_for_movies, next_shows_for_theatres
+from utils.seat_cache import seat_maps
+from utils.seat_events import seat_events, format_event, TooManySubscribers
+from utils.holds import seat_holds
+from utils.response_cache import response_cache
+from utils.jsonrows import row_encoder, fetch_dicts, json_response, dumps, stream_json_array
+from utils.auth import check_login
+from utils.passwords import hash_password
+from utils.idempotency import idempotent_requests, request_hash, valid_key, KEY_MAX_LENGTH
+from datetime import date, datetime, timedelta, timezone
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+SEAT_STREAM_HEARTBEAT = int(os.getenv('SEAT_STREAM_HEARTBEAT', '15'))
+SEAT_STREAM_RETRY_MS = 3000
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '30'))
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '64'))
+# Seat maps re-read a show's holds from seat_hold this often, to see other workers' holds
+HOLD_SYNC_SECONDS = float(os.getenv('HOLD_SYNC_SECONDS', '1'))
+
 @api_bp.route('/shows', methods=['GET'])
 def get_shows():
-    """Get all shows with filters"""
-    movie = request.args.get('movie', '').strip()
-    date = request.args.get('date', '').strip()
-    theatre = request.args.get('theatre', '').strip()
-    page = int(request.args.get('page', 1))
-    per_page = 12
-    
-    # Build query
-    query = """
-        SELECT s.show_id, m.title as movie_title, m.genre, m.language, m.rating,
-               t.name as theatre_name, t.city, sc.name as screen_name, sc.type as screen_type,
-               s.show_date, s.show_time, s.price_type, s.base_price, s.available_seats
-        FROM showtime s
-        JOIN movie m ON s.movie_id = m.movie_id
-        JOIN screen sc ON s.screen_id = sc.screen_id
-        JOIN theatre t ON sc.theatre_id = t.theatre_id
-        WHERE s.show_date >= CURDATE()
+    """Get shows with filters.
+
+    Supports numbered pages (``page``) and keyset paging (``after``, taken from
+    a previous response's ``next_cursor``). ``total`` is 'cached' by default,
+    'exact' on request, or 'none' to skip counting; keyset requests skip it
+    unless asked.
     """
-    
-    params = []
-    if movie:
-        query += " AND m.title LIKE %s"
-        params.append(f"%{movie}%")
-    if date:
-        query += " AND s.show_date = %s"
-        params.append(date)
-    if theatre:
-        query += " AND t.name LIKE %s"
-        params.append(f"%{theatre}%")
-    
-    query += " ORDER BY s.show_date, s.show_time"
-    
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            # Get total count first
-            count_query = """
-                SELECT COUNT(*) as total
-                FROM showtime s
-                JOIN movie m ON s.movie_id = m.movie_id
-                JOIN screen sc ON s.screen_id = sc.screen_id
-                JOIN theatre t ON sc.theatre_id = t.theatre_id
-                WHERE s.show_date >= CURDATE()
-            """
-            count_params = []
-            if movie:
-                count_query += " AND m.title LIKE %s"
-                count_params.append(f"%{movie}%")
-            if date:
-                count_query += " AND s.show_date = %s"
-                count_params.append(date)
-            if theatre:
-                count_query += " AND t.name LIKE %s"
-                count_params.append(f"%{theatre}%")
-            
-            cur.execute(count_query, count_params)
-            total = cur.fetchone()['total']
-            
-            # Get paginated results
-            query += " LIMIT %s OFFSET %s"
-            params.extend([per_page, (page - 1) * per_page])
-            cur.execute(query, params)
-            shows = cur.fetchall()
-            
-            # Convert datetime objects to strings
-            for show in shows:
-                if show['show_date']:
-                    show['show_date'] = show['show_date'].strftime('%Y-%m-%d')
-                if show['show_time']:
-                    show['show_time'] = str(show['show_time'])
-                if show['base_price']:
-                    show['base_price'] = float(show['base_price'])
-    
-    return jsonify({
+    filters = {
+        'movie': request.args.get('movie', '').strip(),
+        'date': request.args.get('date', '').strip(),
+        'theatre': request.args.get('theatre', '').strip(),
+    }
+    page = max(int(request.args.get('page', 1) or 1), 1)
+    per_page = 12
+    after_token = request.args.get('after', '').strip()
+
+    after = None
+    if after_token:
+        try:
+            after = decode_cursor(after_token)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    count_mode = request.args.get('total', 'none' if after else 'cached')
+    if count_mode not in ('exact', 'cached', 'none'):
+        return jsonify({'error': "total must be one of 'exact', 'cached', 'none'"}), 400
+
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
+            rows, next_cursor = fetch_page(cur, 'api', filters, per_page, after=after, page=page)
+            shows = row_encoder(cur.description).dicts(rows)
+            total = count_shows(cur, 'api', filters, mode=count_mode)
+
+    return json_response({
         'shows': shows,
         'total': total,
-        'page': page,
+        'page': None if after else page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': (total + per_page - 1) // per_page if total is not None else None,
+        'next_cursor': next_cursor
     })
 
 @api_bp.route('/movies', methods=['GET'])
+@response_cache.cached('movies')
 def get_movies():
     """Get all movies"""
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
             cur.execute("SELECT * FROM movie WHERE status = 'now_showing' ORDER BY title")
-            movies = cur.fetchall()
-            
-            for movie in movies:
-                if movie['release_date']:
-                    movie['release_date'] = movie['release_date'].strftime('%Y-%m-%d')
-                if movie['rating']:
-                    movie['rating'] = float(movie['rating'])
+            movies = fetch_dicts(cur)
     
-    return jsonify({'movies': movies})
+    return json_response({'movies': movies})
+
+@api_bp.route('/movies/<int:movie_id>/next-shows', methods=['GET'])
+def get_next_shows(movie_id):
+    """Next upcoming shows of a movie that still have seats, soonest first.
+
+    ``city`` narrows to one city (a single index range scan of the
+    show_availability summary); ``limit`` caps the shows (default 10). Each
+    show carries ``seats_left`` and ``tiers_left`` (seats left per tier).
+    """
+    city = request.args.get('city', '').strip()[:80]
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
+            rows = next_shows(cur, movie_id, city or None, limit)
+            shows = row_encoder(cur.description).dicts(rows)
+    return json_response({'movie_id': movie_id, 'city': city or None, 'shows': shows})
 
 @api_bp.route('/theatres', methods=['GET'])
+@response_cache.cached('theatres')
 def get_theatres():
     """Get all theatres"""
-    with get_conn() as conn:
+    with get_conn(readonly=True) as conn:
         with conn.cursor(dictionary=True) as cur:
             cur.execute("SELECT * FROM theatre ORDER BY city, name")
             theatres = cur.fetchall()
     
     return jsonify({'theatres': theatres})
 
+@api_bp.route('/search', methods=['GET'])
+@response_cache.cached('search', ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_SIZE)
+def search():
+    """Typeahead search: ranked movies and theatres, each with its next shows.
+
+    ``q`` is matched as word prefixes against movie titles and theatre
+    names/cities; ``type`` narrows to 'movies' or 'theatres'; ``limit`` caps
+    hits per type and ``shows`` the upcoming shows per hit.
+    """
+    q = request.args.get('q', '').strip()[:100]
+    if not q:
+        return jsonify({'error': 'q is required'}), 400
+    kind = request.args.get('type', 'all')
+    if kind not in ('all', 'movies', 'theatres'):
+        return jsonify({'error': "type must be 'all', 'movies' or 'theatres'"}), 400
+    limit = min(max(request.args.get('limit', 8, type=int), 1), 20)
+    per_hit = min(max(request.args.get('shows', 3, type=int), 0), 10)
+
+    result = {'query': q}
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
+            if kind in ('all', 'movies'):
+                rows = search_movies(cur, q, limit)
+                movies = row_encoder(cur.description).dicts(rows)
+                _attach_next_shows(cur, movies, 'movie_id', next_shows_for_movies, per_hit)
+                result['movies'] = movies
+            if kind in ('all', 'theatres'):
+                rows = search_theatres(cur, q, limit)
+                theatres = row_encoder(cur.description).dicts(rows)
+                _attach_next_shows(cur, theatres, 'theatre_id', next_shows_for_theatres, per_hit)
+                result['theatres'] = theatres
+    return json_response(result)
+
+def _attach_next_shows(cur, hits, key, fetch_next, per_hit):
+    """Set hit['next_shows'] for every hit from one batched query."""
+    by_id = {hit[key]: hit for hit in hits}
+    for hit in hits:
+        hit['next_shows'] = []
+    if not by_id or not per_hit:
+        return
+    rows = fetch_next(cur, list(by_id), per_hit)
+    encoder = row_encoder(cur.description)
+    for row in rows:
+        show = encoder.encode(row)
+        by_id[show.pop(key)]['next_shows'].append(show)
+
 @api_bp.route('/book', methods=['POST'])
 def book_ticket():
-    """Book a ticket with specific seats"""
+    """Book a ticket with specific seats.
+
+    With an ``Idempotency-Key`` header a retry (or a duplicate sent while the
+    first is still running) gets the first request's response instead of
+    booking again; see utils/idempotency.py.
+    """
     print(f"Booking session data: {dict(session)}")  # Debug log
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
@@ -134,91 +188,108 @@ def book_ticket():
     
     if not selected_seats or len(selected_seats) == 0:
         return jsonify({'error': 'Please select at least one seat'}), 400
-    
+
+    cust_id = session['user_id']
+    key = request.headers.get('Idempotency-Key')
+    if key is None:
+        body, status = _book(cust_id, show_id, selected_seats, payment_method)
+        return jsonify(body), status
+    if not valid_key(key):
+        return jsonify({'error': f'Idempotency-Key must be 1-{KEY_MAX_LENGTH} printable ASCII characters'}), 400
+    return idempotent_requests.run(
+        cust_id, key, request_hash(data),
+        lambda record: _book(cust_id, show_id, selected_seats, payment_method, record)
+    )
+
+def _booked_body(booking_id, total_amount, seats):
+    return {
+        'success': True,
+        'booking_id': booking_id,
+        'total_amount': float(total_amount),
+        'message': f'Seats {", ".join(seats)} booked successfully!',
+        'booked_seats': seats
+    }
+
+def _book(cust_id, show_id, selected_seats, payment_method, record=None):
+    """Run a booking; returns (body, status). ``record`` stores an idempotent response with it."""
+    before_commit = None
+    if record is not None:
+        before_commit = lambda cur, booking_id, total_amount, seats: record(
+            cur, 200, _booked_body(booking_id, total_amount, seats)
+        )
     try:
         with get_conn() as conn:
-            with conn.cursor(dictionary=True) as cur:
-                # Check if any of the selected seats are already booked
-                seat_placeholders = ','.join(['%s'] * len(selected_seats))
-                cur.execute(f"""
-                    SELECT seat_id FROM seat_booking 
-                    WHERE show_id = %s AND seat_id IN ({seat_placeholders}) AND status = 'booked'
-                """, [show_id] + selected_seats)
-                
-                already_booked = cur.fetchall()
-                if already_booked:
-                    booked_seats = [seat['seat_id'] for seat in already_booked]
-                    return jsonify({
-                        'error': f'Seats {", ".join(booked_seats)} are already booked. Please select different seats.'
-                    }), 400
-                
-                # Check show availability
-                cur.execute("SELECT available_seats, base_price FROM showtime WHERE show_id = %s", (show_id,))
-                show_info = cur.fetchone()
-                
-                if not show_info:
-                    return jsonify({'error': 'Show not found'}), 404
-                
-                if show_info['available_seats'] < len(selected_seats):
-                    return jsonify({'error': 'Not enough seats available'}), 400
-                
-                # Calculate total amount based on seat types
-                base_price = show_info['base_price']
-                total_amount = 0
-                
-                for seat_id in selected_seats:
-                    # Determine seat type based on row
-                    row = seat_id[0]  # First character is the row (A, B, C, etc.)
-                    row_index = ord(row) - ord('A')  # Convert A=0, B=1, C=2, etc.
-                    
-                    if row_index < 3:  # Standard seats (rows A, B, C)
-                        seat_price = base_price
-                    elif row_index < 7:  # Premium seats (rows D, E, F, G)
-                        seat_price = base_price + 100
-                    else:  # VIP seats (rows H, I, J+)
-                        seat_price = base_price + 200
-                    
-                    total_amount += seat_price
-                
-                # Create booking record
-                cur.execute("""
-                    INSERT INTO booking (cust_id, show_id, seats_booked, total_amount, payment_method, status)
-                    VALUES (%s, %s, %s, %s, %s, 'confirmed')
-                """, (session['user_id'], show_id, len(selected_seats), total_amount, payment_method))
-                
-                booking_id = cur.lastrowid
-                
-                # Insert individual seat bookings
-                for seat_id in selected_seats:
-                    cur.execute("""
-                        INSERT INTO seat_booking (booking_id, show_id, seat_id, status)
-                        VALUES (%s, %s, %s, 'booked')
-                    """, (booking_id, show_id, seat_id))
-                
-                # Update available seats
-                cur.execute("""
-                    UPDATE showtime SET available_seats = available_seats - %s
-                    WHERE show_id = %s
-                """, (len(selected_seats), show_id))
-                
-                conn.commit()
-                
-                return jsonify({
-                    'success': True,
-                    'booking_id': booking_id,
-                    'message': f'Seats {", ".join(selected_seats)} booked successfully!',
-                    'booked_seats': selected_seats
-                })
-                    
+            booking_id, total_amount, seats = book_seats(
+                conn, cust_id, show_id, selected_seats, payment_method, before_commit
+            )
+    except BookingError as e:
+        body = {'error': e.message}
+        if e.conflicts:
+            body['conflicts'] = e.conflicts
+        return body, e.status
     except Exception as e:
         print(f"Booking error: {str(e)}")
+        return {'error': f'Booking failed: {str(e)}'}, 500
+
+    _after_booking(int(show_id), cust_id, seats)
+    return _booked_body(booking_id, total_amount, seats), 200
+
+def _after_booking(show_id, cust_id, seats):
+    seat_maps.mark_booked(show_id, seats)
+    seat_events.publish(show_id, 'booked', seats)
+    _drop_indexed_hold(show_id, cust_id, keep=seats)
+
+@api_bp.route('/bookings/batch', methods=['POST'])
+def book_ticket_batch():
+    """Book seats on several shows in one transaction (group and corporate orders).
+
+    Body: {"items": [{"show_id": 1, "seats": ["A1", "A2"]}, ...],
+    "mode": "atomic" (default, all or nothing) or "best_effort",
+    "payment_method": "upi"}. Responds with one result per item; 200 when
+    anything was booked, else the status of the first failure.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list of {show_id, seats}'}), 400
+    mode = data.get('mode', 'atomic')
+    if mode not in ('atomic', 'best_effort'):
+        return jsonify({'error': "mode must be 'atomic' or 'best_effort'"}), 400
+    payment_method = data.get('payment_method', 'upi')
+
+    try:
+        with get_conn() as conn:
+            results = book_batch(conn, session['user_id'], items, payment_method, atomic=mode == 'atomic')
+    except BookingError as e:
+        body = {'error': e.message}
+        if e.conflicts:
+            body['conflicts'] = e.conflicts
+        return jsonify(body), e.status
+    except Exception as e:
+        print(f"Batch booking error: {str(e)}")
         return jsonify({'error': f'Booking failed: {str(e)}'}), 500
 
+    booked = [r for r in results if r['status'] == 'booked']
+    for result in booked:
+        result['total_amount'] = float(result['total_amount'])
+        _after_booking(result['show_id'], session['user_id'], result['seats'])
+
+    status = 200 if booked else next(r.get('code', 409) for r in results if r['status'] == 'failed')
+    return jsonify({
+        'success': len(booked) == len(results),
+        'mode': mode,
+        'booked': len(booked),
+        'failed': len(results) - len(booked),
+        'total_amount': sum(r['total_amount'] for r in booked),
+        'results': results
+    }), status
+
 @api_bp.route('/auth/login', methods=['POST'])
 def api_login():
     """API login endpoint"""
-    from passlib.hash import pbkdf2_sha256 as bcrypt
-    
     data = request.get_json()
     email = data.get('email', '').strip().lower()
     password = data.get('password', '')
@@ -226,12 +297,8 @@ def api_login():
     if not (email and password):
         return jsonify({'error': 'Email and password required'}), 400
     
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT cust_id, name, email, role, password_hash FROM customer WHERE email=%s", (email,))
-            user = cur.fetchone()
-    
-    if not user or not bcrypt.verify(password, user['password_hash']):
+    user = check_login(email, password)
+    if not user:
         return jsonify({'error': 'Invalid credentials'}), 401
     
     session['user_id'] = user['cust_id']
@@ -251,8 +318,6 @@ def api_login():
 @api_bp.route('/auth/register', methods=['POST'])
 def api_register():
     """API registration endpoint"""
-    from passlib.hash import pbkdf2_sha256 as bcrypt
-    
     data = request.get_json()
     name = data.get('name', '').strip()
     email = data.get('email', '').strip().lower()
@@ -262,8 +327,9 @@ def api_register():
     if not (name and email and password):
         return jsonify({'error': 'Name, email, and password are required'}), 400
     
+    # Outside the try below: a saturated hashing pool is a 429, not a failed registration
+    password_hash = hash_password(password)
     try:
-        password_hash = bcrypt.hash(password)
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute(
@@ -297,6 +363,35 @@ def get_current_user():
         }
     })
 
+def _stream_bookings(sql, params=()):
+    """Stream ``{"bookings": [...]}`` for a booking list query, row batch by row batch.
+
+    Rows come off an unbuffered cursor EXPORT_BATCH_SIZE at a time, so a long
+    booking history is never held in memory as a list of dicts.
+    """
+    # Checked out up front so PoolExhausted still becomes a 503
+    conn = get_conn(readonly=True)
+
+    def generate():
+        finished = False
+        try:
+            cur = conn.cursor(buffered=False)
+            cur.execute(sql, params)
+            yield from stream_json_array(cur, head=b'{"bookings":[', tail=b']}', batch_size=EXPORT_BATCH_SIZE)
+            cur.close()
+            finished = True
+        finally:
+            if finished:
+                conn.close()
+            else:
+                # Unread rows left on the connection: it can't go back to the pool
+                conn.discard()
+
+    resp = Response(stream_with_context(generate()), mimetype='application/json')
+    # No-op if the stream ran; releases the connection if it never started
+    resp.call_on_close(conn.close)
+    return resp
+
 @api_bp.route('/my-bookings', methods=['GET'])
 def get_my_bookings():
     """Get current user's bookings"""
@@ -305,35 +400,19 @@ def get_my_bookings():
         print("No user_id in session, returning 401")
         return jsonify({'error': 'Authentication required'}), 401
     
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("""
-                SELECT b.booking_id, b.show_id, b.seats_booked, b.total_amount, 
-                       b.booking_time, b.status,
-                       m.title as movie_title, t.name as theatre_name, 
-                       sc.name as screen_name, s.show_date, s.show_time
-                FROM booking b
-                JOIN showtime s ON b.show_id = s.show_id
-                JOIN movie m ON s.movie_id = m.movie_id
-                JOIN screen sc ON s.screen_id = sc.screen_id
-                JOIN theatre t ON sc.theatre_id = t.theatre_id
-                WHERE b.cust_id = %s
-                ORDER BY b.booking_time DESC
-            """, (session['user_id'],))
-            bookings = cur.fetchall()
-            
-            # Convert datetime objects to strings
-            for booking in bookings:
-                if booking['booking_time']:
-                    booking['booking_time'] = booking['booking_time'].strftime('%Y-%m-%d %H:%M:%S')
-                if booking['show_date']:
-                    booking['show_date'] = booking['show_date'].strftime('%Y-%m-%d')
-                if booking['show_time']:
-                    booking['show_time'] = str(booking['show_time'])
-                if booking['total_amount']:
-                    booking['total_amount'] = float(booking['total_amount'])
-    
-    return jsonify({'bookings': bookings})
+    return _stream_bookings("""
+        SELECT b.booking_id, b.show_id, b.seats_booked, b.total_amount, 
+               b.booking_time, b.status,
+               m.title as movie_title, t.name as theatre_name, 
+               sc.name as screen_name, s.show_date, s.show_time
+        FROM booking b
+        JOIN showtime s ON b.show_id = s.show_id
+        JOIN movie m ON s.movie_id = m.movie_id
+        JOIN screen sc ON s.screen_id = sc.screen_id
+        JOIN theatre t ON sc.theatre_id = t.theatre_id
+        WHERE b.cust_id = %s
+        ORDER BY b.booking_time DESC
+    """, (session['user_id'],))
 
 @api_bp.route('/admin/reset-seats', methods=['POST'])
 def reset_seat_availability():
@@ -354,6 +433,7 @@ def reset_seat_availability():
                 
                 conn.commit()
                 updated_count = cur.rowcount
+                rebuild_availability(conn)
                 
                 return jsonify({
                     'success': True,
@@ -386,14 +466,24 @@ def cancel_booking(booking_id):
                 if booking['status'] != 'confirmed':
                     return jsonify({'error': 'Booking cannot be cancelled'}), 400
                 
+                # Seats the trigger is about to release, for the seat-map cache
+                cur.execute("""
+                    SELECT seat_id FROM seat_booking
+                    WHERE booking_id = %s AND status = 'booked'
+                """, (booking_id,))
+                released_seats = [row['seat_id'] for row in cur.fetchall()]
+
                 # Update booking status to cancelled
                 cur.execute("""
                     UPDATE booking 
                     SET status = 'cancelled' 
                     WHERE booking_id = %s
                 """, (booking_id,))
+                release_availability(conn, booking['show_id'], released_seats, count=booking['seats_booked'])
                 
                 conn.commit()
+                seat_maps.mark_released(booking['show_id'], released_seats)
+                seat_events.publish(booking['show_id'], 'released', released_seats)
                 
                 return jsonify({
                     'success': True,
@@ -409,37 +499,121 @@ def get_all_bookings():
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'error': 'Admin access required'}), 403
     
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("""
-                SELECT b.booking_id, b.show_id, b.seats_booked, b.total_amount, 
-                       b.booking_time, b.status,
-                       c.name as customer_name, c.email as customer_email,
-                       m.title as movie_title, t.name as theatre_name, 
-                       sc.name as screen_name, s.show_date, s.show_time
-                FROM booking b
-                JOIN customer c ON b.cust_id = c.cust_id
-                JOIN showtime s ON b.show_id = s.show_id
-                JOIN movie m ON s.movie_id = m.movie_id
-                JOIN screen sc ON s.screen_id = sc.screen_id
-                JOIN theatre t ON sc.theatre_id = t.theatre_id
-                ORDER BY b.booking_time DESC
-                LIMIT 100
-            """)
-            bookings = cur.fetchall()
-            
-            # Convert datetime objects to strings
-            for booking in bookings:
-                if booking['booking_time']:
-                    booking['booking_time'] = booking['booking_time'].strftime('%Y-%m-%d %H:%M:%S')
-                if booking['show_date']:
-                    booking['show_date'] = booking['show_date'].strftime('%Y-%m-%d')
-                if booking['show_time']:
-                    booking['show_time'] = str(booking['show_time'])
-                if booking['total_amount']:
-                    booking['total_amount'] = float(booking['total_amount'])
-    
-    return jsonify({'bookings': bookings})
+    return _stream_bookings("""
+        SELECT b.booking_id, b.show_id, b.seats_booked, b.total_amount, 
+               b.booking_time, b.status,
+               c.name as customer_name, c.email as customer_email,
+               m.title as movie_title, t.name as theatre_name, 
+               sc.name as screen_name, s.show_date, s.show_time
+        FROM booking b
+        JOIN customer c ON b.cust_id = c.cust_id
+        JOIN showtime s ON b.show_id = s.show_id
+        JOIN movie m ON s.movie_id = m.movie_id
+        JOIN screen sc ON s.screen_id = sc.screen_id
+        JOIN theatre t ON sc.theatre_id = t.theatre_id
+        ORDER BY b.booking_time DESC
+        LIMIT 100
+    """)
+
+@api_bp.route('/admin/bookings/export', methods=['GET'])
+def export_bookings():
+    """Stream every booking (optionally within from/to) as NDJSON or CSV.
+
+    Rows come off an unbuffered cursor in booking_id order, EXPORT_BATCH_SIZE
+    at a time, so memory stays flat. ``after_id`` resumes an interrupted export
+    after the last booking_id received; ``gzip=1`` compresses the stream.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': "format must be 'ndjson' or 'csv'"}), 400
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        after_id = int(request.args.get('after_id') or 0)
+    except ValueError:
+        return jsonify({'error': 'from/to must be YYYY-MM-DD and after_id an integer'}), 400
+    compress = request.args.get('gzip') in ('1', 'true')
+
+    where, params = ["b.booking_id > %s"], [after_id]
+    if start:
+        where.append("b.booking_time >= %s")
+        params.append(start)
+    if end:
+        where.append("b.booking_time < %s")
+        params.append(end + timedelta(days=1))
+    sql = f"""
+        SELECT b.booking_id, b.booking_time, b.status, b.seats_booked, b.total_amount, b.payment_method,
+               b.cust_id, c.name as customer_name, c.email as customer_email,
+               b.show_id, m.title as movie_title, t.name as theatre_name,
+               sc.name as screen_name, s.show_date, s.show_time
+        FROM booking b
+        JOIN customer c ON b.cust_id = c.cust_id
+        JOIN showtime s ON b.show_id = s.show_id
+        JOIN movie m ON s.movie_id = m.movie_id
+        JOIN screen sc ON s.screen_id = sc.screen_id
+        JOIN theatre t ON sc.theatre_id = t.theatre_id
+        WHERE {' AND '.join(where)}
+        ORDER BY b.booking_id
+    """
+
+    def encode_batches(cur):
+        encoder = row_encoder(cur.description)
+        if fmt == 'csv':
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator='\n')
+            writer.writerow(encoder.names)
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            if fmt == 'csv':
+                for row in rows:
+                    writer.writerow(encoder.encode(row).values())
+                chunk = buf.getvalue().encode()
+                buf.seek(0)
+                buf.truncate()
+            else:
+                chunk = b''.join(dumps(encoder.encode(row)) + b'\n' for row in rows)
+            yield chunk
+
+    # Checked out up front so PoolExhausted still becomes a 503
+    conn = get_conn(readonly=True)
+
+    def generate():
+        finished = False
+        try:
+            cur = conn.cursor(buffered=False)
+            cur.execute(sql, params)
+            gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+            for chunk in encode_batches(cur):
+                # Sync-flush per batch so the client receives data as it is read
+                yield gz.compress(chunk) + gz.flush(zlib.Z_SYNC_FLUSH) if gz else chunk
+            if gz:
+                yield gz.flush()
+            cur.close()
+            finished = True
+        finally:
+            if finished:
+                conn.close()
+            else:
+                # Abandoned mid-result (client went away or an error): the
+                # connection still has unread rows and can't go back to the pool
+                conn.discard()
+
+    name = 'bookings' + (f'-from-{start}' if start else '') + (f'-to-{end}' if end else '')
+    name += '.csv' if fmt == 'csv' else '.ndjson'
+    resp = Response(stream_with_context(generate()),
+                    mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    resp.headers['Content-Disposition'] = f'attachment; filename="{name}"'
+    resp.headers['Cache-Control'] = 'no-store'
+    if compress:
+        resp.headers['Content-Encoding'] = 'gzip'
+    # No-op if the stream ran; releases the connection if it never started
+    resp.call_on_close(conn.discard)
+    return resp
 
 @api_bp.route('/admin/stats', methods=['GET'])
 def get_admin_stats():
@@ -447,38 +621,35 @@ def get_admin_stats():
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'error': 'Admin access required'}), 403
     
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            # Total bookings today
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
+            # Totals come from the revenue_daily rollup (maintained by the booking triggers)
             cur.execute("""
-                SELECT COUNT(*) as count, IFNULL(SUM(total_amount), 0) as revenue
-                FROM booking 
-                WHERE DATE(booking_time) = CURDATE() AND status = 'confirmed'
+                SELECT IFNULL(SUM(bookings), 0) as count, IFNULL(SUM(revenue), 0) as revenue
+                FROM revenue_daily
+                WHERE day = CURDATE()
             """)
-            today_stats = cur.fetchone()
+            today_count, today_revenue = cur.fetchone()
             
             # Total bookings this month
             cur.execute("""
-                SELECT COUNT(*) as count, IFNULL(SUM(total_amount), 0) as revenue
-                FROM booking 
-                WHERE MONTH(booking_time) = MONTH(CURDATE()) 
-                AND YEAR(booking_time) = YEAR(CURDATE()) 
-                AND status = 'confirmed'
+                SELECT IFNULL(SUM(bookings), 0) as count, IFNULL(SUM(revenue), 0) as revenue
+                FROM revenue_daily
+                WHERE day BETWEEN DATE_SUB(CURDATE(), INTERVAL DAYOFMONTH(CURDATE()) - 1 DAY) AND CURDATE()
             """)
-            month_stats = cur.fetchone()
+            month_count, month_revenue = cur.fetchone()
             
             # Top movies by bookings
             cur.execute("""
-                SELECT m.title, COUNT(b.booking_id) as bookings, SUM(b.total_amount) as revenue
-                FROM booking b
-                JOIN showtime s ON b.show_id = s.show_id
-                JOIN movie m ON s.movie_id = m.movie_id
-                WHERE b.status = 'confirmed'
-                GROUP BY m.movie_id
+                SELECT m.title, CAST(SUM(r.bookings) AS UNSIGNED) as bookings, SUM(r.revenue) as revenue
+                FROM revenue_daily r
+                JOIN movie m ON r.movie_id = m.movie_id
+                GROUP BY r.movie_id, m.title
+                HAVING bookings > 0
                 ORDER BY bookings DESC
                 LIMIT 5
             """)
-            top_movies = cur.fetchall()
+            top_movies = fetch_dicts(cur)
             
             # Recent bookings
             cur.execute("""
@@ -494,36 +665,26 @@ def get_admin_stats():
                 ORDER BY b.booking_time DESC
                 LIMIT 10
             """)
-            recent_bookings = cur.fetchall()
-            
-            # Convert datetime objects
-            for booking in recent_bookings:
-                if booking['booking_time']:
-                    booking['booking_time'] = booking['booking_time'].strftime('%Y-%m-%d %H:%M:%S')
-                if booking['total_amount']:
-                    booking['total_amount'] = float(booking['total_amount'])
-            
-            for movie in top_movies:
-                if movie['revenue']:
-                    movie['revenue'] = float(movie['revenue'])
+            recent_bookings = fetch_dicts(cur)
     
-    return jsonify({
+    return json_response({
         'today': {
-            'bookings': today_stats['count'],
-            'revenue': float(today_stats['revenue'])
+            'bookings': int(today_count),
+            'revenue': float(today_revenue)
         },
         'month': {
-            'bookings': month_stats['count'],
-            'revenue': float(month_stats['revenue'])
+            'bookings': int(month_count),
+            'revenue': float(month_revenue)
         },
         'top_movies': top_movies,
         'recent_bookings': recent_bookings
     })
 
 @api_bp.route('/screens', methods=['GET'])
+@response_cache.cached('screens')
 def get_screens():
     """Get all screens with theatre information"""
-    with get_conn() as conn:
+    with get_conn(readonly=True) as conn:
         with conn.cursor(dictionary=True) as cur:
             cur.execute("""
                 SELECT sc.screen_id, sc.name AS screen_name, sc.type, sc.capacity,
@@ -537,22 +698,232 @@ def get_screens():
     
     return jsonify({'screens': screens})
 
+@api_bp.route('/screen/<int:screen_id>/layout', methods=['GET'])
+def get_screen_layout(screen_id):
+    """Rows, tiers, aisles, blocked seats and tier surcharges of a screen."""
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT capacity FROM screen WHERE screen_id = %s", (screen_id,))
+            row = cur.fetchone()
+            if not row:
+                return jsonify({'error': 'Screen not found'}), 404
+            layout = get_layout(cur, screen_id, row[0])
+
+    resp = make_response(jsonify(dict(layout.to_dict(), screen_id=screen_id, capacity=row[0], sellable=layout.sellable)))
+    resp.set_etag(layout.etag)
+    # Layouts change about as often as the building does; clients revalidate by ETag after a day
+    resp.headers['Cache-Control'] = 'public, max-age=86400'
+    return resp.make_conditional(request)
+
+def _booked_seat_snapshot(show_id):
+    """(etag, booked seats) from the seat-map cache, loading it on a miss."""
+    snapshot = seat_maps.get(show_id)
+    if snapshot is None:
+        token = seat_maps.write_token()
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT seat_id FROM seat_booking 
+                    WHERE show_id = %s AND status = 'booked'
+                """, (show_id,))
+                booked_seats = [row[0] for row in cur.fetchall()]
+        snapshot = seat_maps.put(show_id, booked_seats, token)
+    return snapshot
+
+def _seat_map(show_id):
+    """(etag, booked seats, held seats) for a show."""
+    _ensure_hold_index()
+    _sync_holds(show_id)
+    return _with_holds(show_id, _booked_seat_snapshot(show_id))
+
+def _with_holds(show_id, snapshot):
+    etag, booked_seats = snapshot
+    held_seats = seat_holds.held_seats(show_id)
+    if held_seats:
+        etag += '.' + hashlib.blake2b(','.join(held_seats).encode(), digest_size=4).hexdigest()
+    return etag, booked_seats, held_seats
+
+_hold_index_lock = threading.Lock()
+_hold_index_loaded = False
+
+def _utc_timestamp(dt):
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+def _on_hold_expired(show_id, seats, hold_id):
+    seat_events.publish(show_id, 'released', seats)
+    with get_conn() as conn:
+        purge_hold(conn, hold_id)
+
+def _ensure_hold_index():
+    """Load live holds from seat_hold once per process and start the expiry sweeper."""
+    global _hold_index_loaded
+    if _hold_index_loaded:
+        return
+    with _hold_index_lock:
+        if _hold_index_loaded:
+            return
+        with get_conn() as conn:
+            holds = load_live_holds(conn)
+        for hold_id, (show_id, cust_id, seats, expires_at) in holds.items():
+            seat_holds.add(hold_id, show_id, cust_id, seats, _utc_timestamp(expires_at))
+        seat_holds.on_expire = _on_hold_expired
+        seat_holds.start_sweeper()
+        _hold_index_loaded = True
+
+def _sync_holds(show_id):
+    """Refresh a show's holds from seat_hold when the index's copy is older than HOLD_SYNC_SECONDS.
+
+    The index only sees holds placed through this process; under serve.py
+    the other workers place and release holds too.
+    """
+    if not seat_holds.stale(show_id, HOLD_SYNC_SECONDS):
+        return
+    started = time.monotonic()
+    with get_conn() as conn:
+        holds = load_live_holds(conn, show_id)
+    seat_holds.sync(show_id, {
+        hold_id: (cust_id, seats, _utc_timestamp(expires_at))
+        for hold_id, (_, cust_id, seats, expires_at) in holds.items()
+    }, started)
+
+def _drop_indexed_hold(show_id, cust_id, keep=()):
+    """Forget cust_id's hold on show_id and announce any seats it no longer covers."""
+    hold_id = seat_holds.hold_for(show_id, cust_id)
+    hold = seat_holds.remove(hold_id) if hold_id else None
+    if hold:
+        seat_events.publish(show_id, 'released', [seat for seat in hold[2] if seat not in keep])
+
 @api_bp.route('/show/<int:show_id>/booked-seats', methods=['GET'])
 def get_booked_seats(show_id):
-    """Get booked seats for a specific show"""
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("""
-                SELECT seat_id FROM seat_booking 
-                WHERE show_id = %s AND status = 'booked'
-                ORDER BY seat_id
-            """, (show_id,))
-            booked_seats = cur.fetchall()
-    
+    """Get booked and held seats for a specific show.
+
+    Served from the in-process seat-map cache when warm; clients that send
+    back the ETag get a 304 without touching the database.
+    """
+    etag, booked_seats, held_seats = _seat_map(show_id)
+    if etag in request.if_none_match:
+        resp = make_response('', 304)
+    else:
+        resp = jsonify({'booked_seats': booked_seats, 'held_seats': held_seats})
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@api_bp.route('/show/<int:show_id>/hold', methods=['POST'])
+def hold_seats(show_id):
+    """Hold seats while the customer checks out.
+
+    Replaces the customer's previous hold on the show. Booking the same seats
+    through /api/book converts the hold; otherwise it lapses after the TTL.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    data = request.get_json(silent=True) or {}
+    cust_id = session['user_id']
+    try:
+        seats = normalize_seats(data.get('seats') or data.get('selected_seats') or [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    ttl = data.get('ttl_seconds')
+    if ttl is not None:
+        try:
+            ttl = int(ttl)
+        except (TypeError, ValueError):
+            ttl = 0
+        if ttl <= 0:
+            return jsonify({'error': 'ttl_seconds must be a positive whole number of seconds'}), 400
+
+    # Reject from memory first; the database only sees plausible holds
+    _, booked_seats, _ = _seat_map(show_id)
+    booked = set(booked_seats)
+    taken = sorted(set(seat_holds.held_by_others(show_id, seats, cust_id)) | {seat for seat in seats if seat in booked})
+    if taken:
+        return jsonify({'error': f'Seats {", ".join(taken)} are not available.', 'conflicts': taken}), 409
+
+    try:
+        with get_conn() as conn:
+            hold_id, seats, expires_at = place_hold(conn, cust_id, show_id, seats, ttl)
+    except BookingError as e:
+        body = {'error': e.message}
+        if e.conflicts:
+            body['conflicts'] = e.conflicts
+        return jsonify(body), e.status
+
+    _drop_indexed_hold(show_id, cust_id, keep=seats)
+    seat_holds.add(hold_id, show_id, cust_id, seats, _utc_timestamp(expires_at))
+    seat_events.publish(show_id, 'held', seats)
+
     return jsonify({
-        'booked_seats': [seat['seat_id'] for seat in booked_seats]
+        'success': True,
+        'hold_id': hold_id,
+        'show_id': show_id,
+        'seats': seats,
+        'expires_at': expires_at.strftime('%Y-%m-%dT%H:%M:%SZ')
     })
 
+@api_bp.route('/show/<int:show_id>/hold', methods=['DELETE'])
+def release_seats(show_id):
+    """Release the customer's hold on a show"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    _ensure_hold_index()
+    with get_conn() as conn:
+        seats = release_hold(conn, session['user_id'], show_id)
+    hold_id = seat_holds.hold_for(show_id, session['user_id'])
+    if hold_id:
+        seat_holds.remove(hold_id)
+    seat_events.publish(show_id, 'released', seats)
+
+    return jsonify({'success': True, 'released_seats': seats})
+
+@api_bp.route('/show/<int:show_id>/seats/stream', methods=['GET'])
+def stream_seats(show_id):
+    """Server-Sent Events feed of seat changes for a show.
+
+    Sends a "snapshot" first (or replays from Last-Event-ID when the gap is
+    still buffered), then "booked"/"held"/"released" deltas and periodic
+    heartbeats.
+    """
+    try:
+        seat_events.subscribe(show_id)
+    except TooManySubscribers:
+        return jsonify({'error': 'Too many watchers for this show, fall back to polling'}), 503
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    heartbeat = SEAT_STREAM_HEARTBEAT
+
+    def snapshot():
+        seq = seat_events.last_seq(show_id)
+        _, booked_seats, held_seats = _seat_map(show_id)
+        return seq, format_event(seat_events.event_id(seq), 'snapshot',
+                                 {'show_id': show_id, 'booked_seats': booked_seats, 'held_seats': held_seats})
+
+    def generate():
+        yield f'retry: {SEAT_STREAM_RETRY_MS}\n\n'
+        seq = seat_events.parse_event_id(last_event_id)
+        if seq is None or seq > seat_events.last_seq(show_id):
+            seq, event = snapshot()
+            yield event
+        while True:
+            events = seat_events.wait(show_id, seq, heartbeat)
+            if events is None:
+                seq, event = snapshot()
+                yield event
+            elif not events:
+                yield ': heartbeat\n\n'
+            for event_seq, event_type, seats in events or ():
+                seq = event_seq
+                yield format_event(seat_events.event_id(seq), event_type,
+                                   {'show_id': show_id, 'seats': seats})
+
+    resp = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    resp.call_on_close(lambda: seat_events.unsubscribe(show_id))
+    return resp
+
 @api_bp.route('/admin/add-show', methods=['POST'])
 def add_show():
     """Add a new show (Admin only)"""
@@ -587,8 +958,10 @@ def add_show():
                     INSERT INTO showtime (screen_id, movie_id, show_date, show_time, price_type, base_price, available_seats)
                     VALUES (%s, %s, %s, %s, %s, %s, %s)
                 """, (screen_id, movie_id, show_date, show_time, price_type, base_price, capacity))
-                
+                refresh_availability(conn, show_id=cur.lastrowid)
+
                 conn.commit()
+                clear_count_cache()
                 
                 return jsonify({
                     'success': True,
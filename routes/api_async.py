@@ -0,0 +1,286 @@
+"""Async versions of the hot read endpoints of routes/api.py for asgi.py.
+
+Same URLs, query parameters and JSON bodies as the Flask views; anything not
+routed here falls through to the Flask app. The session is read through the
+Flask app's session store (these handlers never write it), the response and
+seat-map caches are the same objects the Flask views use, and seat streams
+park on wait_async() instead of holding a thread each.
+
+Requires starlette and aiomysql (requirements-asgi.txt).
+"""
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from db.aio import async_cursor
+from db.show_listing import (
+    build_count_query, build_page_query, cached_count, decode_cursor, remember_count, split_page,
+)
+from routes import api as sync_api
+from utils.jsonrows import dumps, row_encoder
+from utils.response_cache import response_cache
+from utils.seat_cache import seat_maps
+from utils.seat_events import seat_events, format_event, TooManySubscribers
+from utils.sessions import ServerSessionInterface
+
+
+def _json(payload, status=200):
+    return Response(dumps(payload), status_code=status, media_type='application/json')
+
+
+def _full_path(request):
+    # Same cache key as Flask's request.full_path
+    return f'{request.url.path}?{request.url.query}'
+
+
+def _if_none_match(request):
+    header = request.headers.get('if-none-match', '')
+    return {tag.strip().removeprefix('W/').strip('"') for tag in header.split(',') if tag.strip()}
+
+
+async def pool_exhausted(request, exc):
+    resp = _json({'error': 'Server busy, please retry shortly'}, 503)
+    resp.headers['Retry-After'] = '1'
+    return resp
+
+
+async def _fetch_dicts(cur, sql, params=()):
+    await cur.execute(sql, params)
+    return row_encoder(cur.description).dicts(await cur.fetchall())
+
+
+async def _cached(request, namespace, load):
+    """response_cache.cached() for async handlers: replay or run load() and store it."""
+    full_path = _full_path(request)
+    hit = response_cache.lookup(namespace, full_path)
+    if hit is None:
+        body = dumps(await load())
+        etag, _ = response_cache.store(namespace, full_path, body)
+    else:
+        body, etag, _ = hit
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+    if etag in _if_none_match(request):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+class FlaskSession:
+    """Reads the session the Flask app issues: server-side (utils.sessions) or a signed cookie."""
+
+    def __init__(self, flask_app):
+        self.cookie_name = flask_app.config['SESSION_COOKIE_NAME']
+        self.max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        self.interface = flask_app.session_interface
+        self.server_side = isinstance(self.interface, ServerSessionInterface)
+        self.serializer = None if self.server_side else self.interface.get_signing_serializer(flask_app)
+
+    async def __call__(self, request):
+        value = request.cookies.get(self.cookie_name)
+        if not value:
+            return {}
+        if self.server_side:
+            # A user cache miss reads the customer table with the sync pool
+            found = await run_in_threadpool(self.interface.read, value)
+            return found[0] if found else {}
+        if self.serializer is None:
+            return {}
+        try:
+            return self.serializer.loads(value, max_age=self.max_age)
+        except Exception:
+            return {}
+
+
+async def get_shows(request):
+    """Async /api/shows (see routes.api.get_shows)."""
+    args = request.query_params
+    filters = {
+        'movie': args.get('movie', '').strip(),
+        'date': args.get('date', '').strip(),
+        'theatre': args.get('theatre', '').strip(),
+    }
+    try:
+        page = max(int(args.get('page', 1) or 1), 1)
+    except ValueError:
+        page = 1
+    per_page = 12
+    after_token = args.get('after', '').strip()
+
+    after = None
+    if after_token:
+        try:
+            after = decode_cursor(after_token)
+        except ValueError:
+            return _json({'error': 'Invalid cursor'}, 400)
+
+    count_mode = args.get('total', 'none' if after else 'cached')
+    if count_mode not in ('exact', 'cached', 'none'):
+        return _json({'error': "total must be one of 'exact', 'cached', 'none'"}, 400)
+
+    async with async_cursor() as cur:
+        await cur.execute(*build_page_query('api', filters, per_page, after=after, page=page))
+        rows, next_cursor = split_page(cur.description, await cur.fetchall(), per_page)
+        shows = row_encoder(cur.description).dicts(rows)
+        total = None
+        if count_mode != 'none':
+            total = cached_count('api', filters) if count_mode == 'cached' else None
+            if total is None:
+                await cur.execute(*build_count_query('api', filters))
+                total = (await cur.fetchone())[0]
+                remember_count('api', filters, total)
+
+    return _json({
+        'shows': shows,
+        'total': total,
+        'page': None if after else page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page if total is not None else None,
+        'next_cursor': next_cursor
+    })
+
+
+async def get_movies(request):
+    async def load():
+        async with async_cursor() as cur:
+            movies = await _fetch_dicts(cur, "SELECT * FROM movie WHERE status = 'now_showing' ORDER BY title")
+        return {'movies': movies}
+    return await _cached(request, 'movies', load)
+
+
+async def get_theatres(request):
+    async def load():
+        async with async_cursor() as cur:
+            theatres = await _fetch_dicts(cur, "SELECT * FROM theatre ORDER BY city, name")
+        return {'theatres': theatres}
+    return await _cached(request, 'theatres', load)
+
+
+async def get_screens(request):
+    async def load():
+        async with async_cursor() as cur:
+            screens = await _fetch_dicts(cur, """
+                SELECT sc.screen_id, sc.name AS screen_name, sc.type, sc.capacity,
+                       t.theatre_id, t.name AS theatre_name, t.city
+                FROM screen sc
+                JOIN theatre t ON t.theatre_id = sc.theatre_id
+                WHERE sc.status = 'active'
+                ORDER BY t.city, t.name, sc.name
+            """)
+        return {'screens': screens}
+    return await _cached(request, 'screens', load)
+
+
+async def _seat_map(show_id):
+    """routes.api._seat_map without blocking the loop on a cache miss."""
+    if not sync_api._hold_index_loaded:
+        await run_in_threadpool(sync_api._ensure_hold_index)
+    snapshot = seat_maps.get(show_id)
+    if snapshot is None:
+        token = seat_maps.write_token()
+        async with async_cursor() as cur:
+            await cur.execute(
+                "SELECT seat_id FROM seat_booking WHERE show_id = %s AND status = 'booked'", (show_id,)
+            )
+            booked_seats = [row[0] for row in await cur.fetchall()]
+        snapshot = seat_maps.put(show_id, booked_seats, token)
+    return sync_api._with_holds(show_id, snapshot)
+
+
+async def get_booked_seats(request):
+    show_id = request.path_params['show_id']
+    etag, booked_seats, held_seats = await _seat_map(show_id)
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+    if etag in _if_none_match(request):
+        return Response(status_code=304, headers=headers)
+    resp = _json({'booked_seats': booked_seats, 'held_seats': held_seats})
+    resp.headers.update(headers)
+    return resp
+
+
+async def stream_seats(request):
+    """Async /api/show/<id>/seats/stream: same events as the Flask stream."""
+    show_id = request.path_params['show_id']
+    try:
+        seat_events.subscribe(show_id)
+    except TooManySubscribers:
+        return _json({'error': 'Too many watchers for this show, fall back to polling'}, 503)
+
+    last_event_id = request.headers.get('last-event-id') or request.query_params.get('last_event_id')
+    heartbeat = sync_api.SEAT_STREAM_HEARTBEAT
+
+    async def snapshot():
+        seq = seat_events.last_seq(show_id)
+        _, booked_seats, held_seats = await _seat_map(show_id)
+        return seq, format_event(seat_events.event_id(seq), 'snapshot',
+                                 {'show_id': show_id, 'booked_seats': booked_seats, 'held_seats': held_seats})
+
+    async def generate():
+        try:
+            yield f'retry: {sync_api.SEAT_STREAM_RETRY_MS}\n\n'
+            seq = seat_events.parse_event_id(last_event_id)
+            if seq is None or seq > seat_events.last_seq(show_id):
+                seq, event = await snapshot()
+                yield event
+            while True:
+                events = await seat_events.wait_async(show_id, seq, heartbeat)
+                if events is None:
+                    seq, event = await snapshot()
+                    yield event
+                elif not events:
+                    yield ': heartbeat\n\n'
+                for event_seq, event_type, seats in events or ():
+                    seq = event_seq
+                    yield format_event(seat_events.event_id(seq), event_type,
+                                       {'show_id': show_id, 'seats': seats})
+        finally:
+            seat_events.unsubscribe(show_id)
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def async_routes(flask_app):
+    """Starlette routes for the async endpoints, reading flask_app's sessions."""
+    session_of = FlaskSession(flask_app)
+
+    async def get_current_user(request):
+        session = await session_of(request)
+        if 'user_id' not in session:
+            return _json({'error': 'Not authenticated'}, 401)
+        return _json({
+            'user': {
+                'id': session['user_id'],
+                'name': session['user_name'],
+                'role': session.get('role', 'customer')
+            }
+        })
+
+    async def get_my_bookings(request):
+        session = await session_of(request)
+        if 'user_id' not in session:
+            return _json({'error': 'Authentication required'}, 401)
+        async with async_cursor() as cur:
+            bookings = await _fetch_dicts(cur, """
+                SELECT b.booking_id, b.show_id, b.seats_booked, b.total_amount,
+                       b.booking_time, b.status,
+                       m.title as movie_title, t.name as theatre_name,
+                       sc.name as screen_name, s.show_date, s.show_time
+                FROM booking b
+                JOIN showtime s ON b.show_id = s.show_id
+                JOIN movie m ON s.movie_id = m.movie_id
+                JOIN screen sc ON s.screen_id = sc.screen_id
+                JOIN theatre t ON sc.theatre_id = t.theatre_id
+                WHERE b.cust_id = %s
+                ORDER BY b.booking_time DESC
+            """, (session['user_id'],))
+        return _json({'bookings': bookings})
+
+    return [
+        Route('/api/shows', get_shows, methods=['GET']),
+        Route('/api/movies', get_movies, methods=['GET']),
+        Route('/api/theatres', get_theatres, methods=['GET']),
+        Route('/api/screens', get_screens, methods=['GET']),
+        Route('/api/show/{show_id:int}/booked-seats', get_booked_seats, methods=['GET']),
+        Route('/api/show/{show_id:int}/seats/stream', stream_seats, methods=['GET']),
+        Route('/api/auth/me', get_current_user, methods=['GET']),
+        Route('/api/my-bookings', get_my_bookings, methods=['GET']),
+    ]
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash, session
-from passlib.hash import pbkdf2_sha256 as bcrypt
 from db.connection import get_conn
+from utils.auth import check_login
+from utils.passwords import hash_password
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/')
 
@@ -22,9 +23,9 @@ def register_post():
     # Use PBKDF2-SHA256 (no 72-byte limit). If the library still raises
     # due to edge cases, fallback by hashing a truncated version to guarantee progress.
     try:
-        password_hash = bcrypt.hash(password)
+        password_hash = hash_password(password)
     except ValueError:
-        password_hash = bcrypt.hash(password[:1024])
+        password_hash = hash_password(password[:1024])
     try:
         with get_conn() as conn:
             with conn.cursor() as cur:
@@ -52,12 +53,8 @@ def login_post():
         flash('Email and Password are required', 'danger')
         return redirect(url_for('auth.login_get'))
 
-    with get_conn() as conn:
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT cust_id, name, email, role, password_hash FROM customer WHERE email=%s", (email,))
-            user = cur.fetchone()
-
-    if not user or not bcrypt.verify(password, user['password_hash']):
+    user = check_login(email, password)
+    if not user:
         flash('Invalid credentials', 'danger')
         return redirect(url_for('auth.login_get'))
 
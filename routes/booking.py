@@ -1,5 +1,6 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session
 from db.connection import get_conn
+from db.availability import take_seats
 from utils.auth import login_required
 
 booking_bp = Blueprint('booking', __name__)
@@ -56,6 +57,8 @@ def book_ticket_post():
                     conn.rollback()
                     flash(p_error, 'warning')
                     return redirect(url_for('booking.book_ticket_get', show_id=show_id))
+                # The procedure sells a seat count, not specific seats
+                take_seats(conn, show_id, [], count=seats)
                 conn.commit()
                 flash(f'Booking confirmed. ID: {p_booking_id}', 'success')
                 return redirect(url_for('booking.booking_confirmation', booking_id=p_booking_id))
@@ -0,0 +1,161 @@
+"""Production launcher: gunicorn with a preloaded, pre-warmed app.
+
+    pip install -r requirements-prod.txt
+    python serve.py --workers 4 --threads 4 --bind 0.0.0.0:5000
+    python serve.py --asgi --workers 2          # asgi.py under uvicorn workers
+    python serve.py --profile api               # JSON API only (see app.create_app)
+
+The parent process builds the app once, warms the catalog responses and seat
+layouts, closes its DB connections and then forks; workers inherit the warm
+caches copy-on-write and open their own pool connections on first use.
+
+Reloads are graceful: ``kill -HUP <master>`` starts fresh workers and lets
+the old ones finish in-flight requests (up to --graceful-timeout) before they
+exit, so a booking is either committed or never started. HUP re-forks from
+the preloaded parent, so it does not pick up new code; to deploy code send
+USR2 (a new master starts next to the old one) and then QUIT to the old
+master.
+
+With more than one worker, sessions default to the sqlite store so every
+worker sees them (SESSION_BACKEND, see utils/sessions.py).
+
+Cold start (create_app, warmup) and each worker's fork-to-ready time and
+memory are logged at startup and served from /admin/metrics/process.
+Unix only; on Windows keep using ``python app.py``.
+"""
+import argparse
+import logging
+import os
+import time
+
+from gunicorn.app.base import BaseApplication
+
+from utils import procinfo
+
+log = logging.getLogger('serve')
+
+# Cached catalog endpoints rendered once in the parent (see utils/response_cache.py)
+WARM_PATHS = ('/api/movies', '/api/theatres', '/api/screens')
+
+
+def warmup(flask_app):
+    """Fill the in-process caches before any worker accepts traffic."""
+    from db.connection import get_conn
+    from db.seat_layout import warm_layouts
+    paths = WARM_PATHS if flask_app.config['APP_PROFILE'] != 'admin' else ()
+    client = flask_app.test_client()
+    for path in paths:
+        resp = client.get(path)
+        if resp.status_code != 200:
+            log.warning('warmup: %s returned %s', path, resp.status_code)
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            screens = warm_layouts(cur)
+    log.info('warmup: %d catalog responses, %d screen layouts', len(paths), screens)
+
+
+def post_fork(server, worker):
+    from db.connection import dispose_pool
+    from db.instrument import sql_stats
+    from utils.seat_events import seat_events
+    # Forget anything inherited from the parent; the sockets are not ours to close
+    dispose_pool(close=False)
+    seat_events.reset()
+    sql_stats.reset()
+    procinfo.set_role('worker')
+    worker._forked_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    ms = procinfo.mark('fork_to_ready', worker._forked_at)
+    mem = procinfo.memory()
+    log.info('worker %s ready in %.1f ms, memory %s', worker.pid, ms, mem)
+
+
+def when_ready(server):
+    stats = procinfo.process_stats()
+    log.info('master %s ready: startup %s, memory %s', stats['pid'], stats['startup_ms'], stats['memory'])
+
+
+class Server(BaseApplication):
+    def __init__(self, options, profile=None, use_asgi=False, warm=True):
+        self.options = options
+        self.profile = profile
+        self.use_asgi = use_asgi
+        self.warm = warm
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from db.connection import dispose_pool
+
+        started = time.monotonic()
+        procinfo.set_role('master')
+        from app import create_app
+        flask_app = create_app(self.profile)
+        procinfo.mark('create_app', started)
+
+        if self.warm:
+            warm_started = time.monotonic()
+            try:
+                warmup(flask_app)
+            except Exception as e:
+                log.warning('warmup failed, starting cold: %s', e)
+            procinfo.mark('warmup', warm_started)
+        # Workers must not share the parent's sockets
+        dispose_pool()
+
+        if self.use_asgi:
+            from asgi import build_app
+            return build_app(flask_app)
+        return flask_app
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Run CineVerse under gunicorn')
+    parser.add_argument('--bind', default=os.getenv('BIND', '127.0.0.1:5000'))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', str(cpus * 2 + 1))))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WEB_THREADS', '4')),
+                        help='threads per worker (keep at or below DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW)')
+    parser.add_argument('--timeout', type=int, default=30)
+    parser.add_argument('--graceful-timeout', type=int, default=30)
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--profile', choices=('full', 'api', 'admin'), default=None,
+                        help="app profile (default: APP_PROFILE, else 'full'); see create_app")
+    parser.add_argument('--asgi', action='store_true', help='serve asgi.py with uvicorn workers')
+    parser.add_argument('--no-warmup', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(name)s %(levelname)s: %(message)s')
+    if args.workers > 1:
+        # In-memory sessions would only exist in the worker that created them
+        backend = os.environ.setdefault('SESSION_BACKEND', 'sqlite')
+        if backend == 'memory':
+            log.warning('SESSION_BACKEND=memory with %d workers: logins will not be shared between them', args.workers)
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'post_fork': post_fork,
+        'post_worker_init': post_worker_init,
+        'when_ready': when_ready,
+    }
+    if args.asgi:
+        options['worker_class'] = 'uvicorn.workers.UvicornWorker'
+    else:
+        options['worker_class'] = 'gthread'
+        options['threads'] = args.threads
+    Server(options, profile=args.profile, use_asgi=args.asgi, warm=not args.no_warmup).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Fixtures for the tests that talk to MySQL.
+
+They need the database from the README setup (every db/*.sql applied) and
+are skipped when it can't be reached. Each test makes its own theatre,
+screen, movie, shows and customers and deletes them afterwards.
+"""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from mysql.connector import errors
+
+from app import create_app
+from db.availability import refresh as refresh_availability
+from db.connection import get_conn
+
+
+@pytest.fixture(scope='session')
+def db():
+    try:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM show_availability LIMIT 1")
+                cur.fetchall()
+    except errors.Error as e:
+        pytest.skip(f'needs the MySQL database from the README setup ({e})')
+
+
+@pytest.fixture(scope='session')
+def app(db):
+    return create_app('api')
+
+
+@pytest.fixture
+def make_show(db):
+    """make_show() -> {'show_id', 'screen_id', 'theatre_id', 'movie_id'}: a show
+    30 days out on a new 114-seat screen (rows A-C standard, D-G premium, H-J vip)."""
+    made = []
+
+    def make(base_price=200):
+        tag = uuid.uuid4().hex[:12]
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("INSERT INTO theatre (name, city, address) VALUES (%s, %s, %s)",
+                            (f'Test Theatre {tag}', 'Testville', 'Test Road'))
+                theatre_id = cur.lastrowid
+                made.append(('theatre', theatre_id))
+                cur.execute("INSERT INTO screen (theatre_id, name, capacity) VALUES (%s, %s, %s)",
+                            (theatre_id, 'Screen 1', 114))
+                screen_id = cur.lastrowid
+                cur.execute("INSERT INTO movie (title, duration_minutes) VALUES (%s, %s)",
+                            (f'Test Movie {tag}', 120))
+                movie_id = cur.lastrowid
+                made.append(('movie', movie_id))
+                # available_seats set by trigger
+                cur.execute(
+                    "INSERT INTO showtime (screen_id, movie_id, show_date, show_time, base_price, available_seats) "
+                    "VALUES (%s, %s, %s, %s, %s, 0)",
+                    (screen_id, movie_id, date.today() + timedelta(days=30), '18:00:00', base_price)
+                )
+                show_id = cur.lastrowid
+            refresh_availability(conn, show_id=show_id)
+            conn.commit()
+        return {'show_id': show_id, 'screen_id': screen_id, 'theatre_id': theatre_id, 'movie_id': movie_id}
+
+    yield make
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            for kind, row_id in made:
+                if kind == 'theatre':
+                    cur.execute("DELETE FROM show_availability WHERE theatre_id = %s", (row_id,))
+                    cur.execute("DELETE FROM revenue_daily WHERE theatre_id = %s", (row_id,))
+                    # Cascades to the screen, its shows and their bookings, seats and holds
+                    cur.execute("DELETE FROM theatre WHERE theatre_id = %s", (row_id,))
+            for kind, row_id in made:
+                if kind == 'movie':
+                    cur.execute("DELETE FROM movie WHERE movie_id = %s", (row_id,))
+        conn.commit()
+
+
+@pytest.fixture
+def show(make_show):
+    return make_show()
+
+
+@pytest.fixture
+def sign_in(app):
+    """sign_in() -> a test client signed in as a new customer (``client.cust_id``)."""
+    made = []
+
+    def sign_in(role='customer'):
+        email = f'test-{uuid.uuid4().hex}@example.com'
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("INSERT INTO customer (name, email, role, password_hash) VALUES (%s, %s, %s, %s)",
+                            ('Test Customer', email, role, '!'))
+                cust_id = cur.lastrowid
+            conn.commit()
+        made.append(cust_id)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = cust_id
+            sess['user_name'] = 'Test Customer'
+            sess['role'] = role
+        client.cust_id = cust_id
+        return client
+
+    yield sign_in
+
+    if made:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                # Cascades to their bookings, holds and idempotency keys
+                cur.execute(f"DELETE FROM customer WHERE cust_id IN ({','.join(['%s'] * len(made))})", made)
+            conn.commit()
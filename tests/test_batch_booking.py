@@ -0,0 +1,74 @@
+"""POST /api/bookings/batch (needs MySQL, see conftest.py)."""
+from db.connection import get_conn
+
+
+def booked(client, show_id):
+    return client.get(f'/api/show/{show_id}/booked-seats').get_json()['booked_seats']
+
+
+def seats_of_booking(booking_id):
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT show_id, seat_id FROM seat_booking WHERE booking_id = %s AND status = 'booked' "
+                        "ORDER BY seat_id", (booking_id,))
+            return cur.fetchall()
+
+
+def test_batch_books_every_show(sign_in, make_show):
+    client = sign_in()
+    first, second = make_show()['show_id'], make_show()['show_id']
+
+    resp = client.post('/api/bookings/batch', json={'items': [
+        {'show_id': first, 'seats': ['A1', 'A2']},
+        {'show_id': second, 'seats': ['H1']},
+    ]})
+    assert resp.status_code == 200, resp.get_json()
+    body = resp.get_json()
+    assert body['success'] and body['booked'] == 2
+    results = body['results']
+    assert [r['status'] for r in results] == ['booked', 'booked']
+    # Each result names its own booking row, and that row holds the item's seats
+    assert seats_of_booking(results[0]['booking_id']) == [(first, 'A1'), (first, 'A2')]
+    assert seats_of_booking(results[1]['booking_id']) == [(second, 'H1')]
+
+
+def test_atomic_batch_books_nothing_on_a_conflict(sign_in, make_show):
+    first, second = make_show()['show_id'], make_show()['show_id']
+    assert sign_in().post('/api/book', json={'show_id': second, 'selected_seats': ['B5']}).status_code == 200
+
+    client = sign_in()
+    resp = client.post('/api/bookings/batch', json={'items': [
+        {'show_id': first, 'seats': ['B4']},
+        {'show_id': second, 'seats': ['B5', 'B6']},
+    ]})
+    assert resp.status_code == 409
+    results = resp.get_json()['results']
+    assert [r['status'] for r in results] == ['skipped', 'failed']
+    assert results[1]['conflicts'] == ['B5']
+    assert booked(client, first) == []
+    assert booked(client, second) == ['B5']
+
+
+def test_best_effort_batch_books_what_it_can(sign_in, make_show):
+    first, second = make_show()['show_id'], make_show()['show_id']
+    assert sign_in().post('/api/book', json={'show_id': second, 'selected_seats': ['C5']}).status_code == 200
+
+    client = sign_in()
+    resp = client.post('/api/bookings/batch', json={'mode': 'best_effort', 'items': [
+        {'show_id': first, 'seats': ['C4']},
+        {'show_id': second, 'seats': ['C5']},
+    ]})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body['booked'], body['failed']) == (1, 1)
+    assert [r['status'] for r in body['results']] == ['booked', 'failed']
+    assert booked(client, first) == ['C4']
+
+
+def test_batch_respects_other_customers_holds(sign_in, make_show):
+    show_id = make_show()['show_id']
+    assert sign_in().post(f'/api/show/{show_id}/hold', json={'seats': ['D9']}).status_code == 200
+
+    resp = sign_in().post('/api/bookings/batch', json={'items': [{'show_id': show_id, 'seats': ['D9']}]})
+    assert resp.status_code == 409
+    assert resp.get_json()['results'][0]['conflicts'] == ['D9']
@@ -0,0 +1,52 @@
+"""Booking and cancelling through /api/book and /api/cancel-booking (needs MySQL, see conftest.py)."""
+import json
+
+from db.connection import get_conn
+
+
+def availability(show_id):
+    """(seats_left, tiers_left) of a show's show_availability row."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT seats_left, tiers_left FROM show_availability WHERE show_id = %s", (show_id,))
+            seats_left, tiers_left = cur.fetchone()
+    return seats_left, json.loads(tiers_left)
+
+
+def test_book_then_cancel_returns_seats_to_sale(sign_in, show):
+    client = sign_in()
+    show_id = show['show_id']
+    seats_left, tiers_left = availability(show_id)
+
+    resp = client.post('/api/book', json={'show_id': show_id, 'selected_seats': ['A1', 'H1']})
+    assert resp.status_code == 200, resp.get_json()
+    booking_id = resp.get_json()['booking_id']
+    assert availability(show_id) == (seats_left - 2, dict(tiers_left, standard=tiers_left['standard'] - 1,
+                                                          vip=tiers_left['vip'] - 1))
+    assert set(client.get(f'/api/show/{show_id}/booked-seats').get_json()['booked_seats']) == {'A1', 'H1'}
+
+    resp = client.post(f'/api/cancel-booking/{booking_id}')
+    assert resp.status_code == 200, resp.get_json()
+    assert availability(show_id) == (seats_left, tiers_left)
+    assert client.get(f'/api/show/{show_id}/booked-seats').get_json()['booked_seats'] == []
+    bookings = client.get('/api/my-bookings').get_json()['bookings']
+    assert [b['status'] for b in bookings if b['booking_id'] == booking_id] == ['cancelled']
+
+
+def test_cancelled_seats_can_be_booked_again(sign_in, show):
+    client = sign_in()
+    show_id = show['show_id']
+    booking_id = client.post('/api/book', json={'show_id': show_id, 'selected_seats': ['D4']}).get_json()['booking_id']
+    assert client.post(f'/api/cancel-booking/{booking_id}').status_code == 200
+
+    resp = sign_in().post('/api/book', json={'show_id': show_id, 'selected_seats': ['D4']})
+    assert resp.status_code == 200, resp.get_json()
+
+
+def test_booked_seats_conflict(sign_in, show):
+    show_id = show['show_id']
+    assert sign_in().post('/api/book', json={'show_id': show_id, 'selected_seats': ['B2', 'B3']}).status_code == 200
+
+    resp = sign_in().post('/api/book', json={'show_id': show_id, 'selected_seats': ['B3', 'B4']})
+    assert resp.status_code == 409
+    assert resp.get_json()['conflicts'] == ['B3']
@@ -0,0 +1,41 @@
+"""utils.holds.HoldIndex syncing with seat_hold rows written by other workers (no database needed)."""
+import time
+
+from utils.holds import HoldIndex
+
+
+def test_sync_picks_up_and_drops_other_workers_holds():
+    index = HoldIndex()
+    later = time.time() + 300
+    assert index.stale(7, 1)
+
+    index.sync(7, {'a' * 32: (1, ['A1', 'A2'], later)}, time.monotonic())
+    assert index.held_seats(7) == ['A1', 'A2']
+    assert index.held_by_others(7, ['A2', 'A3'], cust_id=2) == ['A2']
+    assert not index.stale(7, 1)
+    assert index.stale(7, 0)
+
+    # Released (or booked) through the other worker
+    index.sync(7, {}, time.monotonic())
+    assert index.held_seats(7) == []
+
+
+def test_sync_keeps_holds_indexed_after_the_read_started():
+    index = HoldIndex()
+    later = time.time() + 300
+    index.add('old' + 'x' * 29, 7, 1, ['B1'], later)
+    started = time.monotonic()
+    index.add('new' + 'x' * 29, 7, 2, ['B2'], later)
+
+    # The read began before 'new' was committed, and before 'old' was released elsewhere
+    index.sync(7, {}, started)
+    assert index.held_seats(7) == ['B2']
+
+
+def test_sync_leaves_other_shows_alone():
+    index = HoldIndex()
+    later = time.time() + 300
+    index.add('h' * 32, 8, 1, ['C1'], later)
+    index.sync(7, {}, time.monotonic())
+    assert index.held_seats(8) == ['C1']
+    assert index.stale(8, 1)
@@ -0,0 +1,96 @@
+"""Seat holds: placing, converting, releasing and expiring them (needs MySQL, see conftest.py)."""
+import time
+import uuid
+
+from db.connection import get_conn
+
+
+def held_seats(client, show_id):
+    return client.get(f'/api/show/{show_id}/booked-seats').get_json()['held_seats']
+
+
+def test_hold_blocks_other_customers(sign_in, show):
+    holder, other = sign_in(), sign_in()
+    show_id = show['show_id']
+
+    resp = holder.post(f'/api/show/{show_id}/hold', json={'seats': ['C5', 'C6']})
+    assert resp.status_code == 200, resp.get_json()
+    assert resp.get_json()['seats'] == ['C5', 'C6']
+    assert held_seats(other, show_id) == ['C5', 'C6']
+
+    resp = other.post(f'/api/show/{show_id}/hold', json={'seats': ['C6', 'C7']})
+    assert resp.status_code == 409
+    assert resp.get_json()['conflicts'] == ['C6']
+
+    resp = other.post('/api/book', json={'show_id': show_id, 'selected_seats': ['C6']})
+    assert resp.status_code == 409
+    assert resp.get_json()['conflicts'] == ['C6']
+
+
+def test_holds_placed_through_another_worker_show_up(sign_in, show):
+    holder, other = sign_in(), sign_in()
+    show_id = show['show_id']
+    # What another worker process leaves behind: the row, but nothing in this process's index
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO seat_hold (show_id, seat_id, hold_id, cust_id, expires_at) "
+                "VALUES (%s, 'I4', %s, %s, UTC_TIMESTAMP() + INTERVAL 5 MINUTE)",
+                (show_id, uuid.uuid4().hex, holder.cust_id)
+            )
+        conn.commit()
+
+    assert held_seats(other, show_id) == ['I4']
+    resp = other.post(f'/api/show/{show_id}/hold', json={'seats': ['I4']})
+    assert resp.status_code == 409
+    assert resp.get_json()['conflicts'] == ['I4']
+
+
+def test_booking_converts_own_hold(sign_in, show):
+    client = sign_in()
+    show_id = show['show_id']
+    assert client.post(f'/api/show/{show_id}/hold', json={'seats': ['E1', 'E2']}).status_code == 200
+
+    resp = client.post('/api/book', json={'show_id': show_id, 'selected_seats': ['E1', 'E2']})
+    assert resp.status_code == 200, resp.get_json()
+    assert held_seats(client, show_id) == []
+
+
+def test_new_hold_replaces_previous_one(sign_in, show):
+    client = sign_in()
+    show_id = show['show_id']
+    assert client.post(f'/api/show/{show_id}/hold', json={'seats': ['F1']}).status_code == 200
+    assert client.post(f'/api/show/{show_id}/hold', json={'seats': ['F2']}).status_code == 200
+    assert held_seats(client, show_id) == ['F2']
+
+
+def test_release_hold(sign_in, show):
+    holder, other = sign_in(), sign_in()
+    show_id = show['show_id']
+    assert holder.post(f'/api/show/{show_id}/hold', json={'seats': ['G3']}).status_code == 200
+
+    resp = holder.delete(f'/api/show/{show_id}/hold')
+    assert resp.status_code == 200
+    assert resp.get_json()['released_seats'] == ['G3']
+    assert held_seats(other, show_id) == []
+    assert other.post(f'/api/show/{show_id}/hold', json={'seats': ['G3']}).status_code == 200
+
+
+def test_hold_expires(sign_in, show):
+    holder, other = sign_in(), sign_in()
+    show_id = show['show_id']
+    assert holder.post(f'/api/show/{show_id}/hold', json={'seats': ['J1'], 'ttl_seconds': 2}).status_code == 200
+    # expires_at is whole seconds, so at least one second is left here
+    assert held_seats(other, show_id) == ['J1']
+
+    time.sleep(3.5)
+    assert held_seats(other, show_id) == []
+    resp = other.post('/api/book', json={'show_id': show_id, 'selected_seats': ['J1']})
+    assert resp.status_code == 200, resp.get_json()
+
+
+def test_hold_rejects_bad_ttl(sign_in, show):
+    client = sign_in()
+    for ttl in ('abc', 0, -5, [1]):
+        resp = client.post(f"/api/show/{show['show_id']}/hold", json={'seats': ['A1'], 'ttl_seconds': ttl})
+        assert resp.status_code == 400, ttl
@@ -0,0 +1,68 @@
+"""Idempotency-Key on POST /api/book (needs MySQL, see conftest.py)."""
+from utils.idempotency import idempotent_requests
+
+
+def book(client, show_id, seats, key):
+    return client.post('/api/book', json={'show_id': show_id, 'selected_seats': seats},
+                       headers={'Idempotency-Key': key})
+
+
+def my_booking_ids(client):
+    return [b['booking_id'] for b in client.get('/api/my-bookings').get_json()['bookings']]
+
+
+def test_retry_replays_the_first_response(sign_in, show):
+    client = sign_in()
+    first = book(client, show['show_id'], ['A3', 'A4'], 'retry-1')
+    assert first.status_code == 200, first.get_json()
+    assert 'Idempotent-Replayed' not in first.headers
+
+    again = book(client, show['show_id'], ['A3', 'A4'], 'retry-1')
+    assert again.status_code == 200
+    assert again.headers['Idempotent-Replayed'] == 'true'
+    assert again.get_json() == first.get_json()
+    assert my_booking_ids(client) == [first.get_json()['booking_id']]
+
+
+def test_retry_replays_from_the_database(sign_in, show):
+    client = sign_in()
+    first = book(client, show['show_id'], ['B7'], 'retry-2')
+    assert first.status_code == 200, first.get_json()
+    # As if the retry reached another worker, or this one after a restart
+    idempotent_requests._done.clear()
+
+    again = book(client, show['show_id'], ['B7'], 'retry-2')
+    assert again.status_code == 200
+    assert again.headers['Idempotent-Replayed'] == 'true'
+    assert again.get_json()['booking_id'] == first.get_json()['booking_id']
+    assert my_booking_ids(client) == [first.get_json()['booking_id']]
+
+
+def test_key_reused_with_a_different_body_is_rejected(sign_in, show):
+    client = sign_in()
+    assert book(client, show['show_id'], ['C1'], 'reused').status_code == 200
+
+    resp = book(client, show['show_id'], ['C2'], 'reused')
+    assert resp.status_code == 422
+    assert len(my_booking_ids(client)) == 1
+
+
+def test_keys_are_per_customer(sign_in, show):
+    first, second = sign_in(), sign_in()
+    assert book(first, show['show_id'], ['D1'], 'same-key').status_code == 200
+
+    resp = book(second, show['show_id'], ['D2'], 'same-key')
+    assert resp.status_code == 200, resp.get_json()
+    assert 'Idempotent-Replayed' not in resp.headers
+
+
+def test_conflict_is_replayed(sign_in, show):
+    taken_by = sign_in()
+    assert taken_by.post('/api/book', json={'show_id': show['show_id'], 'selected_seats': ['E9']}).status_code == 200
+
+    client = sign_in()
+    first = book(client, show['show_id'], ['E9'], 'conflict')
+    assert first.status_code == 409
+    again = book(client, show['show_id'], ['E9'], 'conflict')
+    assert again.status_code == 409
+    assert again.headers['Idempotent-Replayed'] == 'true'
@@ -0,0 +1,36 @@
+"""utils.response_cache size limits (no database needed)."""
+import pytest
+
+from utils.response_cache import MemoryBackend, SqliteBackend, ResponseCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache(request, tmp_path):
+    if request.param == 'sqlite':
+        return ResponseCache(SqliteBackend(str(tmp_path / 'cache.sqlite3'), max_entries=3))
+    return ResponseCache(MemoryBackend(max_entries=3))
+
+
+def cached_paths(cache, namespace, paths):
+    return [path for path in paths if cache.lookup(namespace, path) is not None]
+
+
+def test_search_churn_keeps_the_catalog_entries(cache):
+    cache.limit('search', 2)
+    for namespace in ('movies', 'theatres', 'screens'):
+        cache.store(namespace, '/api/' + namespace, b'{}')
+
+    queries = [f'/api/search?q={i}' for i in range(10)]
+    for path in queries:
+        cache.store('search', path, b'{}')
+
+    assert cached_paths(cache, 'search', queries) == queries[-2:]
+    for namespace in ('movies', 'theatres', 'screens'):
+        assert cache.lookup(namespace, '/api/' + namespace) is not None
+
+
+def test_unlimited_namespaces_share_the_default_size(cache):
+    paths = [f'/api/movies?page={i}' for i in range(5)]
+    for path in paths:
+        cache.store('movies', path, b'{}')
+    assert cached_paths(cache, 'movies', paths) == paths[-3:]
@@ -0,0 +1,51 @@
+"""The revenue_daily triggers (db/revenue_rollup.sql; needs MySQL, see conftest.py)."""
+import pytest
+from mysql.connector import errors, errorcode
+
+from db.connection import get_conn
+
+
+def rollup(show):
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(SUM(bookings), 0), COALESCE(SUM(seats), 0), COALESCE(SUM(revenue), 0) "
+                        "FROM revenue_daily WHERE theatre_id = %s AND movie_id = %s",
+                        (show['theatre_id'], show['movie_id']))
+            bookings, seats, revenue = cur.fetchone()
+    return int(bookings), int(seats), float(revenue)
+
+
+def test_booking_and_cancel_update_the_rollup(sign_in, make_show):
+    show = make_show(base_price=150)
+    client = sign_in()
+
+    resp = client.post('/api/book', json={'show_id': show['show_id'], 'selected_seats': ['A1', 'D1']})
+    assert resp.status_code == 200, resp.get_json()
+    # 150 + (150 + 100 premium surcharge)
+    assert rollup(show) == (1, 2, 400.0)
+
+    assert client.post(f"/api/cancel-booking/{resp.get_json()['booking_id']}").status_code == 200
+    assert rollup(show) == (0, 0, 0.0)
+
+
+def test_booked_show_keeps_its_movie_and_screen(sign_in, make_show):
+    show, other = make_show(), make_show()
+    assert sign_in().post('/api/book', json={'show_id': show['show_id'], 'selected_seats': ['A1']}).status_code == 200
+
+    for sql, params in (
+        ("UPDATE showtime SET movie_id = %s WHERE show_id = %s", (other['movie_id'], show['show_id'])),
+        ("UPDATE showtime SET screen_id = %s WHERE show_id = %s", (other['screen_id'], show['show_id'])),
+        ("UPDATE screen SET theatre_id = %s WHERE screen_id = %s", (other['theatre_id'], show['screen_id'])),
+    ):
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                with pytest.raises(errors.Error) as raised:
+                    cur.execute(sql, params)
+                assert raised.value.errno == errorcode.ER_SIGNAL_EXCEPTION
+            conn.rollback()
+
+    # Edits that don't move the revenue are still allowed
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE showtime SET base_price = 180 WHERE show_id = %s", (show['show_id'],))
+        conn.commit()
@@ -0,0 +1,59 @@
+"""The URL map of each app profile still has every route its clients call.
+
+Builds the apps only (no database needed):
+
+    python -m pytest -q tests
+"""
+import pytest
+
+from app import create_app
+
+# (method, rule) used by the React frontend (frontend-main/src) and bench/run.py
+API_ROUTES = [
+    ('POST', '/api/auth/login'),
+    ('POST', '/api/auth/register'),
+    ('POST', '/api/auth/logout'),
+    ('GET', '/api/auth/me'),
+    ('GET', '/api/shows'),
+    ('GET', '/api/movies'),
+    ('GET', '/api/movies/<int:movie_id>/next-shows'),
+    ('GET', '/api/theatres'),
+    ('GET', '/api/screens'),
+    ('GET', '/api/search'),
+    ('GET', '/api/screen/<int:screen_id>/layout'),
+    ('GET', '/api/show/<int:show_id>/booked-seats'),
+    ('GET', '/api/show/<int:show_id>/seats/stream'),
+    ('POST', '/api/show/<int:show_id>/hold'),
+    ('DELETE', '/api/show/<int:show_id>/hold'),
+    ('POST', '/api/book'),
+    ('POST', '/api/bookings/batch'),
+    ('GET', '/api/my-bookings'),
+    ('POST', '/api/cancel-booking/<int:booking_id>'),
+    ('GET', '/api/admin/stats'),
+    ('GET', '/api/admin/bookings'),
+    ('POST', '/api/admin/add-show'),
+]
+SITE_ROUTES = [
+    ('GET', '/health'),
+    ('GET', '/shows'),
+    ('GET', '/my_bookings'),
+]
+ADMIN_ROUTES = [
+    ('GET', '/admin/dashboard'),
+    ('GET', '/admin/metrics/pool'),
+]
+
+
+def _routes(app):
+    return {(method, rule.rule) for rule in app.url_map.iter_rules() for method in rule.methods}
+
+
+@pytest.mark.parametrize('profile, expected', [
+    ('api', API_ROUTES),
+    ('full', API_ROUTES + SITE_ROUTES),
+    ('admin', SITE_ROUTES + ADMIN_ROUTES),
+])
+def test_profile_registers_routes(profile, expected):
+    routes = _routes(create_app(profile))
+    missing = [route for route in expected if route not in routes]
+    assert not missing, f'{profile} profile is missing routes: {missing}'
@@ -1,5 +1,8 @@
 from functools import wraps
 from flask import session, redirect, url_for, flash
+from db.connection import get_conn
+from utils.passwords import verify_password
+from utils.sessions import remember_user
 
 def login_required(view_func):
     @wraps(view_func)
@@ -9,3 +12,33 @@ def login_required(view_func):
             return redirect(url_for('auth.login_get'))
         return view_func(*args, **kwargs)
     return wrapper
+
+
+def check_login(email, password):
+    """The customer row for email if password matches it, else None.
+
+    A hash made with other PASSWORD_ROUNDS is replaced by the fresh one the
+    verify produced. Raises HashingBusy when the hashing pool is saturated.
+    """
+    with get_conn() as conn:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute("SELECT cust_id, name, email, role, password_hash FROM customer WHERE email=%s", (email,))
+            user = cur.fetchone()
+    if not user:
+        return None
+
+    ok, upgraded = verify_password(password, user['password_hash'])
+    if not ok:
+        return None
+    if upgraded:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                # Only if nobody changed the password meanwhile
+                cur.execute(
+                    "UPDATE customer SET password_hash=%s WHERE cust_id=%s AND password_hash=%s",
+                    (upgraded, user['cust_id'], user['password_hash'])
+                )
+            conn.commit()
+    # The session reads name/role from the user cache; spare it the first lookup
+    remember_user(user)
+    return user
@@ -0,0 +1,148 @@
+"""In-memory index of live seat holds with heap-based expiry.
+
+The ``seat_hold`` table is the source of truth (it survives restarts and
+arbitrates between workers through its primary key); this index mirrors the
+holds placed through this process, so seat maps and conflict pre-checks
+rarely need a query. Holds placed or released through other workers are
+picked up by ``sync``, which replaces a show's entries with its live
+``seat_hold`` rows; callers re-read a show once ``stale`` says its last read
+is too old. A single daemon thread sleeps until the earliest expiry on the
+heap and fires ``on_expire(show_id, seats, hold_id)`` for each hold that
+lapses.
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+MAX_SYNCED_SHOWS = 4096
+
+
+class HoldIndex:
+    def __init__(self):
+        self._holds = {}    # hold_id -> (show_id, cust_id, seats, expires_at)
+        self._by_show = {}  # show_id -> {seat_id: hold_id}
+        self._heap = []     # (expires_at, hold_id); stale entries skipped on pop
+        self._added = {}    # hold_id -> time.monotonic() when indexed
+        self._synced = OrderedDict()  # show_id -> time.monotonic() of its last sync
+        self._cond = threading.Condition()
+        self._sweeper = None
+        self.on_expire = None
+
+    def add(self, hold_id, show_id, cust_id, seats, expires_at):
+        """expires_at is a time.time() timestamp."""
+        with self._cond:
+            self._add_locked(hold_id, show_id, cust_id, seats, expires_at)
+            self._cond.notify()
+
+    def _add_locked(self, hold_id, show_id, cust_id, seats, expires_at):
+        self._remove_locked(hold_id)
+        self._holds[hold_id] = (show_id, cust_id, list(seats), expires_at)
+        self._added[hold_id] = time.monotonic()
+        show = self._by_show.setdefault(show_id, {})
+        for seat in seats:
+            show[seat] = hold_id
+        heapq.heappush(self._heap, (expires_at, hold_id))
+
+    def remove(self, hold_id):
+        """Drop a hold; returns (show_id, cust_id, seats, expires_at) or None."""
+        with self._cond:
+            return self._remove_locked(hold_id)
+
+    def _remove_locked(self, hold_id):
+        hold = self._holds.pop(hold_id, None)
+        if hold is None:
+            return None
+        self._added.pop(hold_id, None)
+        show = self._by_show.get(hold[0], {})
+        for seat in hold[2]:
+            if show.get(seat) == hold_id:
+                del show[seat]
+        if not show:
+            self._by_show.pop(hold[0], None)
+        return hold
+
+    def stale(self, show_id, max_age):
+        """Whether show_id's holds were last synced from seat_hold over max_age seconds ago."""
+        with self._cond:
+            synced = self._synced.get(show_id)
+        return synced is None or time.monotonic() - synced >= max_age
+
+    def sync(self, show_id, holds, started):
+        """Make show_id's entries match its live seat_hold rows.
+
+        holds is {hold_id: (cust_id, seats, expires_at)}, read after
+        ``started`` (a time.monotonic() value); holds indexed here since then
+        are kept even if the read missed them.
+        """
+        with self._cond:
+            for hold_id in set(self._by_show.get(show_id, {}).values()):
+                if hold_id not in holds and self._added[hold_id] < started:
+                    self._remove_locked(hold_id)
+            for hold_id, (cust_id, seats, expires_at) in holds.items():
+                if self._holds.get(hold_id) != (show_id, cust_id, list(seats), expires_at):
+                    self._add_locked(hold_id, show_id, cust_id, seats, expires_at)
+            self._synced[show_id] = time.monotonic()
+            self._synced.move_to_end(show_id)
+            while len(self._synced) > MAX_SYNCED_SHOWS:
+                self._synced.popitem(last=False)
+            self._cond.notify()
+
+    def hold_for(self, show_id, cust_id):
+        """hold_id of cust_id's live hold on show_id, if any."""
+        now = time.time()
+        with self._cond:
+            for hold_id in set(self._by_show.get(show_id, {}).values()):
+                hold = self._holds[hold_id]
+                if hold[1] == cust_id and hold[3] > now:
+                    return hold_id
+        return None
+
+    def held_seats(self, show_id):
+        now = time.time()
+        with self._cond:
+            return sorted(
+                seat for seat, hold_id in self._by_show.get(show_id, {}).items()
+                if self._holds[hold_id][3] > now
+            )
+
+    def held_by_others(self, show_id, seats, cust_id):
+        now = time.time()
+        with self._cond:
+            show = self._by_show.get(show_id, {})
+            out = []
+            for seat in seats:
+                hold = self._holds.get(show.get(seat))
+                if hold and hold[1] != cust_id and hold[3] > now:
+                    out.append(seat)
+            return out
+
+    def start_sweeper(self):
+        with self._cond:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep_forever, name='seat-hold-sweeper', daemon=True)
+                self._sweeper.start()
+
+    def _sweep_forever(self):
+        while True:
+            expired = []
+            with self._cond:
+                while not expired:
+                    now = time.time()
+                    while self._heap and self._heap[0][0] <= now:
+                        expires_at, hold_id = heapq.heappop(self._heap)
+                        hold = self._holds.get(hold_id)
+                        if hold and hold[3] == expires_at:
+                            self._remove_locked(hold_id)
+                            expired.append((hold_id, hold))
+                    if not expired:
+                        self._cond.wait(self._heap[0][0] - now if self._heap else None)
+            for hold_id, (show_id, _, seats, _) in expired:
+                if self.on_expire:
+                    try:
+                        self.on_expire(show_id, seats, hold_id)
+                    except Exception as e:
+                        print(f"Seat hold expiry hook failed: {e}")
+
+
+seat_holds = HoldIndex()
@@ -0,0 +1,226 @@
+"""Idempotency-Key handling for retried writes (POST /api/book).
+
+Keys are scoped to the customer. For a request carrying one:
+
+* a response completed in this process is replayed from a bounded TTL/LRU
+  cache, without touching the database,
+* a duplicate arriving while the first request is still running waits on its
+  future and gets the same response,
+* otherwise one primary-key lookup in ``idempotency_key`` (db/idempotency.py)
+  finds a response stored by another worker or before a restart,
+* and only when all of those miss does the request execute.
+
+Replays carry ``Idempotent-Replayed: true``. Reusing a key with a different
+request body is answered with 422. 5xx responses aren't stored, so a retry
+after a server error runs again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import current_app
+from mysql.connector import errors, errorcode
+
+from db import idempotency as store
+from db.connection import get_conn
+from utils.jsonrows import dumps
+
+KEY_MAX_LENGTH = 64
+_MISMATCH = {'error': 'This Idempotency-Key was already used with a different request'}
+
+
+def request_hash(payload):
+    """Fingerprint of a JSON request body, to tell a retry from a reused key."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.md5(canonical.encode()).hexdigest()
+
+
+def valid_key(key):
+    return 0 < len(key) <= KEY_MAX_LENGTH and key.isascii() and key.isprintable()
+
+
+class IdempotentRequests:
+    def __init__(self, max_entries=1024, ttl=86400, wait=30, purge_every=100):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.wait = wait
+        self.purge_every = purge_every
+        self._done = OrderedDict()  # (cust_id, key) -> (request_hash, status, body, expires_at)
+        self._inflight = {}         # (cust_id, key) -> (request_hash, Future of (status, body))
+        self._lock = threading.Lock()
+
+        self.executed = 0
+        self.replayed_memory = 0
+        self.replayed_db = 0
+        self.coalesced = 0
+        self.mismatched = 0
+        self.timed_out = 0
+
+    def run(self, cust_id, key, request_hash, execute):
+        """Response for a request, running ``execute(record)`` at most once per key.
+
+        ``execute`` returns (body dict, status). A successful write must call
+        ``record(cur, status, body)`` inside its transaction, before the commit,
+        so the stored response commits (or rolls back) with it.
+        """
+        ident = (cust_id, key)
+        running = done = future = None
+        with self._lock:
+            done = self._cached(ident)
+            if done is None:
+                running = self._inflight.get(ident)
+                if running is None:
+                    future = Future()
+                    self._inflight[ident] = (request_hash, future)
+
+        if done is not None:
+            if done[0] != request_hash:
+                return self._mismatch()
+            with self._lock:
+                self.replayed_memory += 1
+            return self._response(done[1], done[2], replayed=True)
+
+        if running is not None:
+            if running[0] != request_hash:
+                return self._mismatch()
+            try:
+                status, body = running[1].result(timeout=self.wait)
+            except FutureTimeout:
+                with self._lock:
+                    self.timed_out += 1
+                return self._response(409, dumps({
+                    'error': 'A request with this Idempotency-Key is still in progress, please retry'
+                }), headers={'Retry-After': '1'})
+            with self._lock:
+                self.coalesced += 1
+            return self._response(status, body, replayed=True)
+
+        try:
+            status, body, replayed = self._execute(ident, request_hash, execute)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result((status, body))
+        finally:
+            with self._lock:
+                self._inflight.pop(ident, None)
+        return self._response(status, body, replayed=replayed)
+
+    def _execute(self, ident, request_hash, execute):
+        cust_id, key = ident
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                stored = store.lookup(cur, cust_id, key)
+        if stored is not None:
+            return self._replay_stored(ident, request_hash, stored)
+
+        recorded = []
+
+        def record(cur, status, body):
+            data = dumps(body)
+            store.record(cur, cust_id, key, request_hash, status, data, self.ttl)
+            recorded.append(data)
+
+        body, status = execute(record)
+        with self._lock:
+            self.executed += 1
+            purge = self.purge_every and self.executed % self.purge_every == 0
+        data = recorded[0] if recorded else dumps(body)
+
+        if status < 500 and not recorded:
+            # A deterministic failure (invalid seats, conflict): store it on its own
+            try:
+                with get_conn() as conn:
+                    with conn.cursor() as cur:
+                        store.record(cur, cust_id, key, request_hash, status, data, self.ttl)
+                    conn.commit()
+            except errors.IntegrityError as e:
+                if e.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+                # A duplicate served by another worker got there first (likely why this one failed)
+                with get_conn() as conn:
+                    with conn.cursor() as cur:
+                        stored = store.lookup(cur, cust_id, key)
+                if stored is not None:
+                    return self._replay_stored(ident, request_hash, stored)
+            except Exception as e:
+                print(f"Idempotency store error: {str(e)}")
+        if status < 500:
+            self._remember(ident, (request_hash, status, data))
+        if purge:
+            self._purge()
+        return status, data, False
+
+    def _replay_stored(self, ident, request_hash, stored):
+        self._remember(ident, stored)
+        if stored[0] != request_hash:
+            with self._lock:
+                self.mismatched += 1
+            return 422, dumps(_MISMATCH), False
+        with self._lock:
+            self.replayed_db += 1
+        return stored[1], stored[2], True
+
+    def _cached(self, ident):
+        entry = self._done.get(ident)
+        if entry is None:
+            return None
+        if entry[3] < time.time():
+            del self._done[ident]
+            return None
+        self._done.move_to_end(ident)
+        return entry
+
+    def _remember(self, ident, stored):
+        with self._lock:
+            self._done[ident] = tuple(stored) + (time.time() + self.ttl,)
+            self._done.move_to_end(ident)
+            while len(self._done) > self.max_entries:
+                self._done.popitem(last=False)
+
+    def _purge(self):
+        try:
+            with get_conn() as conn:
+                store.purge(conn)
+        except Exception as e:
+            print(f"Idempotency purge error: {str(e)}")
+
+    def _mismatch(self):
+        with self._lock:
+            self.mismatched += 1
+        return self._response(422, dumps(_MISMATCH))
+
+    @staticmethod
+    def _response(status, body, replayed=False, headers=None):
+        resp = current_app.response_class(body, status=status, mimetype='application/json')
+        if replayed:
+            resp.headers['Idempotent-Replayed'] = 'true'
+        for name, value in (headers or {}).items():
+            resp.headers[name] = value
+        return resp
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cached': len(self._done),
+                'max_entries': self.max_entries,
+                'in_flight': len(self._inflight),
+                'executed': self.executed,
+                'replayed_memory': self.replayed_memory,
+                'replayed_db': self.replayed_db,
+                'coalesced': self.coalesced,
+                'mismatched': self.mismatched,
+                'timed_out': self.timed_out,
+            }
+
+
+idempotent_requests = IdempotentRequests(
+    max_entries=int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '1024')),
+    ttl=store.IDEMPOTENCY_TTL_SECONDS,
+    wait=float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '30')),
+)
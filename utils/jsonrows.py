@@ -0,0 +1,139 @@
+"""Encode DB rows straight to JSON without per-row fix-up loops.
+
+Routes fetch plain tuples and hand the cursor description to
+``row_encoder()``, which works out once per query shape which columns need
+converting (DATE -> 'YYYY-MM-DD', DATETIME/TIMESTAMP -> 'YYYY-MM-DD HH:MM:SS',
+TIME -> 'H:MM:SS', DECIMAL -> float, JSON -> parsed value) and then builds the row dicts in one
+pass. ``json_response()`` serializes the payload in one call, using orjson
+when it is installed, and ``stream_json_array()`` writes large result sets
+batch by batch instead of materializing them.
+"""
+import json
+import threading
+from datetime import date, datetime, timedelta, time
+from decimal import Decimal
+
+from flask import current_app
+from mysql.connector import FieldType
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+_MAX_SHAPES = 256
+
+
+def _date(value):
+    return value.isoformat()
+
+
+def _datetime(value):
+    return value.isoformat(' ', 'seconds')
+
+
+def _time(value):
+    return str(value)
+
+
+def _json(value):
+    return json.loads(value)
+
+
+_CONVERTERS = {
+    FieldType.DATE: _date,
+    FieldType.NEWDATE: _date,
+    FieldType.DATETIME: _datetime,
+    FieldType.TIMESTAMP: _datetime,
+    FieldType.TIME: _time,
+    FieldType.DECIMAL: float,
+    FieldType.NEWDECIMAL: float,
+    FieldType.JSON: _json,
+}
+
+
+class RowEncoder:
+    """Column names plus the (index, converter) pairs for one query shape."""
+
+    def __init__(self, description):
+        self.names = tuple(col[0] for col in description)
+        self.convert = tuple(
+            (i, _CONVERTERS[col[1]]) for i, col in enumerate(description) if col[1] in _CONVERTERS
+        )
+
+    def encode(self, row):
+        if self.convert:
+            row = list(row)
+            for i, conv in self.convert:
+                value = row[i]
+                if value is not None:
+                    row[i] = conv(value)
+        return dict(zip(self.names, row))
+
+    def dicts(self, rows):
+        return [self.encode(row) for row in rows]
+
+
+_shapes = {}
+_shapes_lock = threading.Lock()
+
+
+def row_encoder(description):
+    """The cached RowEncoder for a cursor.description."""
+    key = tuple((col[0], col[1]) for col in description)
+    encoder = _shapes.get(key)
+    if encoder is None:
+        encoder = RowEncoder(description)
+        with _shapes_lock:
+            if len(_shapes) >= _MAX_SHAPES:
+                _shapes.clear()
+            _shapes[key] = encoder
+    return encoder
+
+
+def fetch_dicts(cur):
+    """fetchall() on a tuple cursor, returned as JSON-ready dicts."""
+    return row_encoder(cur.description).dicts(cur.fetchall())
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return _datetime(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Serialize to JSON bytes (orjson when available)."""
+    if orjson is not None:
+        # Passthrough keeps datetimes on the same 'YYYY-MM-DD HH:MM:SS' format as the stdlib path
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(payload, separators=(',', ':'), default=_default).encode()
+
+
+def json_response(payload, status=200):
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+def stream_json_array(cur, head=b'[', tail=b']', batch_size=500):
+    """Yield ``head``, the cursor's remaining rows as a JSON array body, then ``tail``.
+
+    Rows are pulled with fetchmany(batch_size), so memory stays flat however
+    many rows the query returns.
+    """
+    encoder = row_encoder(cur.description)
+    yield head
+    first = True
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        chunk = b','.join(dumps(encoder.encode(row)) for row in rows)
+        yield chunk if first else b',' + chunk
+        first = False
+    yield tail
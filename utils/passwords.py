@@ -0,0 +1,169 @@
+"""Password hashing off the request threads.
+
+PBKDF2 is pure CPU and holds the GIL, so hashing inline stalls every other
+request in the worker during a login storm. hash_password() and
+verify_password() instead run in a small process pool (PASSWORD_HASH_WORKERS
+processes, 0 = inline), behind a bounded number of in-flight jobs
+(PASSWORD_HASH_QUEUE). When that is full, or a job waits longer than
+PASSWORD_HASH_TIMEOUT seconds, HashingBusy is raised and the app answers 429.
+
+The cost is PASSWORD_ROUNDS (pbkdf2_sha256 rounds). verify_password() also
+reports a fresh hash when the stored one was made with other rounds, so
+logins transparently move accounts to the current setting.
+
+This module is what the pool processes import, so it stays free of Flask
+and DB imports.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+PASSWORD_ROUNDS = int(os.getenv('PASSWORD_ROUNDS', '29000'))
+HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(max((os.cpu_count() or 2) // 2, 1))))
+HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', str(max(HASH_WORKERS, 1) * 4)))
+HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+
+
+class HashingBusy(Exception):
+    """Too many password hashes in flight (or one waited too long); retry shortly."""
+
+
+_hashers = {}
+
+
+def _hasher(rounds):
+    hasher = _hashers.get(rounds)
+    if hasher is None:
+        from passlib.hash import pbkdf2_sha256
+        # Pinning min/max desired rounds makes needs_update() flag any other cost
+        hasher = _hashers[rounds] = pbkdf2_sha256.using(
+            default_rounds=rounds, min_desired_rounds=rounds, max_desired_rounds=rounds
+        )
+    return hasher
+
+
+def _hash(password, rounds):
+    return _hasher(rounds).hash(password)
+
+
+def _verify(password, stored, rounds):
+    """(matches, new hash if the stored one should be upgraded else None)."""
+    hasher = _hasher(rounds)
+    try:
+        ok = hasher.verify(password, stored)
+    except ValueError:  # not a pbkdf2_sha256 hash
+        return False, None
+    return ok, (hasher.hash(password) if ok and hasher.needs_update(stored) else None)
+
+
+class PasswordPool:
+    def __init__(self, workers, queue, timeout, rounds):
+        self.workers = workers
+        self.capacity = queue
+        self.timeout = timeout
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_ms = 0.0
+        self.in_flight = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    import multiprocessing
+                    # spawn: forking a threaded web worker can copy held locks
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy(f'{self.capacity} password hashes already in flight')
+        with self._lock:
+            self.in_flight += 1
+        started = time.monotonic()
+
+        if self.workers <= 0:
+            try:
+                result = fn(*args)
+            finally:
+                self._done(None)
+        else:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                self._done(None)
+                self._reset()
+                raise HashingBusy('password hashing pool restarted')
+            # The slot is held until the job really ends, even if we stop waiting for it
+            future.add_done_callback(self._done)
+            try:
+                result = future.result(self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                with self._lock:
+                    self.timed_out += 1
+                raise HashingBusy(f'password hash waited over {self.timeout}s')
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool next time
+                self._reset()
+                raise HashingBusy('password hashing pool restarted')
+
+        with self._lock:
+            self.completed += 1
+            self.total_ms += (time.monotonic() - started) * 1000
+        return result
+
+    def _done(self, future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _reset(self):
+        with self._lock:
+            self._executor = None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'rounds': self.rounds,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_ms': round(self.total_ms / self.completed, 2) if self.completed else 0.0,
+            }
+
+
+password_pool = PasswordPool(HASH_WORKERS, HASH_QUEUE, HASH_TIMEOUT, PASSWORD_ROUNDS)
+
+
+def hash_password(password):
+    """pbkdf2_sha256 hash of password at PASSWORD_ROUNDS. Raises HashingBusy."""
+    return password_pool.run(_hash, password, password_pool.rounds)
+
+
+def verify_password(password, stored):
+    """(matches, upgraded hash or None). Raises HashingBusy."""
+    if not stored:
+        return False, None
+    return password_pool.run(_verify, password, stored, password_pool.rounds)
@@ -0,0 +1,63 @@
+"""Startup timings and memory of the current process (serve.py, /admin/metrics/process).
+
+Memory comes from /proc/self/smaps_rollup on Linux: ``uss`` (pages only
+this process holds) is what each extra worker really costs, while ``shared``
+counts pages still shared copy-on-write with the preloading parent. Other
+Unix platforms only report peak RSS.
+"""
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_timings = {}  # name -> ms
+_role = {'role': 'single', 'since': time.monotonic()}
+
+
+def mark(name, started):
+    """Record the milliseconds since ``started`` (a time.monotonic()) under name."""
+    ms = round((time.monotonic() - started) * 1000, 1)
+    _timings[name] = ms
+    return ms
+
+
+def set_role(role):
+    _role['role'] = role
+    _role['since'] = time.monotonic()
+
+
+def memory():
+    """{'rss_mb', 'uss_mb', 'shared_mb'} (the latter two only on Linux, nothing on Windows)."""
+    try:
+        fields = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if rest.strip().endswith('kB'):
+                    fields[key] = int(rest.split()[0])
+        return {
+            'rss_mb': round(fields['Rss'] / 1024, 1),
+            'uss_mb': round((fields['Private_Clean'] + fields['Private_Dirty']) / 1024, 1),
+            'shared_mb': round((fields['Shared_Clean'] + fields['Shared_Dirty']) / 1024, 1),
+        }
+    except (OSError, KeyError, ValueError):
+        if resource is None:
+            return {}
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KiB elsewhere
+        return {'rss_mb': round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)}
+
+
+def process_stats():
+    return {
+        'pid': os.getpid(),
+        'ppid': os.getppid(),
+        'role': _role['role'],
+        'uptime_seconds': round(time.monotonic() - _role['since'], 1),
+        'startup_ms': dict(_timings),
+        'memory': memory(),
+    }
@@ -0,0 +1,189 @@
+"""TTL + LRU cache for whole JSON responses of rarely-changing endpoints.
+
+A cached view runs once; its serialized body is stored with an ETag and a
+Last-Modified stamp and replayed byte-for-byte until the TTL lapses or a
+write handler calls ``invalidate()`` for its namespace. Conditional GETs
+(If-None-Match / If-Modified-Since) are answered with 304.
+
+Backends:
+
+* ``memory`` (default) - per-process, shared-nothing; other workers only see
+  an invalidation once their own copy expires.
+* ``sqlite`` - one file shared by every worker on the host, so invalidation
+  is immediate everywhere. Set RESPONSE_CACHE_PATH to choose the file.
+
+Namespaces share RESPONSE_CACHE_SIZE entries, except those cached with their
+own ``max_entries``: those are trimmed within their own limit, so a namespace
+with many distinct keys (search queries) can't evict the catalog entries.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.namespace_limits = {}
+        self._entries = OrderedDict()  # key -> (namespace, body, etag, last_modified, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[4] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:4]
+
+    def set(self, key, namespace, body, etag, last_modified, ttl):
+        with self._lock:
+            self._entries[key] = (namespace, body, etag, last_modified, time.time() + ttl)
+            self._entries.move_to_end(key)
+            limit = self.namespace_limits.get(namespace)
+            if limit is None:
+                # Oldest first, among the namespaces without a limit of their own
+                keys = [k for k, v in self._entries.items() if v[0] not in self.namespace_limits]
+                limit = self.max_entries
+            else:
+                keys = [k for k, v in self._entries.items() if v[0] == namespace]
+            for k in keys[:max(len(keys) - limit, 0)]:
+                del self._entries[k]
+
+    def invalidate(self, namespace):
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v[0] == namespace]:
+                del self._entries[key]
+
+
+class SqliteBackend:
+    def __init__(self, path, max_entries=256):
+        import sqlite3  # only this backend needs it
+        self._sqlite3 = sqlite3
+        self.path = path
+        self.max_entries = max_entries
+        self.namespace_limits = {}
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, namespace TEXT NOT NULL, body BLOB NOT NULL,"
+                " etag TEXT NOT NULL, last_modified REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_ns ON response_cache (namespace)")
+
+    def _conn(self):
+        # One connection per thread, reopened after a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT body, etag, last_modified FROM response_cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time())
+        ).fetchone()
+        return (bytes(row[0]), row[1], row[2]) if row else None
+
+    def set(self, key, namespace, body, etag, last_modified, ttl):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, namespace, body, etag, last_modified, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, namespace, body, etag, last_modified, time.time() + ttl)
+        )
+        conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+        limit = self.namespace_limits.get(namespace)
+        if limit is None:
+            limited = list(self.namespace_limits)
+            scope = f"namespace NOT IN ({', '.join('?' * len(limited))})" if limited else "1 = 1"
+            params, limit = limited, self.max_entries
+        else:
+            scope, params = "namespace = ?", [namespace]
+        conn.execute(
+            f"DELETE FROM response_cache WHERE {scope} AND key NOT IN "
+            f"(SELECT key FROM response_cache WHERE {scope} ORDER BY expires_at DESC LIMIT ?)",
+            (*params, *params, limit)
+        )
+
+    def invalidate(self, namespace):
+        self._conn().execute("DELETE FROM response_cache WHERE namespace = ?", (namespace,))
+
+
+class ResponseCache:
+    def __init__(self, backend, default_ttl=300):
+        self.backend = backend
+        self.default_ttl = default_ttl
+
+    def lookup(self, namespace, full_path):
+        """(body, etag, last_modified) cached for a request path + query string, or None."""
+        return self.backend.get(f'{namespace}:{full_path}')
+
+    def store(self, namespace, full_path, body, ttl=None):
+        """Cache a response body; returns its (etag, last_modified)."""
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        last_modified = float(int(time.time()))
+        self.backend.set(f'{namespace}:{full_path}', namespace, body, etag, last_modified, ttl or self.default_ttl)
+        return etag, last_modified
+
+    def limit(self, namespace, max_entries):
+        """Keep ``namespace`` to its own ``max_entries``, outside the shared RESPONSE_CACHE_SIZE."""
+        self.backend.namespace_limits[namespace] = max_entries
+
+    def cached(self, namespace, ttl=None, max_entries=None):
+        """Cache a GET view's 200 response per namespace + path + query string."""
+        if max_entries is not None:
+            self.limit(namespace, max_entries)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                hit = self.lookup(namespace, request.full_path)
+                if hit is None:
+                    resp = make_response(view(*args, **kwargs))
+                    if resp.status_code != 200 or resp.is_streamed:
+                        return resp
+                    body = resp.get_data()
+                    etag, last_modified = self.store(namespace, request.full_path, body, ttl)
+                    mimetype = resp.mimetype
+                else:
+                    body, etag, last_modified = hit
+                    mimetype = 'application/json'
+
+                resp = make_response(body)
+                resp.mimetype = mimetype
+                resp.set_etag(etag)
+                resp.last_modified = last_modified
+                resp.headers['Cache-Control'] = 'no-cache'
+                # Honours If-None-Match / If-Modified-Since (turns the response into a 304)
+                return resp.make_conditional(request)
+            return wrapper
+        return decorator
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.invalidate(namespace)
+
+
+def _backend_from_env():
+    size = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))
+    if os.getenv('RESPONSE_CACHE_BACKEND', 'memory') == 'sqlite':
+        path = os.getenv('RESPONSE_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'cineverse_response_cache.sqlite3')
+        return SqliteBackend(path, max_entries=size)
+    return MemoryBackend(max_entries=size)
+
+
+response_cache = ResponseCache(_backend_from_env(), default_ttl=int(os.getenv('RESPONSE_CACHE_TTL', '300')))
@@ -0,0 +1,139 @@
+"""In-process cache of booked-seat maps, one compact bitmap per show.
+
+Each show is stored as ``{row letter: int}`` where bit ``n - 1`` is set when
+seat ``<row><n>`` is booked. The cache is a bounded LRU; booking and
+cancellation update entries write-through after they commit, and entries
+also expire after a short TTL so other worker processes converge.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_SEAT_RE = re.compile(r'^([A-Z]+)(\d+)$')
+
+
+def parse_seat(seat_id):
+    """'C12' -> ('C', 12). Raises ValueError for anything else."""
+    m = _SEAT_RE.match(str(seat_id).strip().upper())
+    if not m or int(m.group(2)) < 1:
+        raise ValueError(f'Invalid seat id: {seat_id}')
+    return m.group(1), int(m.group(2))
+
+
+class SeatBitmap:
+    __slots__ = ('rows', '_snapshot')
+
+    def __init__(self, seat_ids=()):
+        self.rows = {}
+        self._snapshot = None
+        for seat_id in seat_ids:
+            self.add(seat_id)
+
+    def add(self, seat_id):
+        row, num = parse_seat(seat_id)
+        self.rows[row] = self.rows.get(row, 0) | (1 << (num - 1))
+        self._snapshot = None
+
+    def remove(self, seat_id):
+        row, num = parse_seat(seat_id)
+        bits = self.rows.get(row, 0) & ~(1 << (num - 1))
+        if bits:
+            self.rows[row] = bits
+        else:
+            self.rows.pop(row, None)
+        self._snapshot = None
+
+    def __contains__(self, seat_id):
+        row, num = parse_seat(seat_id)
+        return bool(self.rows.get(row, 0) >> (num - 1) & 1)
+
+    def seats(self):
+        out = []
+        for row in sorted(self.rows, key=lambda r: (len(r), r)):
+            bits, num = self.rows[row], 1
+            while bits:
+                if bits & 1:
+                    out.append(f'{row}{num}')
+                bits >>= 1
+                num += 1
+        return out
+
+    def snapshot(self):
+        """(etag, seat list) for the current contents, memoised until the next change."""
+        if self._snapshot is None:
+            digest = hashlib.blake2b(repr(sorted(self.rows.items())).encode(), digest_size=8).hexdigest()
+            self._snapshot = (digest, self.seats())
+        return self._snapshot
+
+
+class SeatMapCache:
+    def __init__(self, max_shows=512, ttl=30):
+        self.max_shows = max_shows
+        self.ttl = ttl
+        self._entries = OrderedDict()  # show_id -> (expires_at, SeatBitmap)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def write_token(self):
+        """Take before reading the DB; pass to put() so a load that raced a write is not cached."""
+        with self._lock:
+            return self._writes
+
+    def get(self, show_id):
+        """(etag, booked seat list) or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(show_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[show_id]
+                return None
+            self._entries.move_to_end(show_id)
+            return entry[1].snapshot()
+
+    def put(self, show_id, seat_ids, token=None):
+        try:
+            bitmap = SeatBitmap(seat_ids)
+        except ValueError:
+            # Legacy rows that don't fit the grid: serve them as-is, uncached
+            seat_ids = sorted(seat_ids)
+            return hashlib.blake2b(repr(seat_ids).encode(), digest_size=8).hexdigest(), seat_ids
+        with self._lock:
+            if token is None or token == self._writes:
+                self._entries[show_id] = (time.monotonic() + self.ttl, bitmap)
+                self._entries.move_to_end(show_id)
+                while len(self._entries) > self.max_shows:
+                    self._entries.popitem(last=False)
+            return bitmap.snapshot()
+
+    def mark_booked(self, show_id, seat_ids):
+        self._apply(show_id, seat_ids, SeatBitmap.add)
+
+    def mark_released(self, show_id, seat_ids):
+        self._apply(show_id, seat_ids, SeatBitmap.remove)
+
+    def invalidate(self, show_id):
+        with self._lock:
+            self._writes += 1
+            self._entries.pop(show_id, None)
+
+    def _apply(self, show_id, seat_ids, op):
+        with self._lock:
+            self._writes += 1
+            entry = self._entries.get(show_id)
+            if entry is None:
+                return
+            try:
+                for seat_id in seat_ids:
+                    op(entry[1], seat_id)
+            except ValueError:
+                del self._entries[show_id]
+
+
+seat_maps = SeatMapCache(
+    max_shows=int(os.getenv('SEAT_CACHE_SIZE', '512')),
+    ttl=int(os.getenv('SEAT_CACHE_TTL', '30'))
+)
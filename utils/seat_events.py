@@ -0,0 +1,162 @@
+"""In-process publisher for seat availability changes (Server-Sent Events).
+
+Booking and cancellation publish one "booked"/"released" delta per commit;
+every stream watching that show wakes on the same channel, so watchers cost
+nothing extra per change. Each channel keeps a bounded ring buffer so a
+client reconnecting with Last-Event-ID can be replayed what it missed; when
+the gap is no longer buffered the stream falls back to a full snapshot.
+
+Event ids are ``<epoch>-<seq>``; the epoch is unique per process so ids
+handed out by a previous process (or another worker) always force a snapshot.
+
+Sync streams block in wait(); asyncio streams (asgi.py) await wait_async(),
+which parks a future on the channel instead of a thread, so one event loop
+can hold thousands of watchers.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class _Channel:
+    __slots__ = ('cond', 'events', 'seq', 'subscribers', 'futures')
+
+    def __init__(self, buffer_size):
+        self.cond = threading.Condition()
+        self.events = deque(maxlen=buffer_size)  # (seq, event_type, seats)
+        self.seq = 0
+        self.subscribers = 0
+        self.futures = set()  # (loop, future) of async waiters
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SeatEventHub:
+    def __init__(self, buffer_size=256, max_subscribers=500, max_channels=1024):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.max_channels = max_channels
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new epoch with no channels (also called in each forked worker,
+        whose sequence numbers diverge from its siblings')."""
+        self.epoch = f'{int(time.time() * 1000):x}p{os.getpid():x}'
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, show_id):
+        with self._lock:
+            channel = self._channels.get(show_id)
+            if channel is None:
+                channel = self._channels[show_id] = _Channel(self.buffer_size)
+                if len(self._channels) > self.max_channels:
+                    # Drop the least recently used channel nobody is watching
+                    for key, idle in self._channels.items():
+                        if idle.subscribers == 0 and key != show_id:
+                            del self._channels[key]
+                            break
+            self._channels.move_to_end(show_id)
+            return channel
+
+    def event_id(self, seq):
+        return f'{self.epoch}-{seq}'
+
+    def parse_event_id(self, last_event_id):
+        """Sequence number from a Last-Event-ID, or None if it isn't from this process."""
+        epoch, _, seq = (last_event_id or '').partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, show_id, event_type, seats):
+        if not seats:
+            return
+        channel = self._channel(show_id)
+        with channel.cond:
+            channel.seq += 1
+            channel.events.append((channel.seq, event_type, list(seats)))
+            channel.cond.notify_all()
+            futures, channel.futures = channel.futures, set()
+        for loop, future in futures:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def subscribe(self, show_id):
+        channel = self._channel(show_id)
+        with channel.cond:
+            if channel.subscribers >= self.max_subscribers:
+                raise TooManySubscribers(show_id)
+            channel.subscribers += 1
+
+    def unsubscribe(self, show_id):
+        channel = self._channel(show_id)
+        with channel.cond:
+            channel.subscribers = max(channel.subscribers - 1, 0)
+
+    def last_seq(self, show_id):
+        channel = self._channel(show_id)
+        with channel.cond:
+            return channel.seq
+
+    def wait(self, show_id, after_seq, timeout):
+        """Events newer than after_seq, blocking up to timeout.
+
+        Returns [] on timeout, or None when events after after_seq have already
+        been evicted from the ring buffer and the caller must resync.
+        """
+        channel = self._channel(show_id)
+        with channel.cond:
+            if channel.seq <= after_seq:
+                channel.cond.wait(timeout)
+            return self._since(channel, after_seq)
+
+    async def wait_async(self, show_id, after_seq, timeout):
+        """wait() for asyncio callers; publish() may run on any thread."""
+        import asyncio  # only asyncio callers get here; keeps it out of the WSGI startup
+        channel = self._channel(show_id)
+        loop = asyncio.get_running_loop()
+        future = None
+        with channel.cond:
+            if channel.seq <= after_seq:
+                future = loop.create_future()
+                channel.futures.add((loop, future))
+        if future is not None:
+            try:
+                await asyncio.wait((future,), timeout=timeout)
+            finally:
+                with channel.cond:
+                    channel.futures.discard((loop, future))
+        with channel.cond:
+            return self._since(channel, after_seq)
+
+    @staticmethod
+    def _since(channel, after_seq):
+        if channel.seq <= after_seq:
+            return []
+        if not channel.events or channel.events[0][0] > after_seq + 1:
+            return None
+        return [event for event in channel.events if event[0] > after_seq]
+
+
+def format_event(event_id, event_type, payload):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload)}\n\n'
+
+
+seat_events = SeatEventHub(
+    buffer_size=int(os.getenv('SEAT_STREAM_BUFFER', '256')),
+    max_subscribers=int(os.getenv('SEAT_STREAM_MAX_SUBSCRIBERS', '500'))
+)
@@ -0,0 +1,371 @@
+"""Server-side sessions with a read-through cache of the signed-in user.
+
+The session cookie only carries a random id; the session dict lives in a
+store. On every request the ``user_name`` and ``role`` keys of a signed-in
+session are refreshed from a small cache of customer records, so a role
+change is seen on the next request once ``invalidate_user()`` is called (the
+admin customer edit does), and ``revoke_sessions()`` signs a user out
+everywhere. The customer table is only read on a cache miss.
+
+Backends (SESSION_BACKEND):
+
+* ``memory`` (default) - LRU in this process; right for ``python app.py`` or
+  a single worker. serve.py switches to sqlite when it runs several.
+* ``sqlite`` - one file shared by every worker on the host (SESSION_PATH),
+  so sessions, revocations and user invalidations are seen by all of them.
+* ``cookie`` - Flask's signed cookie as before; no revocation, and roles
+  only change on re-login.
+"""
+import logging
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+SESSION_TTL = int(os.getenv('SESSION_TTL', str(7 * 24 * 3600)))  # idle seconds
+SESSION_MAX = int(os.getenv('SESSION_MAX', '10000'))
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '300'))
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '1024'))
+
+log = logging.getLogger('sessions')
+
+_SID = re.compile(r'^[A-Za-z0-9_-]{43}$')  # secrets.token_urlsafe(32)
+_serializer = TaggedJSONSerializer()
+
+
+class MemoryStore:
+    def __init__(self, max_sessions=10000, max_users=1024):
+        self.max_sessions = max_sessions
+        self.max_users = max_users
+        self._sessions = OrderedDict()  # sid -> (user_id, data, expires_at)
+        self._users = OrderedDict()     # cust_id -> (user, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        """(data, expires_at) or None."""
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            if entry[2] < time.time():
+                del self._sessions[sid]
+                return None
+            self._sessions.move_to_end(sid)
+            return entry[1], entry[2]
+
+    def set(self, sid, user_id, data, ttl):
+        with self._lock:
+            self._sessions[sid] = (user_id, data, time.time() + ttl)
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def delete_user_sessions(self, user_id):
+        with self._lock:
+            sids = [sid for sid, entry in self._sessions.items() if entry[0] == user_id]
+            for sid in sids:
+                del self._sessions[sid]
+            return len(sids)
+
+    def get_user(self, cust_id):
+        with self._lock:
+            entry = self._users.get(cust_id)
+            if entry is None or entry[1] < time.time():
+                return None
+            self._users.move_to_end(cust_id)
+            return entry[0]
+
+    def set_user(self, cust_id, user, ttl):
+        with self._lock:
+            self._users[cust_id] = (user, time.time() + ttl)
+            self._users.move_to_end(cust_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def drop_user(self, cust_id):
+        with self._lock:
+            self._users.pop(cust_id, None)
+
+    def counts(self):
+        with self._lock:
+            return {'sessions': len(self._sessions), 'users': len(self._users)}
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._users.clear()
+
+
+class SqliteStore:
+    def __init__(self, path, max_sessions=10000, max_users=1024):
+        import sqlite3  # only this backend needs it
+        self._sqlite3 = sqlite3
+        self.path = path
+        self.max_sessions = max_sessions
+        self.max_users = max_users
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session ("
+                " sid TEXT PRIMARY KEY, user_id INTEGER, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_user ON session (user_id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_user ("
+                " cust_id INTEGER PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _conn(self):
+        # One connection per thread, reopened after a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, sid):
+        row = self._conn().execute(
+            "SELECT data, expires_at FROM session WHERE sid = ? AND expires_at >= ?", (sid, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, sid, user_id, data, ttl):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO session (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?)",
+            (sid, user_id, data, time.time() + ttl)
+        )
+        # Expire and trim now and then rather than on every write
+        self._writes += 1
+        if self._writes % 100 == 0:
+            conn.execute(
+                "DELETE FROM session WHERE expires_at < ? OR sid NOT IN "
+                "(SELECT sid FROM session ORDER BY expires_at DESC LIMIT ?)",
+                (time.time(), self.max_sessions)
+            )
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM session WHERE sid = ?", (sid,))
+
+    def delete_user_sessions(self, user_id):
+        return self._conn().execute("DELETE FROM session WHERE user_id = ?", (user_id,)).rowcount
+
+    def get_user(self, cust_id):
+        row = self._conn().execute(
+            "SELECT data FROM session_user WHERE cust_id = ? AND expires_at >= ?", (cust_id, time.time())
+        ).fetchone()
+        return _serializer.loads(row[0]) if row else None
+
+    def set_user(self, cust_id, user, ttl):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO session_user (cust_id, data, expires_at) VALUES (?, ?, ?)",
+            (cust_id, _serializer.dumps(user), time.time() + ttl)
+        )
+        conn.execute(
+            "DELETE FROM session_user WHERE expires_at < ? OR cust_id NOT IN "
+            "(SELECT cust_id FROM session_user ORDER BY expires_at DESC LIMIT ?)",
+            (time.time(), self.max_users)
+        )
+
+    def drop_user(self, cust_id):
+        self._conn().execute("DELETE FROM session_user WHERE cust_id = ?", (cust_id,))
+
+    def counts(self):
+        now = time.time()
+        conn = self._conn()
+        return {
+            'sessions': conn.execute("SELECT COUNT(*) FROM session WHERE expires_at >= ?", (now,)).fetchone()[0],
+            'users': conn.execute("SELECT COUNT(*) FROM session_user WHERE expires_at >= ?", (now,)).fetchone()[0],
+        }
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM session")
+        conn.execute("DELETE FROM session_user")
+
+
+class UserCache:
+    """Read-through cache of {'cust_id', 'name', 'role'} per customer."""
+
+    def __init__(self, store, ttl=300):
+        self.store = store
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, cust_id):
+        """The cached record, loading it on a miss; None if the customer is gone."""
+        user = self.store.get_user(cust_id)
+        if user is not None:
+            self.hits += 1
+            return user
+        self.misses += 1
+        from db.connection import get_conn
+        # Always the primary: this runs in open_session, before the request's
+        # routing is reset, and a replica could hand back a role changed moments ago
+        with get_conn(readonly=False) as conn:
+            with conn.cursor(dictionary=True) as cur:
+                cur.execute("SELECT cust_id, name, role FROM customer WHERE cust_id=%s", (cust_id,))
+                row = cur.fetchone()
+        if row is None:
+            return None
+        return self.remember(row)
+
+    def remember(self, row):
+        user = {'cust_id': row['cust_id'], 'name': row['name'], 'role': row.get('role') or 'customer'}
+        self.store.set_user(user['cust_id'], user, self.ttl)
+        return user
+
+    def invalidate(self, cust_id):
+        self.store.drop_user(cust_id)
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False, expires_at=0.0):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.user_id = (initial or {}).get('user_id')  # as loaded, to rotate the id on login/logout
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, store, users, ttl):
+        self.store = store
+        self.users = users
+        self.ttl = ttl
+
+    def read(self, sid):
+        """(session dict, expires_at) for a cookie value, with the user fields refreshed; None if unknown."""
+        if not sid or not _SID.match(sid):
+            return None
+        entry = self.store.get(sid)
+        if entry is None:
+            return None
+        data = _serializer.loads(entry[0])
+        user_id = data.get('user_id')
+        if user_id is not None:
+            try:
+                user = self.users.get(user_id)
+            except Exception as e:
+                # Keep the values stored at login rather than signing everyone out
+                self.users.errors += 1
+                log.warning('user %s not refreshed: %s', user_id, e)
+            else:
+                if user is None:  # customer deleted
+                    self.store.delete(sid)
+                    return None
+                data['user_name'] = user['name']
+                data['role'] = user['role']
+        return data, entry[1]
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        found = self.read(sid)
+        if found is None:
+            return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+        return ServerSession(found[0], sid=sid, expires_at=found[1])
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if not session.new:
+                self.store.delete(session.sid)
+            if session.modified and not session.new:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        user_id = session.get('user_id')
+        rotate = user_id != session.user_id and not session.new
+        if rotate:
+            # New id on sign-in/out so a planted cookie can't be promoted
+            self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+        # Untouched sessions are only written back to extend the idle TTL once half of it is gone
+        if not (session.modified or session.new or rotate or session.expires_at - time.time() < self.ttl / 2):
+            return
+        self.store.set(session.sid, user_id, _serializer.dumps(dict(session)), self.ttl)
+        if session.new or rotate or session.permanent:
+            response.set_cookie(
+                name, session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain, path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+        response.vary.add('Cookie')
+
+
+def _store_from_env():
+    if SESSION_BACKEND == 'sqlite':
+        path = os.getenv('SESSION_PATH') or os.path.join(tempfile.gettempdir(), 'cineverse_sessions.sqlite3')
+        return SqliteStore(path, max_sessions=SESSION_MAX, max_users=USER_CACHE_SIZE)
+    return MemoryStore(max_sessions=SESSION_MAX, max_users=USER_CACHE_SIZE)
+
+
+session_store = _store_from_env()
+user_cache = UserCache(session_store, ttl=USER_CACHE_TTL)
+session_interface = ServerSessionInterface(session_store, user_cache, SESSION_TTL)
+
+
+def init_app(app):
+    """Use the server-side sessions unless SESSION_BACKEND=cookie."""
+    if SESSION_BACKEND != 'cookie':
+        app.session_interface = session_interface
+
+
+def remember_user(row):
+    """Prime the user cache from a customer row just read (e.g. at login)."""
+    if SESSION_BACKEND != 'cookie':
+        user_cache.remember(row)
+
+
+def invalidate_user(cust_id):
+    """Drop the cached record so the next request re-reads name and role."""
+    user_cache.invalidate(cust_id)
+
+
+def revoke_sessions(cust_id):
+    """Sign the customer out everywhere; returns the number of sessions removed."""
+    user_cache.invalidate(cust_id)
+    return session_store.delete_user_sessions(cust_id)
+
+
+def session_stats():
+    lookups = user_cache.hits + user_cache.misses
+    return {
+        'backend': SESSION_BACKEND,
+        'ttl_seconds': SESSION_TTL,
+        **({} if SESSION_BACKEND == 'cookie' else session_store.counts()),
+        'user_cache': {
+            'ttl_seconds': user_cache.ttl,
+            'hits': user_cache.hits,
+            'misses': user_cache.misses,
+            'errors': user_cache.errors,
+            'hit_ratio': round(user_cache.hits / lookups, 3) if lookups else 0.0,
+        },
+    }